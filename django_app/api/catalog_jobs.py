@@ -0,0 +1,172 @@
+"""
+Traduction de catalogues en arrière-plan.
+
+Un gros catalogue peut dépasser le délai des workers Gunicorn (``timeout``,
+30 s). La traduction tourne donc dans un thread du worker ; la vue attend au
+plus ``CATALOG_SYNC_WAIT`` secondes. Terminée à temps, le fichier est renvoyé
+directement ; sinon la réponse est ``202`` avec l'URL du travail
+(``status_url``), à interroger jusqu'à recevoir le fichier.
+
+L'état et le résultat de chaque travail sont écrits dans ``CATALOG_JOBS_DIR``
+et supprimés ``CATALOG_JOB_TIMEOUT`` secondes après la fin du travail. L'état
+d'un travail en cours est rafraîchi toutes les ``CATALOG_JOB_HEARTBEAT``
+secondes : sans nouvelles depuis ``CATALOG_JOB_STALE_AFTER`` secondes (worker
+recyclé ou tué), le travail est considéré comme échoué.
+
+L'identifiant, aléatoire, sert de jeton d'accès au résultat ; il commence par
+le nom de la machine (``CATALOG_JOB_NODE``). Sur plusieurs machines,
+``CATALOG_JOBS_DIR`` doit être un volume partagé ou le répartiteur de charge
+doit router les requêtes de suivi vers la machine indiquée par ce préfixe.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import re
+import secrets
+import socket
+import tempfile
+import threading
+from time import time
+from typing import BinaryIO, Callable, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Constants
+CATALOG_SYNC_WAIT = getattr(settings, 'CATALOG_SYNC_WAIT', 20.0)  # secondes, sous le timeout Gunicorn
+CATALOG_JOB_TIMEOUT = getattr(settings, 'CATALOG_JOB_TIMEOUT', 3600)  # conservation des résultats
+CATALOG_JOBS_DIR = getattr(settings, 'CATALOG_JOBS_DIR', os.path.join(tempfile.gettempdir(), 'esacode_catalog_jobs'))
+CATALOG_JOB_HEARTBEAT = getattr(settings, 'CATALOG_JOB_HEARTBEAT', 10)  # secondes
+CATALOG_JOB_STALE_AFTER = getattr(settings, 'CATALOG_JOB_STALE_AFTER', 60)  # travail interrompu sans nouvelles
+CATALOG_JOB_NODE = getattr(settings, 'CATALOG_JOB_NODE', re.sub(r'[^A-Za-z0-9]', '', socket.gethostname())[:32] or 'local')
+
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+class CatalogJobError(Exception):
+    """La traduction en arrière-plan du catalogue a échoué."""
+
+
+_job_id_re = re.compile(r'[A-Za-z0-9]+\.[A-Za-z0-9_-]+')
+
+
+def _job_path(job_id: str, extension: str) -> str:
+    return os.path.join(CATALOG_JOBS_DIR, f"{job_id}.{extension}")
+
+
+def _write_state(job_id: str, state: dict):
+    # Écriture atomique : un autre worker ne lit jamais un état à moitié écrit
+    with tempfile.NamedTemporaryFile('w', dir=CATALOG_JOBS_DIR, delete=False) as output:
+        json.dump({**state, 'updated_at': time()}, output)
+    os.replace(output.name, _job_path(job_id, 'json'))
+
+
+def job_node(job_id: str) -> str:
+    """Machine qui exécute le travail ``job_id``."""
+    return job_id.split('.', 1)[0]
+
+
+def get_job_state(job_id: str) -> Optional[dict]:
+    """
+    État du travail (``status``, ``filename``, ``message``, ``updated_at``),
+    ``None`` s'il est inconnu ou expiré. Un travail en cours dont l'état n'est
+    plus rafraîchi est rapporté comme échoué.
+    """
+    if not _job_id_re.fullmatch(job_id):
+        return None
+    try:
+        with open(_job_path(job_id, 'json')) as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return None
+    if state['status'] == JOB_RUNNING and time() - state.get('updated_at', 0) > CATALOG_JOB_STALE_AFTER:
+        return {**state, 'status': JOB_FAILED, 'message': "Catalog job interrupted"}
+    return state
+
+
+def open_job_result(job_id: str) -> BinaryIO:
+    return open(_job_path(job_id, 'out'), 'rb')
+
+
+def prune_jobs():
+    """
+    Supprime les travaux terminés (ou interrompus) depuis plus de
+    ``CATALOG_JOB_TIMEOUT`` secondes ; un travail en cours n'est jamais supprimé.
+    """
+    limit = time() - CATALOG_JOB_TIMEOUT
+    for entry in os.scandir(CATALOG_JOBS_DIR):
+        job_id, extension = os.path.splitext(entry.name)
+        try:
+            state = get_job_state(job_id) if extension == '.json' else None
+            if state is not None:
+                if state['status'] != JOB_RUNNING and state.get('updated_at', 0) < limit:
+                    os.unlink(entry.path)
+                    if os.path.exists(_job_path(job_id, 'out')):
+                        os.unlink(_job_path(job_id, 'out'))
+            # Résultat sans état, fichier temporaire abandonné ou état illisible
+            elif entry.stat().st_mtime < limit and not os.path.exists(_job_path(job_id, 'json')):
+                os.unlink(entry.path)
+        except OSError:
+            continue
+
+
+class CatalogJob:
+    """Travail lancé par ``start_catalog_job`` ; ``wait`` attend sa fin dans le worker qui l'a lancé."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.error: Optional[Exception] = None
+        self._finished = threading.Event()
+        # L'état final ne doit pas être écrasé par un dernier battement de cœur
+        self._state_lock = threading.Lock()
+
+    def wait(self, timeout: float) -> bool:
+        return self._finished.wait(timeout)
+
+    def run(self, build: Callable[[BinaryIO], str]):
+        threading.Thread(target=self._heartbeat, name=f'catalog-heartbeat-{self.job_id[-8:]}', daemon=True).start()
+        try:
+            with open(_job_path(self.job_id, 'out'), 'wb') as result:
+                filename = build(result)
+            state = {'status': JOB_DONE, 'filename': filename}
+        except Exception as e:
+            logger.error("Catalog job failed: %s", e, extra={'job_id': self.job_id})
+            self.error = e
+            state = {'status': JOB_FAILED, 'message': str(e)}
+        with self._state_lock:
+            try:
+                _write_state(self.job_id, state)
+            finally:
+                self._finished.set()
+
+    def _heartbeat(self):
+        while not self._finished.wait(CATALOG_JOB_HEARTBEAT):
+            with self._state_lock:
+                if self._finished.is_set():
+                    return
+                try:
+                    _write_state(self.job_id, {'status': JOB_RUNNING})
+                except OSError as e:
+                    logger.warning("Catalog job heartbeat failed: %s", e, extra={'job_id': self.job_id})
+
+
+def start_catalog_job(build: Callable[[BinaryIO], str]) -> CatalogJob:
+    """
+    Lance ``build(result)`` dans un thread : ``build`` écrit le catalogue traduit
+    dans ``result`` et retourne le nom du fichier à télécharger.
+    """
+    os.makedirs(CATALOG_JOBS_DIR, exist_ok=True)
+    prune_jobs()
+    job = CatalogJob(f"{CATALOG_JOB_NODE}.{secrets.token_urlsafe(16)}")
+    _write_state(job.job_id, {'status': JOB_RUNNING})
+    # Le contexte de la requête (request_id des logs) suit le travail
+    context = contextvars.copy_context()
+    threading.Thread(
+        target=context.run, args=(job.run, build), name=f'catalog-job-{job.job_id[-8:]}', daemon=True
+    ).start()
+    return job
@@ -0,0 +1,356 @@
+"""
+Traduction de catalogues de messages (gettext ``.po`` ou JSON plat/imbriqué).
+
+Les catalogues sont lus en flux : le fichier est découpé en morceaux
+« bruts » recopiés tels quels (commentaires, clés, ponctuation, entrées déjà
+traduites) et en unités à traduire. Les unités sont traduites par fenêtres de
+``batch_size`` puis réécrites dans l'ordre, au même format : la mémoire
+utilisée dépend de la taille des fenêtres, pas de celle du catalogue.
+"""
+
+import io
+import json
+import os
+import re
+from json.decoder import scanstring
+from typing import BinaryIO, Callable, Dict, Iterator, List, TextIO, Union
+
+# Constants
+FORMAT_PO = 'po'
+FORMAT_JSON = 'json'
+SUPPORTED_CATALOG_FORMATS = (FORMAT_PO, FORMAT_JSON)
+CATALOG_BATCH_SIZE = 200
+READ_CHUNK_SIZE = 64 * 1024
+
+_LETTER_RE = re.compile(r'[^\W\d_]')
+
+# En-têtes Plural-Forms gettext des langues cibles courantes. Pour une autre
+# langue, l'en-tête est retiré (gettext suppose alors ``nplurals=2; plural=(n != 1)``).
+_PLURAL_ONE = 'nplurals=1; plural=0;'
+_PLURAL_NOT_ONE = 'nplurals=2; plural=(n != 1);'
+_PLURAL_ABOVE_ONE = 'nplurals=2; plural=(n > 1);'
+_PLURAL_SLAVIC = (
+    'nplurals=3; plural=(n%10==1 && n%100!=11 ? 0 : '
+    'n%10>=2 && n%10<=4 && (n%100<10 || n%100>=20) ? 1 : 2);'
+)
+PO_PLURAL_FORMS = {
+    **dict.fromkeys(('ja', 'ko', 'zh', 'vi', 'th', 'id', 'ms', 'yo', 'ig'), _PLURAL_ONE),
+    **dict.fromkeys(
+        ('en', 'de', 'nl', 'sv', 'da', 'no', 'nb', 'fi', 'it', 'es', 'pt', 'el', 'he', 'iw', 'hu', 'bg',
+         'et', 'ca', 'sw', 'ha', 'so', 'af', 'zu', 'xh', 'am'),
+        _PLURAL_NOT_ONE
+    ),
+    **dict.fromkeys(('fr', 'pt-br', 'tr', 'fa', 'ln', 'wo', 'mg'), _PLURAL_ABOVE_ONE),
+    **dict.fromkeys(('ru', 'uk', 'be', 'sr', 'hr', 'bs'), _PLURAL_SLAVIC),
+    'pl': 'nplurals=3; plural=(n==1 ? 0 : n%10>=2 && n%10<=4 && (n%100<10 || n%100>=20) ? 1 : 2);',
+    'cs': 'nplurals=3; plural=(n==1) ? 0 : (n>=2 && n<=4) ? 1 : 2;',
+    'sk': 'nplurals=3; plural=(n==1) ? 0 : (n>=2 && n<=4) ? 1 : 2;',
+    'ro': 'nplurals=3; plural=(n==1 ? 0 : (n==0 || (n%100 > 0 && n%100 < 20)) ? 1 : 2);',
+    'ar': 'nplurals=6; plural=(n==0 ? 0 : n==1 ? 1 : n==2 ? 2 : n%100>=3 && n%100<=10 ? 3 : n%100>=11 ? 4 : 5);',
+}
+
+
+def get_plural_forms(language: str):
+    """En-tête Plural-Forms de la langue (``None`` si inconnue) : code exact, puis langue de base."""
+    code = language.lower()
+    return PO_PLURAL_FORMS.get(code) or PO_PLURAL_FORMS.get(code.split('-')[0])
+
+
+def get_plural_count(language: str) -> int:
+    plural_forms = get_plural_forms(language)
+    return int(re.search(r'nplurals=(\d+)', plural_forms).group(1)) if plural_forms else 2
+
+
+class CatalogFormatError(ValueError):
+    """Catalogue illisible (syntaxe .po ou JSON invalide)."""
+
+
+def detect_catalog_format(filename: str) -> str:
+    if filename.lower().endswith('.po'):
+        return FORMAT_PO
+    if filename.lower().endswith('.json'):
+        return FORMAT_JSON
+    raise CatalogFormatError(f"Unsupported catalog file: {filename}")
+
+
+# --------------------------------------------------------------------------
+# gettext .po
+# --------------------------------------------------------------------------
+
+_PO_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\'}
+_po_escape_re = re.compile(r'\\(.)')
+_po_keyword_re = re.compile(r'^(msgctxt|msgid_plural|msgid|msgstr(?:\[(\d+)\])?)\s+(".*")\s*$')
+_po_language_re = re.compile(r'"Language: [^"\\]*\\n"')
+_po_plural_forms_re = re.compile(r'^"Plural-Forms: [^"\\]*(?:\\.[^"\\]*)*"\s*\n?', re.MULTILINE)
+
+
+def po_unescape(quoted: str) -> str:
+    return _po_escape_re.sub(lambda match: _PO_ESCAPES.get(match.group(1), match.group(1)), quoted[1:-1])
+
+
+def po_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('"', '\\"').replace('\t', '\\t').replace('\r', '\\r').replace('\n', '\\n')
+
+
+def po_string_lines(keyword: str, text: str) -> List[str]:
+    """Lignes ``keyword "..."`` au style gettext (une ligne par ``\\n`` si multiligne)."""
+    if '\n' not in text.rstrip('\n'):
+        return [f'{keyword} "{po_escape(text)}"\n']
+    pieces = re.findall(r'[^\n]*\n|[^\n]+$', text)
+    return [f'{keyword} ""\n'] + [f'"{po_escape(piece)}"\n' for piece in pieces]
+
+
+class PoEntry:
+    """Entrée d'un fichier .po : lignes d'origine et champs décodés."""
+
+    def __init__(self, lines: List[str]):
+        self.lines = lines
+        self.fields: Dict[str, str] = {}
+        self.plural_count = 0
+        self.msgstr_start = None
+        current = None
+        for index, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped.startswith('"') and current:
+                self.fields[current] += po_unescape(stripped)
+                continue
+            match = _po_keyword_re.match(stripped)
+            if not match:
+                current = None
+                continue
+            current = match.group(1)
+            self.fields[current] = po_unescape(match.group(3))
+            if current.startswith('msgstr'):
+                if self.msgstr_start is None:
+                    self.msgstr_start = index
+                if match.group(2) is not None:
+                    self.plural_count += 1
+
+    @property
+    def is_header(self) -> bool:
+        return self.fields.get('msgid') == '' and 'msgctxt' not in self.fields
+
+    def needs_translation(self) -> bool:
+        if 'msgid' not in self.fields or self.is_header or self.msgstr_start is None:
+            return False
+        return not any(value for key, value in self.fields.items() if key.startswith('msgstr'))
+
+    def texts(self) -> List[str]:
+        if not self.needs_translation():
+            return []
+        return [text for text in (self.fields['msgid'], self.fields.get('msgid_plural')) if text]
+
+    def render(self, translations: Dict[str, str], target_language: str) -> str:
+        if self.is_header:
+            return self._render_header(target_language)
+        if not self.needs_translation():
+            return ''.join(self.lines)
+
+        singular = translations.get(self.fields['msgid'], '')
+        if 'msgid_plural' in self.fields:
+            plural = translations.get(self.fields['msgid_plural'], '')
+            # Autant de formes que la langue cible en déclare (pas celles du catalogue source)
+            plural_count = get_plural_count(target_language)
+            msgstr_lines = po_string_lines('msgstr[0]', plural if plural_count == 1 else singular)
+            for index in range(1, plural_count):
+                msgstr_lines += po_string_lines(f'msgstr[{index}]', plural)
+        else:
+            msgstr_lines = po_string_lines('msgstr', singular)
+        # Les lignes qui suivent les msgstr (ligne vide de séparation) sont conservées
+        trailing = [line for line in self.lines[self.msgstr_start:] if not line.strip()]
+        return ''.join(self.lines[:self.msgstr_start] + msgstr_lines + trailing)
+
+
+    def _render_header(self, target_language: str) -> str:
+        header = _po_language_re.sub(f'"Language: {target_language}\\\\n"', ''.join(self.lines), count=1)
+        header = _po_plural_forms_re.sub('', header)
+        plural_forms = get_plural_forms(target_language)
+        if plural_forms:
+            body = header.rstrip('\n')
+            header = f'{body}\n"Plural-Forms: {plural_forms}\\n"\n' + header[len(body) + 1:]
+        return header
+
+
+def iter_po_entries(stream: TextIO) -> Iterator[PoEntry]:
+    """Entrées d'un fichier .po, lues ligne par ligne."""
+    lines: List[str] = []
+    seen_msgstr = False
+    for line in stream:
+        stripped = line.strip()
+        starts_entry = stripped.startswith(('#', 'msgctxt', 'msgid ')) and seen_msgstr
+        if starts_entry:
+            yield PoEntry(lines)
+            lines, seen_msgstr = [], False
+        lines.append(line)
+        if stripped.startswith('msgstr'):
+            seen_msgstr = True
+        elif not stripped:
+            yield PoEntry(lines)
+            lines, seen_msgstr = [], False
+    if lines:
+        yield PoEntry(lines)
+
+
+# --------------------------------------------------------------------------
+# JSON
+# --------------------------------------------------------------------------
+
+class JsonString:
+    """Valeur texte d'un catalogue JSON."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def texts(self) -> List[str]:
+        return [self.text] if _LETTER_RE.search(self.text) else []
+
+    def render(self, translations: Dict[str, str], target_language: str) -> str:
+        return json.dumps(translations.get(self.text, self.text), ensure_ascii=False)
+
+
+_json_scalar_re = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null')
+_json_space_re = re.compile(r'[\s,:\[\]{}]*')
+
+
+def iter_json_tokens(stream: TextIO) -> Iterator[Union[str, JsonString]]:
+    """
+    Parcourt un catalogue JSON en flux : ponctuation, espaces, clés et scalaires
+    sont renvoyés bruts ; chaque chaîne en position de valeur devient ``JsonString``.
+    """
+    buffer = ''
+    position = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            eof = True
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    fill()
+    while True:
+        match = _json_space_re.match(buffer, position)
+        if match.end() > position:
+            yield buffer[position:match.end()]
+            position = match.end()
+        if position >= len(buffer):
+            if eof:
+                return
+            fill()
+            continue
+
+        if buffer[position] == '"':
+            try:
+                text, end = scanstring(buffer, position + 1)
+            except json.JSONDecodeError:
+                if eof:
+                    raise CatalogFormatError("Unterminated string in JSON catalog")
+                fill()
+                continue
+            # Une chaîne suivie de ':' est une clé : recopiée telle quelle
+            following = _json_space_re.match(buffer, end)
+            if following.end() >= len(buffer) and not eof:
+                fill()
+                continue
+            is_key = buffer[end:following.end()].lstrip().startswith(':')
+            yield buffer[position:end] if is_key else JsonString(text)
+            position = end
+            continue
+
+        match = _json_scalar_re.match(buffer, position)
+        if match and (match.end() < len(buffer) or eof):
+            yield match.group(0)
+            position = match.end()
+            continue
+        if not eof:
+            fill()
+            continue
+        raise CatalogFormatError(f"Invalid JSON catalog near: {buffer[position:position + 20]!r}")
+
+
+# --------------------------------------------------------------------------
+# Traduction
+# --------------------------------------------------------------------------
+
+def iter_catalog_items(stream: TextIO, catalog_format: str):
+    if catalog_format == FORMAT_PO:
+        return iter_po_entries(stream)
+    if catalog_format == FORMAT_JSON:
+        return iter_json_tokens(stream)
+    raise CatalogFormatError(f"Unsupported catalog format: {catalog_format}")
+
+
+def translate_catalog_stream(
+    stream: TextIO,
+    output: TextIO,
+    catalog_format: str,
+    target_language: str,
+    translate_many: Callable[[List[str]], Dict[str, str]],
+    batch_size: int = CATALOG_BATCH_SIZE
+) -> dict:
+    """
+    Traduit un catalogue de ``stream`` vers ``output`` par fenêtres de ``batch_size`` unités.
+
+    Returns:
+        statistiques : entrées traduites et textes uniques envoyés à ``translate_many``
+    """
+    stats = {'units': 0, 'translated_units': 0, 'texts': 0}
+    window = []
+    pending_texts = {}
+
+    def flush():
+        translations = translate_many(list(pending_texts)) if pending_texts else {}
+        stats['texts'] += len(pending_texts)
+        for item in window:
+            if isinstance(item, str):
+                output.write(item)
+            else:
+                output.write(item.render(translations, target_language))
+        window.clear()
+        pending_texts.clear()
+
+    for item in iter_catalog_items(stream, catalog_format):
+        window.append(item)
+        if isinstance(item, str):
+            continue
+        stats['units'] += 1
+        texts = item.texts()
+        if texts:
+            stats['translated_units'] += 1
+            pending_texts.update(dict.fromkeys(texts))
+        if len(pending_texts) >= batch_size:
+            flush()
+    flush()
+    return stats
+
+
+
+def translate_catalog_file(
+    source: BinaryIO,
+    output: BinaryIO,
+    catalog_format: str,
+    target_language: str,
+    translate_many: Callable[[List[str]], Dict[str, str]],
+    batch_size: int = CATALOG_BATCH_SIZE
+) -> dict:
+    """``translate_catalog_stream`` sur des fichiers binaires UTF-8 (fins de ligne conservées)."""
+    source.seek(0)
+    reader = io.TextIOWrapper(source, encoding='utf-8', newline='')
+    writer = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    try:
+        return translate_catalog_stream(reader, writer, catalog_format, target_language, translate_many, batch_size)
+    except UnicodeDecodeError as e:
+        raise CatalogFormatError(f"Catalog is not valid UTF-8: {e}")
+    finally:
+        writer.flush()
+        # Les fichiers sous-jacents restent ouverts (réutilisés pour la langue suivante)
+        writer.detach()
+        reader.detach()
+
+
+def localized_catalog_name(filename: str, language: str) -> str:
+    """``messages.po`` -> ``messages.en.po``"""
+    stem, extension = os.path.splitext(os.path.basename(filename))
+    return f"{stem}.{language}{extension}"
@@ -0,0 +1,102 @@
+"""
+Retraduction incrémentale des documents révisés.
+
+Un client qui envoie un ``document_id`` avec son texte voit la dernière
+version traduite de ce document (par paire de langues) conservée dans le
+cache. À l'envoi suivant, les segments (phrases pour le texte brut, nœuds de
+texte pour HTML/Markdown) sont comparés à la version précédente avec
+``difflib`` : les segments inchangés reprennent leur traduction, seuls les
+segments insérés ou modifiés partent en traduction.
+
+Seule la dernière version est conservée (segments source + traductions), avec
+une durée de vie ``DOCUMENT_VERSION_TIMEOUT`` : le stockage par document est
+borné par la taille maximale d'un document.
+"""
+
+import hashlib
+import re
+from difflib import SequenceMatcher
+from typing import Callable, Dict, List
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Constants
+DOCUMENT_VERSION_TIMEOUT = getattr(settings, 'DOCUMENT_VERSION_TIMEOUT', 7 * 24 * 3600)
+DOCUMENT_VERSION_KEY_PREFIX = "doc_version_"
+MAX_DOCUMENT_ID_LENGTH = 128
+
+# Fin de phrase suivie d'espaces, ou saut de ligne (séparateurs conservés tels quels)
+_SEGMENT_SEPARATOR_RE = re.compile(r'(\s*\n\s*|(?<=[.!?…;:])\s+)')
+
+
+def document_version_key(document_id: str, source_lang: str, target_lang: str, owner: str = '') -> str:
+    """Clé de la dernière version ; ``owner`` (clé d'API) sépare les espaces de noms des clients."""
+    digest = hashlib.sha256(f"{owner}\0{document_id}".encode('utf-8')).hexdigest()
+    return f"{DOCUMENT_VERSION_KEY_PREFIX}{digest}_{source_lang}_{target_lang}"
+
+
+def split_segments(text: str) -> List[str]:
+    """Découpe en segments et séparateurs alternés : ``''.join(split_segments(t)) == t``."""
+    return _SEGMENT_SEPARATOR_RE.split(text)
+
+
+class IncrementalTranslator:
+    """
+    Fonction ``translate_many`` qui ne traduit que ce qui a changé depuis la
+    version précédente du document, puis enregistre la nouvelle version.
+    """
+
+    def __init__(self, version_key: str, translate_many: Callable[[List[str]], Dict[str, str]]):
+        self.version_key = version_key
+        self.translate_many = translate_many
+        self.previous_version = False
+        self.segments = 0
+        self.reused_segments = 0
+        self.translated_segments = 0
+
+    def __call__(self, texts: List[str]) -> Dict[str, str]:
+        previous = cache.get(self.version_key)
+        translations = {}
+        if previous is not None:
+            self.previous_version = True
+            matcher = SequenceMatcher(None, previous['segments'], texts, autojunk=False)
+            for tag, old_start, old_end, new_start, _ in matcher.get_opcodes():
+                if tag == 'equal':
+                    for offset in range(old_end - old_start):
+                        translations[texts[new_start + offset]] = previous['translations'][old_start + offset]
+
+        missing = list(dict.fromkeys(text for text in texts if text not in translations))
+        if missing:
+            translations.update(self.translate_many(missing))
+
+        self.segments = len(texts)
+        self.translated_segments = len(missing)
+        self.reused_segments = sum(1 for text in texts if text not in missing)
+        cache.set(
+            self.version_key,
+            {'segments': list(texts), 'translations': [translations[text] for text in texts]},
+            DOCUMENT_VERSION_TIMEOUT
+        )
+        return translations
+
+    def report(self, document_id: str) -> dict:
+        return {
+            'id': document_id,
+            'previous_version': self.previous_version,
+            'segments': self.segments,
+            'reused_segments': self.reused_segments,
+            'translated_segments': self.translated_segments,
+        }
+
+
+def translate_plain_text(text: str, translate_many: Callable[[List[str]], Dict[str, str]]) -> str:
+    """Traduit un texte brut phrase par phrase, séparateurs d'origine conservés."""
+    parts = split_segments(text)
+    # Indices pairs : segments ; impairs : séparateurs capturés
+    segments = [part for part in parts[::2] if part.strip()]
+    translations = translate_many(segments) if segments else {}
+    return ''.join(
+        translations.get(part, part) if index % 2 == 0 else part
+        for index, part in enumerate(parts)
+    )
@@ -0,0 +1,167 @@
+"""
+Exécution des traductions par classes de priorité.
+
+Trois classes : ``interactive`` (page de démo, appels utilisateur), ``standard``
+(défaut) et ``bulk`` (traitements par lots). Chaque classe a sa propre file.
+
+- Des workers sont réservés à chaque classe (``reserved``) : un lot massif ne
+  peut jamais occuper la capacité réservée aux requêtes interactives.
+- Les workers partagés servent les files selon un ordonnancement équitable
+  pondéré (stride scheduling, poids ``weight``).
+- Les latences (attente en file, exécution) sont mesurées par classe.
+
+La classe d'une requête vient de sa clé d'API (``API_KEY_PRIORITIES``, prioritaire),
+du champ ``priority`` de la requête ou de l'en-tête ``X-Translation-Priority``
+(requêtes GET, dont l'URL canonique ne porte pas la priorité).
+"""
+
+import contextvars
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+from time import perf_counter
+from typing import Dict, Optional
+
+from django.conf import settings
+
+# Constants
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_STANDARD = 'standard'
+PRIORITY_BULK = 'bulk'
+DEFAULT_PRIORITY = PRIORITY_STANDARD
+API_KEY_HEADER = 'X-Api-Key'
+PRIORITY_HEADER = 'X-Translation-Priority'  # classe demandée sans modifier l'URL (GET cachables)
+
+DEFAULT_PRIORITY_CLASSES = {
+    PRIORITY_INTERACTIVE: {'weight': 6, 'reserved': 2},
+    PRIORITY_STANDARD: {'weight': 3, 'reserved': 1},
+    PRIORITY_BULK: {'weight': 1, 'reserved': 0},
+}
+PRIORITY_CLASSES = getattr(settings, 'TRANSLATION_PRIORITY_CLASSES', DEFAULT_PRIORITY_CLASSES)
+SHARED_WORKERS = getattr(settings, 'TRANSLATION_SHARED_WORKERS', 4)
+LATENCY_WINDOW = 1000  # nombre de mesures conservées par classe
+
+
+def resolve_priority(request, data: Optional[Dict] = None) -> str:
+    """
+    Classe de priorité : clé d'API d'abord, puis champ ``priority``, puis en-tête
+    ``X-Translation-Priority``, sinon ``standard``.
+    """
+    api_key = request.headers.get(API_KEY_HEADER)
+    key_priorities = getattr(settings, 'API_KEY_PRIORITIES', {})
+    if api_key and api_key in key_priorities:
+        return key_priorities[api_key]
+    requested = str((data or {}).get('priority') or request.headers.get(PRIORITY_HEADER, '')).strip().lower()
+    return requested if requested in PRIORITY_CLASSES else DEFAULT_PRIORITY
+
+
+def _percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _PriorityClass:
+    def __init__(self, name: str, weight: int):
+        self.name = name
+        self.weight = weight
+        self.queue = deque()
+        self.pass_value = 0.0
+        self.wait_times = deque(maxlen=LATENCY_WINDOW)
+        self.run_times = deque(maxlen=LATENCY_WINDOW)
+        self.completed = 0
+
+
+class PriorityExecutor:
+    """Pool de threads à files multiples, partagé par toutes les requêtes du processus."""
+
+    def __init__(self, classes: Dict[str, dict] = None, shared_workers: int = SHARED_WORKERS):
+        self.config = classes or PRIORITY_CLASSES
+        self.shared_workers = shared_workers
+        self.classes = {name: _PriorityClass(name, conf['weight']) for name, conf in self.config.items()}
+        self._condition = threading.Condition()
+        self._pid = None
+
+    def _ensure_started(self):
+        # Les threads ne survivent pas au fork : démarrage paresseux par processus
+        if self._pid == os.getpid():
+            return
+        with self._condition:
+            if self._pid == os.getpid():
+                return
+            for name, conf in self.config.items():
+                for index in range(conf['reserved']):
+                    self._start_worker((name,), f'translate-{name}-{index}')
+            for index in range(self.shared_workers):
+                self._start_worker(tuple(self.classes), f'translate-shared-{index}')
+            self._pid = os.getpid()
+
+    def _start_worker(self, class_names: tuple, thread_name: str):
+        threading.Thread(target=self._work, args=(class_names,), name=thread_name, daemon=True).start()
+
+    def submit(self, priority: str, fn, *args, **kwargs) -> Future:
+        """Planifie ``fn`` dans la classe ``priority`` (contexte de la requête conservé)."""
+        self._ensure_started()
+        future = Future()
+        context = contextvars.copy_context()
+        with self._condition:
+            priority_class = self.classes.get(priority) or self.classes[DEFAULT_PRIORITY]
+            if not priority_class.queue:
+                # Une classe qui se réveille ne récupère pas le crédit de son inactivité
+                active = [c.pass_value for c in self.classes.values() if c.queue]
+                priority_class.pass_value = max(priority_class.pass_value, min(active, default=0.0))
+            priority_class.queue.append((future, context, fn, args, kwargs, perf_counter()))
+            self._condition.notify_all()
+        return future
+
+    def _next_task(self, class_names: tuple):
+        """Choisit la classe non vide de plus petite « passe » (file d'attente pondérée)."""
+        candidates = [self.classes[name] for name in class_names if self.classes[name].queue]
+        if not candidates:
+            return None, None
+        chosen = min(candidates, key=lambda c: c.pass_value)
+        chosen.pass_value += 1.0 / chosen.weight
+        return chosen, chosen.queue.popleft()
+
+    def _work(self, class_names: tuple):
+        while True:
+            with self._condition:
+                priority_class, task = self._next_task(class_names)
+                while task is None:
+                    self._condition.wait()
+                    priority_class, task = self._next_task(class_names)
+            future, context, fn, args, kwargs, enqueued = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            started = perf_counter()
+            try:
+                result = context.run(fn, *args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finished = perf_counter()
+            with self._condition:
+                priority_class.wait_times.append(started - enqueued)
+                priority_class.run_times.append(finished - started)
+                priority_class.completed += 1
+
+    def metrics(self) -> dict:
+        """Profondeur de file et latences (p50/p99, en ms) par classe."""
+        with self._condition:
+            return {
+                name: {
+                    'queued': len(c.queue),
+                    'completed': c.completed,
+                    'wait_p50_ms': round(_percentile(c.wait_times, 0.5) * 1000, 2),
+                    'wait_p99_ms': round(_percentile(c.wait_times, 0.99) * 1000, 2),
+                    'run_p50_ms': round(_percentile(c.run_times, 0.5) * 1000, 2),
+                    'run_p99_ms': round(_percentile(c.run_times, 0.99) * 1000, 2),
+                }
+                for name, c in self.classes.items()
+            }
+
+
+translation_executor = PriorityExecutor()
@@ -0,0 +1,312 @@
+"""
+Moteur de traduction local, exécuté sur CPU, pour les paires à fort volume.
+
+Chaque paire activée (``LOCAL_TRANSLATION_PAIRS``, ex. ``['fr-en', 'en-fr']``,
+appliquée aussi aux requêtes ``auto`` dont la langue détectée correspond)
+a son répertoire de modèle dans ``LOCAL_MODELS_DIR/<source>-<cible>/`` :
+
+- ``model.bin`` + ``source.spm`` / ``target.spm`` : modèle neuronal converti
+  pour CTranslate2, quantifié int8 (dépendances optionnelles ``ctranslate2`` et
+  ``sentencepiece``) ;
+- sinon ``phrases.tsv`` : table de phrases ``source<TAB>traduction``, traduite
+  par correspondance gloutonne des plus longues séquences de mots. Un texte
+  dont les mots couverts par la table sont moins de ``LOCAL_PHRASE_MIN_COVERAGE``
+  (tous par défaut) part vers le moteur distant plutôt que de rester à moitié
+  traduit.
+
+Les modèles sont chargés au premier usage et gardés dans un LRU
+(``LOCAL_MAX_LOADED_MODELS``). L'inférence tourne dans un pool de threads
+dimensionné sur le nombre de cœurs (``LOCAL_ENGINE_WORKERS``) ; chaque thread
+regroupe les requêtes en attente pour la même paire en un seul lot
+(``translate_batch``). Si aucun modèle n'est disponible pour la paire,
+``LocalEngineUnavailable`` est levée et l'appelant se replie sur le moteur
+distant.
+"""
+
+import logging
+import os
+import queue
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Constants
+LOCAL_TRANSLATION_PAIRS = frozenset(getattr(settings, 'LOCAL_TRANSLATION_PAIRS', ()))
+LOCAL_MODELS_DIR = getattr(
+    settings, 'LOCAL_MODELS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'local_models')
+)
+LOCAL_MAX_LOADED_MODELS = getattr(settings, 'LOCAL_MAX_LOADED_MODELS', 4)
+LOCAL_ENGINE_WORKERS = getattr(settings, 'LOCAL_ENGINE_WORKERS', os.cpu_count() or 1)
+LOCAL_BATCH_SIZE = 32  # segments par appel au modèle
+LOCAL_TIMEOUT = 30  # secondes
+LOCAL_PHRASE_MIN_COVERAGE = getattr(settings, 'LOCAL_PHRASE_MIN_COVERAGE', 1.0)  # part des mots traduits par la table
+
+_TOKEN_RE = re.compile(r'\w+|[^\w\s]+')
+
+
+class LocalEngineUnavailable(Exception):
+    """Pas de modèle local pour cette paire de langues."""
+
+
+def has_local_model(pair: str) -> bool:
+    """Modèle présent pour la paire et pas déjà écarté au chargement (``models.unavailable``)."""
+    if pair in models.unavailable:
+        return False
+    path = os.path.join(LOCAL_MODELS_DIR, pair)
+    return os.path.isfile(os.path.join(path, 'model.bin')) or os.path.isfile(os.path.join(path, 'phrases.tsv'))
+
+
+@lru_cache(maxsize=1024)
+def detect_source_language(text: str) -> str:
+    import langid
+
+    return langid.classify(text)[0]
+
+
+def resolve_local_pair(text: str, source_lang: str, target_lang: str) -> Optional[str]:
+    """
+    Paire locale qui traduira ``text`` (ex. ``'fr-en'``), sinon ``None`` (moteur
+    distant). Avec ``source_lang == 'auto'``, la langue est détectée d'abord
+    (langid) : ``'fr-en'`` s'applique aussi aux textes français en détection
+    automatique. La détection n'a lieu que si une paire locale vise ``target_lang``.
+    """
+    if source_lang == 'auto':
+        if not any(pair.endswith(f"-{target_lang}") for pair in LOCAL_TRANSLATION_PAIRS):
+            return None
+        source_lang = detect_source_language(text)
+    pair = f"{source_lang}-{target_lang}"
+    if pair in LOCAL_TRANSLATION_PAIRS and has_local_model(pair):
+        return pair
+    return None
+
+
+class PhraseTableEngine:
+    """Traduction par table de phrases : plus longue séquence de mots connue d'abord."""
+
+    def __init__(self, path: str):
+        self.phrases: Dict[tuple, str] = {}
+        self.max_words = 1
+        with open(path, encoding='utf-8') as source:
+            for line in source:
+                if not line.strip() or line.startswith('#') or '\t' not in line:
+                    continue
+                phrase, translation = line.rstrip('\n').split('\t', 1)
+                key = tuple(token.casefold() for token in _TOKEN_RE.findall(phrase))
+                if key:
+                    self.phrases[key] = translation
+                    self.max_words = max(self.max_words, len(key))
+
+    def translate_batch(self, texts: List[str]) -> List:
+        # Un texte mal couvert ne fait pas échouer les autres textes du lot
+        results = []
+        for text in texts:
+            try:
+                results.append(self._translate(text))
+            except LocalEngineUnavailable as e:
+                results.append(e)
+        return results
+
+    def _translate(self, text: str) -> str:
+        tokens = list(_TOKEN_RE.finditer(text))
+        keys = [token.group().casefold() for token in tokens]
+        # Mots à traduire ; nombres et ponctuation sont recopiés tels quels
+        words = sum(1 for key in keys if any(char.isalpha() for char in key))
+        unmatched = 0
+        output = []
+        position = 0  # position dans ``text`` jusqu'où la sortie est écrite
+        index = 0
+        while index < len(tokens):
+            for size in range(min(self.max_words, len(tokens) - index), 0, -1):
+                translation = self.phrases.get(tuple(keys[index:index + size]))
+                if translation is not None:
+                    break
+            else:
+                unmatched += any(char.isalpha() for char in keys[index])
+                index += 1
+                continue
+            start, end = tokens[index].start(), tokens[index + size - 1].end()
+            if tokens[index].group()[:1].isupper():
+                translation = translation[:1].upper() + translation[1:]
+            output.append(text[position:start])
+            output.append(translation)
+            position = end
+            index += size
+        if words and (words - unmatched) / words < LOCAL_PHRASE_MIN_COVERAGE:
+            raise LocalEngineUnavailable(f"Phrase table covers {words - unmatched} of {words} words")
+        output.append(text[position:])
+        return ''.join(output)
+
+
+class CTranslate2Engine:
+    """Modèle neuronal quantifié (int8) exécuté par CTranslate2 sur CPU."""
+
+    def __init__(self, path: str):
+        import ctranslate2
+        import sentencepiece
+
+        self.translator = ctranslate2.Translator(
+            path, device='cpu', compute_type='int8',
+            inter_threads=LOCAL_ENGINE_WORKERS, intra_threads=1
+        )
+        self.source_tokenizer = sentencepiece.SentencePieceProcessor(model_file=os.path.join(path, 'source.spm'))
+        self.target_tokenizer = sentencepiece.SentencePieceProcessor(model_file=os.path.join(path, 'target.spm'))
+
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        tokens = self.source_tokenizer.encode(texts, out_type=str)
+        results = self.translator.translate_batch(tokens, max_batch_size=LOCAL_BATCH_SIZE, beam_size=2)
+        return [self.target_tokenizer.decode(result.hypotheses[0]) for result in results]
+
+
+def load_engine(pair: str):
+    """Charge le modèle de la paire depuis ``LOCAL_MODELS_DIR`` (neuronal d'abord, sinon table de phrases)."""
+    path = os.path.join(LOCAL_MODELS_DIR, pair)
+    if os.path.isfile(os.path.join(path, 'model.bin')):
+        try:
+            return CTranslate2Engine(path)
+        except ImportError:
+            logger.warning("ctranslate2/sentencepiece not installed, ignoring neural model for %s", pair)
+    if os.path.isfile(os.path.join(path, 'phrases.tsv')):
+        return PhraseTableEngine(os.path.join(path, 'phrases.tsv'))
+    raise LocalEngineUnavailable(f"No local model for {pair}")
+
+
+class _ModelCache:
+    """Modèles chargés, au plus ``LOCAL_MAX_LOADED_MODELS`` (le moins récemment utilisé est libéré)."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[str, threading.Lock] = {}
+        self.unavailable = set()  # paires dont le chargement a échoué : moteur distant
+
+    def get(self, pair: str):
+        with self._lock:
+            if pair in self._engines:
+                self._engines.move_to_end(pair)
+                return self._engines[pair]
+            pair_lock = self._loading.setdefault(pair, threading.Lock())
+        # Un seul chargement par paire, sans bloquer les autres paires
+        with pair_lock:
+            with self._lock:
+                if pair in self._engines:
+                    return self._engines[pair]
+            try:
+                engine = load_engine(pair)
+            except LocalEngineUnavailable:
+                self.unavailable.add(pair)
+                raise
+            with self._lock:
+                self._engines[pair] = engine
+                while len(self._engines) > self.capacity:
+                    evicted, _ = self._engines.popitem(last=False)
+                    logger.info("Local model evicted: %s", evicted)
+            return engine
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return list(self._engines)
+
+
+models = _ModelCache(LOCAL_MAX_LOADED_MODELS)
+
+
+class _Request:
+    __slots__ = ('pair', 'texts', 'future')
+
+    def __init__(self, pair: str, texts: List[str]):
+        self.pair = pair
+        self.texts = texts
+        self.future = Future()
+
+
+class _InferencePool:
+    """Threads d'inférence ; chacun regroupe les requêtes en attente de la même paire."""
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._queue = queue.Queue()
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Démarrage paresseux, et de nouveau après un fork (les threads ne survivent pas)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            for index in range(self.workers):
+                threading.Thread(target=self._run, name=f'local-engine-{index}', daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, pair: str, texts: List[str]) -> Future:
+        self._ensure_started()
+        request = _Request(pair, texts)
+        self._queue.put(request)
+        return request.future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0].texts)
+            others = []
+            while size < LOCAL_BATCH_SIZE:
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request.pair == batch[0].pair:
+                    batch.append(request)
+                    size += len(request.texts)
+                else:
+                    others.append(request)
+            for request in others:
+                self._queue.put(request)
+            self._translate(batch)
+
+    @staticmethod
+    def _translate(batch):
+        try:
+            engine = models.get(batch[0].pair)
+            results = iter(engine.translate_batch([text for request in batch for text in request.texts]))
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        for request in batch:
+            translations = [next(results) for _ in request.texts]
+            failure = next((result for result in translations if isinstance(result, Exception)), None)
+            if failure is not None:
+                request.future.set_exception(failure)
+            else:
+                request.future.set_result(translations)
+
+
+inference_pool = _InferencePool(LOCAL_ENGINE_WORKERS)
+
+
+def translate_local(text: str, source_lang: str, target_lang: str, timeout: Optional[float] = LOCAL_TIMEOUT) -> str:
+    """
+    Traduit ``text`` avec le modèle local de la paire (langue source détectée si
+    ``auto``) ; les lignes sont traduites en un seul lot. Lève
+    ``LocalEngineUnavailable`` si la paire n'a pas de modèle ou si la table de
+    phrases ne couvre pas assez le texte.
+    """
+    pair = resolve_local_pair(text, source_lang, target_lang)
+    if pair is None:
+        raise LocalEngineUnavailable(f"No local model for {source_lang}-{target_lang}")
+
+    lines = text.split('\n')
+    segments = [line.strip() for line in lines if line.strip()]
+    translations = iter(inference_pool.submit(pair, segments).result(timeout=timeout) if segments else ())
+    return '\n'.join(next(translations) if line.strip() else line for line in lines)
@@ -0,0 +1,208 @@
+"""
+Pipeline de logs non bloquant et structuré (JSON).
+
+- Les vues n'écrivent jamais elles-mêmes : ``NonBlockingQueueHandler`` dépose
+  l'enregistrement dans une file bornée, un thread d'écriture
+  (``QueueListener``) le formate et l'écrit.
+- Le formatage du message (``msg % args``) n'a lieu que dans ce thread, et
+  seulement si le niveau est actif (utiliser ``logger.info("... %s", valeur)``).
+- Chaque enregistrement porte le contexte de la requête (``request_id``,
+  ``endpoint``) et les champs passés via ``extra`` (``strategy``,
+  ``cache_tier``, ``duration_ms``...).
+- Les logs de succès marqués ``extra={'sampled': True}`` sont échantillonnés
+  (``LOG_SUCCESS_SAMPLE_RATE``) ; les erreurs ne sont jamais échantillonnées ni
+  perdues : si la file est pleine, l'appelant attend pour un WARNING ou plus.
+
+Réglages optionnels : ``LOG_PIPELINE_ENABLED``, ``LOG_QUEUE_SIZE``,
+``LOG_SUCCESS_SAMPLE_RATE``, ``LOG_LEVEL``.
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import uuid
+from datetime import datetime, timezone
+from functools import wraps
+from logging.handlers import QueueHandler, QueueListener
+
+from django.conf import settings
+
+# Constants
+LOG_QUEUE_SIZE = getattr(settings, 'LOG_QUEUE_SIZE', 10000)
+LOG_SUCCESS_SAMPLE_RATE = getattr(settings, 'LOG_SUCCESS_SAMPLE_RATE', 0.1)
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+# Attributs standards d'un LogRecord (tout le reste vient de ``extra``)
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_request_context = contextvars.ContextVar('request_context', default={})
+
+
+def bind_context(**fields):
+    """Ajoute des champs au contexte de log de la requête courante."""
+    _request_context.set({**_request_context.get(), **fields})
+
+
+def get_context() -> dict:
+    return _request_context.get()
+
+
+def with_request_context(view):
+    """
+    Décorateur de vue : associe un identifiant de requête (``X-Request-ID``
+    reçu ou généré) et le nom de l'endpoint à tous les logs émis pendant la vue.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        token = _request_context.set({'request_id': request_id[:64], 'endpoint': view.__name__})
+        try:
+            response = view(request, *args, **kwargs)
+        finally:
+            _request_context.reset(token)
+        response.headers[REQUEST_ID_HEADER] = request_id[:64]
+        return response
+    return wrapper
+
+
+class RequestContextFilter(logging.Filter):
+    """Copie le contexte de la requête sur l'enregistrement (dans le thread appelant)."""
+
+    def filter(self, record):
+        for key, value in _request_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class SuccessSamplingFilter(logging.Filter):
+    """Ne garde qu'une fraction des logs de succès à fort volume (``sampled=True``)."""
+
+    def __init__(self, rate: float = LOG_SUCCESS_SAMPLE_RATE):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not getattr(record, 'sampled', False):
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement."""
+
+    def format(self, record):
+        payload = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key != 'sampled':
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exception'] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Dépose les enregistrements dans une file bornée sans bloquer la requête.
+
+    Si la file est pleine, les logs INFO/DEBUG sont abandonnés (et comptés),
+    les WARNING et plus attendent une place : ils ne sont jamais perdus.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Pas de formatage ici : seul le thread d'écriture appelle getMessage()
+        record = copy.copy(record)
+        if record.exc_info:
+            # Les tracebacks référencent des frames : on les sérialise tout de suite
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        _listener.ensure_running()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record)
+            else:
+                self.dropped += 1
+
+
+class _Listener:
+    """Thread d'écriture, redémarré automatiquement après un fork."""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self.handlers = []
+        self._listener = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_running(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._listener is not None and self._pid is not None:
+                # Processus enfant : le thread du parent n'existe plus ici
+                self.queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+                _queue_handler.queue = self.queue
+            self._listener = QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def stop(self):
+        """Vide la file puis arrête le thread (fin de processus)."""
+        with self._lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+            self._pid = None
+
+
+_listener = _Listener()
+_queue_handler = NonBlockingQueueHandler(_listener.queue)
+
+
+def configure_logging():
+    """
+    Installe le pipeline sur le logger racine (sans effet si désactivé via
+    ``LOG_PIPELINE_ENABLED = False`` ou si ``LOGGING`` est défini).
+    """
+    root = logging.getLogger()
+    if _queue_handler in root.handlers:
+        return
+    if not getattr(settings, 'LOG_PIPELINE_ENABLED', True) or getattr(settings, 'LOGGING', None):
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        return
+
+    writer = logging.StreamHandler()
+    writer.setFormatter(JsonFormatter())
+    _listener.handlers = [writer]
+
+    _queue_handler.addFilter(RequestContextFilter())
+    _queue_handler.addFilter(SuccessSamplingFilter())
+    root.addHandler(_queue_handler)
+    root.setLevel(getattr(settings, 'LOG_LEVEL', logging.INFO))
+    atexit.register(_listener.stop)
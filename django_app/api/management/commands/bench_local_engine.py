@@ -0,0 +1,103 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.local_engine import LOCAL_ENGINE_WORKERS, LOCAL_TRANSLATION_PAIRS, models, translate_local
+from api.views import AfricanLanguageTranslationStrategy, GoogleTranslationStrategy, is_african_language
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le moteur local (latence, débit, chargement du modèle) et, avec --remote, "
+        "le compare au moteur distant : latence et proximité des traductions."
+    )
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument('--phrases', help="Fichier texte, une phrase par ligne")
+        source.add_argument('--from-templates', action='store_true', help="Textes extraits de front/templates")
+        parser.add_argument('--pairs', help="Paires source-cible séparées par des virgules (défaut LOCAL_TRANSLATION_PAIRS)")
+        parser.add_argument('--limit', type=int, default=200, help="Nombre de phrases mesurées")
+        parser.add_argument('--concurrency', type=int, default=LOCAL_ENGINE_WORKERS, help="Appels simultanés")
+        parser.add_argument('--remote', type=int, default=0, metavar='N',
+                            help="Compare aussi N phrases avec le moteur distant (appels réseau)")
+
+    def handle(self, *args, **options):
+        pairs = [pair.strip() for pair in (options['pairs'] or ','.join(sorted(LOCAL_TRANSLATION_PAIRS))).split(',')
+                 if pair.strip()]
+        if not pairs:
+            raise CommandError("Aucune paire : --pairs ou LOCAL_TRANSLATION_PAIRS")
+        phrases = self._load_phrases(options)[:options['limit']]
+
+        for pair in pairs:
+            source_lang, target_lang = pair.split('-', 1)
+            start = perf_counter()
+            models.get(pair)
+            self.stdout.write(f"{pair} : modèle chargé en {(perf_counter() - start) * 1000:.0f} ms")
+
+            latencies = []
+
+            def timed(text):
+                began = perf_counter()
+                result = translate_local(text, source_lang, target_lang)
+                latencies.append(perf_counter() - began)
+                return result
+
+            start = perf_counter()
+            with ThreadPoolExecutor(max_workers=max(1, options['concurrency'])) as executor:
+                local_results = list(executor.map(timed, phrases))
+            elapsed = perf_counter() - start
+            self.stdout.write(
+                f"  local : {len(phrases) / elapsed:.0f} phrases/s ({options['concurrency']} appels simultanés), "
+                f"p50 {_percentile(latencies, 0.5) * 1000:.1f} ms, p95 {_percentile(latencies, 0.95) * 1000:.1f} ms"
+            )
+
+            start = perf_counter()
+            translate_local('\n'.join(phrases), source_lang, target_lang)
+            self.stdout.write(f"  local, un seul lot : {len(phrases) / (perf_counter() - start):.0f} phrases/s")
+
+            if options['remote']:
+                self._compare_remote(phrases[:options['remote']], local_results, source_lang, target_lang)
+
+    def _compare_remote(self, phrases, local_results, source_lang, target_lang):
+        if is_african_language(source_lang) or is_african_language(target_lang):
+            remote = AfricanLanguageTranslationStrategy()
+        else:
+            remote = GoogleTranslationStrategy()
+        latencies, similarities, exact = [], [], 0
+        for phrase, local_result in zip(phrases, local_results):
+            start = perf_counter()
+            try:
+                remote_result = remote.translate(phrase, source_lang, target_lang)
+            except Exception as e:
+                self.stderr.write(f"  Échec distant : {e}")
+                continue
+            latencies.append(perf_counter() - start)
+            similarities.append(SequenceMatcher(None, local_result.casefold(), remote_result.casefold()).ratio())
+            exact += local_result.strip().casefold() == remote_result.strip().casefold()
+        if not latencies:
+            return
+        self.stdout.write(
+            f"  distant ({type(remote).__name__}) : p50 {_percentile(latencies, 0.5) * 1000:.0f} ms, "
+            f"p95 {_percentile(latencies, 0.95) * 1000:.0f} ms\n"
+            f"  proximité local/distant : {sum(similarities) / len(similarities):.0%} en moyenne, "
+            f"{exact / len(latencies):.0%} identiques ({len(latencies)} phrases)"
+        )
+
+    def _load_phrases(self, options):
+        if options['from_templates']:
+            from front.text_extraction import extract_template_strings
+
+            return extract_template_strings()
+        if not os.path.isfile(options['phrases']):
+            raise CommandError(f"Fichier introuvable : {options['phrases']}")
+        with open(options['phrases'], encoding='utf-8') as source:
+            return [line.strip() for line in source if line.strip()]
@@ -0,0 +1,88 @@
+import random
+from time import perf_counter
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from api.sharded_cache import HashRing, ShardedCache
+
+
+class FlakyNode:
+    """Nœud de cache local dont on peut simuler la panne."""
+
+    def __init__(self, name: str):
+        self.backend = LocMemCache(name, {'OPTIONS': {'MAX_ENTRIES': 10 ** 7}})
+        self.down = False
+
+    def __getattr__(self, name):
+        if self.down:
+            raise ConnectionError("node down")
+        return getattr(self.backend, name)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le cache de traduction réparti sur des nœuds locaux : répartition des clés, "
+        "clés déplacées à l'ajout d'un nœud, taux de succès et latence quand des nœuds tombent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nodes', type=int, default=4, help="Nombre de nœuds (défaut 4)")
+        parser.add_argument('--replicas', type=int, default=2, help="Répliques par entrée (défaut 2)")
+        parser.add_argument('--keys', type=int, default=20000, help="Entrées en cache")
+        parser.add_argument('--reads', type=int, default=20000, help="Lectures par scénario")
+        parser.add_argument('--batch', type=int, default=50, help="Clés par get_many")
+
+    def handle(self, *args, **options):
+        names = [f"node{index}" for index in range(options['nodes'])]
+        keys = [f"trans_{index:08x}_en" for index in range(options['keys'])]
+
+        ring = HashRing(names)
+        owners = {}
+        for key in keys:
+            owners.setdefault(ring.preference_list(key, 1)[0], []).append(key)
+        shares = ', '.join(f"{name} {len(owners.get(name, [])) / len(keys):.1%}" for name in names)
+        self.stdout.write(f"Répartition des clés : {shares}")
+
+        grown = HashRing(names + [f"node{len(names)}"])
+        moved = sum(ring.preference_list(key, 1) != grown.preference_list(key, 1) for key in keys)
+        self.stdout.write(
+            f"Ajout d'un nœud : {moved / len(keys):.1%} des clés déplacées (idéal {1 / (len(names) + 1):.1%}, "
+            f"hachage modulo ~{len(names) / (len(names) + 1):.0%})"
+        )
+
+        nodes = {name: FlakyNode(name) for name in names}
+        # Nœuds en panne écartés pour toute la durée d'un scénario
+        cache = ShardedCache(nodes, replicas=options['replicas'], retry_interval=3600)
+        cache.set_many({key: key for key in keys}, None)
+
+        rng = random.Random(42)
+        for failed in range(len(names)):
+            for index, node in enumerate(nodes.values()):
+                node.down = index < failed
+            cache._down_until.clear()
+            self._measure(cache, keys, rng, options, f"{failed} nœud(s) en panne")
+
+    def _measure(self, cache, keys, rng, options, label):
+        hits = 0
+        single = []
+        for _ in range(options['reads']):
+            key = rng.choice(keys)
+            start = perf_counter()
+            hits += cache.get(key) is not None
+            single.append(perf_counter() - start)
+        single.sort()
+
+        batch_hits = batch_total = 0
+        start = perf_counter()
+        for _ in range(max(1, options['reads'] // options['batch'])):
+            batch = rng.sample(keys, options['batch'])
+            batch_hits += len(cache.get_many(batch))
+            batch_total += len(batch)
+        batch_elapsed = perf_counter() - start
+
+        self.stdout.write(
+            f"{label:<20} get : {hits / options['reads']:6.1%} succès, "
+            f"p50 {single[len(single) // 2] * 1e6:.0f} µs, p99 {single[int(len(single) * 0.99)] * 1e6:.0f} µs ; "
+            f"get_many : {batch_hits / batch_total:6.1%} succès, {batch_total / batch_elapsed:.0f} clés/s"
+        )
@@ -0,0 +1,80 @@
+import os
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.phrase_table import PHRASE_TABLE_PATH, PhraseTable, write_phrase_table
+
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile la table de phrases projetée en mémoire par les workers, à partir des "
+        "catalogues du site (localize_site) et/ou d'un fichier de phrases à traduire."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from-catalogs', action='store_true', help="Catalogues front/locale_catalogs/*.json")
+        parser.add_argument('--phrases', help="Fichier texte, une phrase par ligne (traduites si absentes du cache)")
+        parser.add_argument('--languages', help="Langues cibles pour --phrases, séparées par des virgules")
+        parser.add_argument('--source-language', default='auto')
+        parser.add_argument('--output', default=PHRASE_TABLE_PATH, help="Fichier produit (défaut PHRASE_TABLE_PATH)")
+
+    def handle(self, *args, **options):
+        if not options['from_catalogs'] and not options['phrases']:
+            raise CommandError("Indiquer --from-catalogs et/ou --phrases")
+        if options['phrases'] and not options['languages']:
+            raise CommandError("--phrases nécessite --languages")
+
+        entries = {}
+        if options['from_catalogs']:
+            entries.update(self._catalog_entries())
+        if options['phrases']:
+            entries.update(self._phrase_entries(options))
+
+        count = write_phrase_table(
+            options['output'],
+            ((text, language, translation) for (text, language), translation in entries.items())
+        )
+        size = os.path.getsize(options['output'])
+        self.stdout.write(self.style.SUCCESS(f"{count} entrées, {size / 1024:.0f} Ko -> {options['output']}"))
+        if entries:
+            self._measure(options['output'], list(entries)[:1000])
+
+    def _catalog_entries(self):
+        from front.localization import load_catalog, localized_languages
+
+        entries = {}
+        for language in localized_languages():
+            for text, translation in load_catalog(language).items():
+                entries[(text, language)] = translation
+        self.stdout.write(f"Catalogues : {len(entries)} traductions")
+        return entries
+
+    def _phrase_entries(self, options):
+        from api.views import normalize_language_code, translate_segments
+
+        if not os.path.isfile(options['phrases']):
+            raise CommandError(f"Fichier introuvable : {options['phrases']}")
+        with open(options['phrases'], encoding='utf-8') as source:
+            phrases = list(dict.fromkeys(line.strip() for line in source if line.strip()))
+
+        source_language = normalize_language_code(options['source_language'])
+        entries = {}
+        for language in (normalize_language_code(code) for code in options['languages'].split(',') if code.strip()):
+            for start in range(0, len(phrases), BATCH_SIZE):
+                translations, _ = translate_segments(
+                    phrases[start:start + BATCH_SIZE], source_language, language, 'bulk', pack=True
+                )
+                entries.update(((text, language), translation) for text, translation in translations.items())
+            self.stdout.write(f"{language} : {len(phrases)} phrases")
+        return entries
+
+    def _measure(self, path, keys):
+        table = PhraseTable(path)
+        start = perf_counter()
+        for text, language in keys:
+            table.get(text, language)
+        elapsed = (perf_counter() - start) / len(keys)
+        self.stdout.write(f"Recherche : {elapsed * 1e6:.1f} µs par phrase ({table.count} entrées)")
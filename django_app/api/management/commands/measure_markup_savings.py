@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from api.markup import FORMAT_HTML, parse_document, text_nodes
+from front.text_extraction import list_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure, sur les pages du site, le volume envoyé au service de traduction "
+        "en mode format=html par rapport à la traduction du HTML complet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--templates', help="Templates à mesurer, séparés par des virgules (défaut : toutes les pages)")
+
+    def handle(self, *args, **options):
+        if options['templates']:
+            templates = [name.strip() for name in options['templates'].split(',') if name.strip()]
+        else:
+            templates = [name for name in list_templates() if not name.startswith('includes/') and name != 'base.html']
+
+        request = RequestFactory().get('/')
+        total_input = total_text = 0
+        site_nodes = {}
+
+        for name in templates:
+            try:
+                page = render_to_string(name, request=request)
+            except Exception as e:
+                self.stderr.write(f"{name} : rendu impossible ({e})")
+                continue
+            nodes = text_nodes(parse_document(page, FORMAT_HTML))
+            text_characters = sum(len(text) for text in nodes)
+            total_input += len(page)
+            total_text += text_characters
+            site_nodes.update(dict.fromkeys(nodes))
+            self.stdout.write(
+                f"{name:<40} {len(page):>8} car. HTML -> {text_characters:>7} car. de texte "
+                f"({self._reduction(len(page), text_characters)})"
+            )
+
+        site_characters = sum(len(text) for text in site_nodes)
+        self.stdout.write(self.style.SUCCESS(
+            f"Total : {total_input} car. HTML, {total_text} car. de texte par page "
+            f"({self._reduction(total_input, total_text)}), {site_characters} car. après déduplication "
+            f"entre pages ({self._reduction(total_input, site_characters)})"
+        ))
+
+    @staticmethod
+    def _reduction(before, after):
+        if not before:
+            return "-"
+        return f"-{100 * (before - after) / before:.0f} %"
@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+# Script exécuté dans un processus neuf pour chaque scénario mesuré
+PROBE_SCRIPT = r'''
+import json, os, sys
+from time import perf_counter
+
+def memory():
+    """RSS et mémoire privée (non partagée) du processus courant, en Mo."""
+    values = {}
+    try:
+        with open('/proc/self/smaps_rollup') as smaps:
+            for line in smaps:
+                key, _, rest = line.partition(':')
+                if key in ('Rss', 'Private_Clean', 'Private_Dirty'):
+                    values[key] = int(rest.split()[0]) / 1024
+    except OSError:
+        import resource
+        values['Rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        'rss_mb': round(values.get('Rss', 0), 1),
+        'private_mb': round(values.get('Private_Clean', 0) + values.get('Private_Dirty', 0), 1),
+    }
+
+scenario = sys.argv[1]
+result = {}
+start = perf_counter()
+import django
+django.setup()
+import api.views
+if scenario == 'eager':
+    import deep_translator, langid, requests
+result['import_seconds'] = round(perf_counter() - start, 3)
+
+if scenario == 'warm':
+    from api.startup import warm_up
+    start = perf_counter()
+    warm_up()
+    result['warm_up_seconds'] = round(perf_counter() - start, 3)
+
+result['master'] = memory()
+
+# Simule un worker : fork puis première détection de langue
+read_fd, write_fd = os.pipe()
+pid = os.fork()
+if pid == 0:
+    import langid
+    start = perf_counter()
+    langid.classify("Bonjour tout le monde")
+    worker = {'first_request_seconds': round(perf_counter() - start, 3)}
+    worker.update(memory())
+    os.write(write_fd, json.dumps(worker).encode())
+    os._exit(0)
+os.close(write_fd)
+os.waitpid(pid, 0)
+result['worker'] = json.loads(os.read(read_fd, 65536).decode())
+print(json.dumps(result))
+'''
+
+SCENARIOS = (
+    ('eager', "Imports lourds au chargement (ancien comportement)"),
+    ('lazy', "Imports paresseux, sans préchauffage"),
+    ('warm', "Imports paresseux + warm_up() avant le fork"),
+)
+
+
+class Command(BaseCommand):
+    help = "Mesure le temps d'import, la latence de la première requête et la RSS par worker."
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.getcwd(), env.get('PYTHONPATH')]))
+
+        for scenario, label in SCENARIOS:
+            completed = subprocess.run(
+                [sys.executable, '-c', PROBE_SCRIPT, scenario],
+                capture_output=True, text=True, env=env
+            )
+            if completed.returncode != 0:
+                self.stderr.write(f"{scenario}: échec\n{completed.stderr}")
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            worker = result['worker']
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(
+                f"  import: {result['import_seconds']}s"
+                f" | warm-up: {result.get('warm_up_seconds', '-')}s"
+                f" | maître RSS: {result['master']['rss_mb']} Mo"
+            )
+            self.stdout.write(
+                f"  worker: première requête {worker['first_request_seconds']}s"
+                f" | RSS {worker['rss_mb']} Mo | privée {worker['private_mb']} Mo"
+            )
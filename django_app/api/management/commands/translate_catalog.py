@@ -0,0 +1,67 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.catalogs import (
+    CATALOG_BATCH_SIZE,
+    CatalogFormatError,
+    detect_catalog_format,
+    localized_catalog_name,
+    translate_catalog_file,
+)
+from api.views import AFRICAN_LANGUAGES, LANGUAGE_NAMES, catalog_translator, normalize_language_code
+
+
+class Command(BaseCommand):
+    help = (
+        "Traduit un catalogue de messages (.po ou JSON) vers une ou plusieurs langues. "
+        "Les entrées déjà traduites ou en cache ne sont pas renvoyées au service de traduction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('catalog', help="Fichier .po ou .json")
+        parser.add_argument('--languages', required=True, help="Codes de langue séparés par des virgules")
+        parser.add_argument('--source-language', default='auto')
+        parser.add_argument('--format', choices=['po', 'json'], help="Format (défaut : d'après l'extension)")
+        parser.add_argument('--output-dir', help="Dossier de sortie (défaut : celui du catalogue)")
+        parser.add_argument('--batch-size', type=int, default=CATALOG_BATCH_SIZE, help="Textes traduits par fenêtre")
+        parser.add_argument('--priority', default='bulk', help="Classe de priorité (défaut bulk)")
+
+    def handle(self, *args, **options):
+        path = options['catalog']
+        if not os.path.isfile(path):
+            raise CommandError(f"Fichier introuvable : {path}")
+        try:
+            catalog_format = options['format'] or detect_catalog_format(path)
+        except CatalogFormatError as e:
+            raise CommandError(str(e))
+
+        languages = [normalize_language_code(code.strip().lower()) for code in options['languages'].split(',') if code.strip()]
+        unknown = [code for code in languages if code not in LANGUAGE_NAMES and code not in AFRICAN_LANGUAGES]
+        if unknown:
+            raise CommandError(f"Langues non supportées : {', '.join(unknown)}")
+
+        output_dir = options['output_dir'] or os.path.dirname(os.path.abspath(path))
+        os.makedirs(output_dir, exist_ok=True)
+        source_language = normalize_language_code(options['source_language'])
+
+        with open(path, 'rb') as source:
+            for language in languages:
+                target_path = os.path.join(output_dir, localized_catalog_name(path, language))
+                # Écriture dans un fichier temporaire puis remplacement atomique
+                with tempfile.NamedTemporaryFile(dir=output_dir, delete=False) as output:
+                    try:
+                        stats = translate_catalog_file(
+                            source, output, catalog_format, language,
+                            catalog_translator(source_language, language, options['priority']),
+                            max(1, options['batch_size'])
+                        )
+                    except Exception:
+                        os.unlink(output.name)
+                        raise
+                os.replace(output.name, target_path)
+                self.stdout.write(self.style.SUCCESS(
+                    f"{language} : {stats['translated_units']}/{stats['units']} entrées à traduire, "
+                    f"{stats['texts']} textes uniques -> {target_path}"
+                ))
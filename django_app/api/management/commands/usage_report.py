@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from api.usage import flush_usage, hot_pairs, hot_phrases, prune_usage_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Affiche les paires de langues et les phrases les plus demandées (statistiques "
+        "d'utilisation), et supprime éventuellement les anciens événements."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help="Période analysée (défaut 24 h)")
+        parser.add_argument('--limit', type=int, default=10, help="Nombre de lignes par tableau")
+        parser.add_argument('--prune-days', type=int, help="Supprime les événements plus anciens (agrégats conservés)")
+
+    def handle(self, *args, **options):
+        flush_usage()
+        if options['prune_days'] is not None:
+            deleted = prune_usage_events(options['prune_days'])
+            self.stdout.write(f"{deleted} événements supprimés")
+
+        self.stdout.write(f"Paires les plus demandées ({options['hours']} h) :")
+        self.stdout.write(f"{'paire':<16} {'requêtes':>9} {'caractères':>11} {'cache':>7} {'latence moy.':>13} {'max':>9}")
+        for pair in hot_pairs(options['limit'], options['hours']):
+            self.stdout.write(
+                f"{pair['source_language'] + ' -> ' + pair['target_language']:<16} {pair['requests']:>9} "
+                f"{pair['characters']:>11} {pair['cache_hit_rate']:>6.0%} "
+                f"{pair['average_duration_ms']:>10.1f} ms {pair['max_duration_ms']:>6.0f} ms"
+            )
+
+        self.stdout.write(f"\nPhrases les plus demandées ({options['hours']} h) :")
+        for phrase in hot_phrases(options['limit'], options['hours']):
+            self.stdout.write(f"{phrase['requests']:>6}  {phrase['target_language']:<6} {phrase['phrase'][:60]}")
@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from time import monotonic
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.masking import has_translatable_text, mask_text, unmask_text
+from api.translation_cache import (
+    CACHE_TIMEOUT,
+    get_many_cached_translations,
+    set_cached_translation,
+    text_digest,
+)
+from api.upstream import UPSTREAM_LIMITS
+from api.views import (
+    AFRICAN_LANGUAGES,
+    LANGUAGE_NAMES,
+    build_translation_response,
+    is_african_language,
+    normalize_language_code,
+    perform_translation,
+)
+
+# Latence moyenne observée par appel (secondes), pour l'estimation --dry-run
+ESTIMATED_LATENCY = {'google': 0.5, 'african': 6.0}
+PROGRESS_EVERY = 50
+
+
+class Command(BaseCommand):
+    help = (
+        "Préchauffe le cache de traduction : traduit une liste de phrases (fichier ou "
+        "textes des templates du site) dans un ensemble de langues."
+    )
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument('--phrases', help="Fichier texte, une phrase par ligne")
+        source.add_argument('--from-templates', action='store_true', help="Textes extraits de front/templates")
+        source.add_argument(
+            '--from-usage', type=int, metavar='N', help="Les N phrases les plus demandées sur 24 h (api/usage.py)"
+        )
+        parser.add_argument(
+            '--languages', default='all',
+            help="'all' (LANGUAGE_NAMES), 'african' (AFRICAN_LANGUAGES), 'usage' (paires les plus demandées) "
+                 "ou liste de codes séparés par des virgules"
+        )
+        parser.add_argument('--source-language', default='auto')
+        parser.add_argument('--concurrency', type=int, default=4, help="Traductions simultanées (défaut 4)")
+        parser.add_argument('--checkpoint', help="Fichier de reprise (JSON lines) ; relancer reprend où l'on s'est arrêté")
+        parser.add_argument('--ttl', type=int, default=CACHE_TIMEOUT, help="Durée de vie des entrées (secondes)")
+        parser.add_argument('--dry-run', action='store_true', help="Estime le volume et la durée sans rien traduire")
+
+    def handle(self, *args, **options):
+        phrases = self._load_phrases(options)
+        languages = self._resolve_languages(options['languages'])
+        source_language = normalize_language_code(options['source_language'])
+        done = self._load_checkpoint(options['checkpoint'])
+
+        pending = []
+        for target in languages:
+            cached = get_many_cached_translations(phrases, target)
+            pending.extend(
+                (phrase, target) for phrase in phrases
+                if phrase not in cached and (text_digest(phrase), target) not in done
+            )
+        total_pairs = len(phrases) * len(languages)
+        self.stdout.write(
+            f"{len(phrases)} phrases x {len(languages)} langues = {total_pairs} traductions, "
+            f"{total_pairs - len(pending)} déjà en cache ou faites, {len(pending)} à traduire"
+        )
+
+        if options['dry_run']:
+            self._estimate(pending, options['concurrency'])
+            return
+        if pending:
+            self._translate_all(pending, source_language, options)
+
+    def _load_phrases(self, options):
+        if options['from_templates']:
+            from front.text_extraction import extract_template_strings
+
+            phrases = extract_template_strings()
+        elif options['from_usage']:
+            from api.usage import USAGE_CAPTURE_PHRASES, hot_phrases
+
+            if not USAGE_CAPTURE_PHRASES:
+                raise CommandError("--from-usage nécessite USAGE_CAPTURE_PHRASES = True")
+            phrases = [item['phrase'] for item in hot_phrases(options['from_usage'])]
+        elif not os.path.isfile(options['phrases']):
+            raise CommandError(f"Fichier introuvable : {options['phrases']}")
+        else:
+            with open(options['phrases'], encoding='utf-8') as source:
+                phrases = [line.strip() for line in source if line.strip()]
+        # Le cache est indexé par texte masqué (URL, nombres, glossaire -> marqueurs)
+        templates = (mask_text(phrase).text for phrase in phrases)
+        return list(dict.fromkeys(template for template in templates if has_translatable_text(template)))
+
+    def _resolve_languages(self, value):
+        if value == 'all':
+            # Clés de cache indexées par le code normalisé, comme dans validate_request_data
+            languages = (normalize_language_code(code) for code in LANGUAGE_NAMES if code not in ('auto', 'unknown'))
+            return [
+                code for code in dict.fromkeys(languages)
+                if code in LANGUAGE_NAMES or code in AFRICAN_LANGUAGES
+            ]
+        if value == 'african':
+            return list(AFRICAN_LANGUAGES)
+        if value == 'usage':
+            from api.usage import hot_pairs
+
+            return list(dict.fromkeys(pair['target_language'] for pair in hot_pairs()))
+        languages = [normalize_language_code(code) for code in value.split(',') if code.strip()]
+        unknown = [code for code in languages if code not in LANGUAGE_NAMES]
+        if unknown:
+            raise CommandError(f"Langues non supportées : {', '.join(unknown)}")
+        return languages
+
+    def _load_checkpoint(self, path):
+        done = set()
+        if path and os.path.isfile(path):
+            with open(path, encoding='utf-8') as checkpoint:
+                for line in checkpoint:
+                    entry = json.loads(line)
+                    done.add((entry['digest'], entry['target']))
+        return done
+
+    def _estimate(self, pending, concurrency):
+        calls = {'google': 0, 'african': 0}
+        characters = 0
+        for phrase, target in pending:
+            calls['african' if is_african_language(target) else 'google'] += 1
+            characters += len(phrase)
+        # Durée bornée par la latence (concurrence) et par le débit autorisé en amont
+        latency_bound = sum(calls[kind] * ESTIMATED_LATENCY[kind] for kind in calls) / max(1, concurrency)
+        rate_bound = max(
+            calls['google'] / UPSTREAM_LIMITS['google']['rate'],
+            calls['african'] / UPSTREAM_LIMITS['languesafrique']['rate'],
+        )
+        self.stdout.write(
+            f"Appels amont : {calls['google']} Google, {calls['african']} langues africaines (2 requêtes chacun)\n"
+            f"Caractères envoyés : {characters}\n"
+            f"Durée estimée : {max(latency_bound, rate_bound) / 60:.1f} min"
+        )
+
+    def _translate_all(self, pending, source_language, options):
+        checkpoint = open(options['checkpoint'], 'a', encoding='utf-8') if options['checkpoint'] else None
+        checkpoint_lock = threading.Lock()
+        completed = failed = 0
+        started = monotonic()
+
+        def translate(phrase, target):
+            translated = perform_translation(phrase, source_language, target)
+            # Comme translate_segments : une traduction qui a perdu un marqueur n'est pas mise en cache
+            if unmask_text(translated, mask_text(phrase).spans) is None:
+                raise ValueError(f"placeholders lost in {target} translation of {phrase[:40]!r}")
+            set_cached_translation(
+                phrase, target,
+                build_translation_response(phrase, source_language, target, translated),
+                options['ttl']
+            )
+            if checkpoint:
+                with checkpoint_lock:
+                    checkpoint.write(json.dumps({'digest': text_digest(phrase), 'target': target}) + '\n')
+                    checkpoint.flush()
+
+        # Fenêtre glissante : au plus 2 x concurrency tâches en mémoire
+        concurrency = max(1, options['concurrency'])
+        tasks = iter(pending)
+        in_flight = set()
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                while True:
+                    for phrase, target in tasks:
+                        in_flight.add(executor.submit(translate, phrase, target))
+                        if len(in_flight) >= 2 * concurrency:
+                            break
+                    if not in_flight:
+                        break
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        if future.exception() is not None:
+                            failed += 1
+                            self.stderr.write(f"Échec : {future.exception()}")
+                        else:
+                            completed += 1
+                        if (completed + failed) % PROGRESS_EVERY == 0:
+                            self._progress(completed, failed, len(pending), started)
+        except KeyboardInterrupt:
+            self.stderr.write("Interrompu : relancer avec le même --checkpoint pour reprendre.")
+            raise
+        finally:
+            if checkpoint:
+                checkpoint.close()
+
+        self._progress(completed, failed, len(pending), started)
+        self.stdout.write(self.style.SUCCESS(f"Terminé : {completed} traductions en cache, {failed} échecs"))
+
+    def _progress(self, completed, failed, total, started):
+        elapsed = monotonic() - started
+        processed = completed + failed
+        rate = processed / elapsed if elapsed else 0
+        remaining = (total - processed) / rate if rate else 0
+        self.stdout.write(
+            f"[{processed}/{total}] {rate:.1f} trad/s, {failed} échecs, reste ~{remaining / 60:.1f} min"
+        )
@@ -0,0 +1,137 @@
+"""
+Traduction de documents HTML ou Markdown en ne traduisant que les textes.
+
+Le document est découpé en une seule passe (``finditer`` sur la source, sans
+construire d'arbre) en une suite de morceaux : balisage conservé tel quel, ou
+nœud de texte à traduire. Les nœuds identiques ne sont traduits qu'une fois,
+puis chaque traduction est réinsérée à sa place dans la structure inchangée.
+"""
+
+import html
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple, Union
+
+# Constants
+FORMAT_TEXT = 'text'
+FORMAT_HTML = 'html'
+FORMAT_MARKDOWN = 'markdown'
+SUPPORTED_FORMATS = (FORMAT_TEXT, FORMAT_HTML, FORMAT_MARKDOWN)
+
+# HTML : balises, commentaires et contenus jamais traduits
+_HTML_MARKUP_RE = re.compile(
+    r'<(script|style|code|pre|textarea)\b.*?</\1\s*>'
+    r'|<!--.*?-->'
+    r'|<![^>]*>'
+    r'|<\?.*?\?>'
+    r'|<[^>]*>',
+    re.S | re.I
+)
+
+# Markdown : blocs de code, marqueurs de structure, code en ligne, URL, HTML brut
+_MARKDOWN_MARKUP_RE = re.compile(
+    r'^(?:```|~~~).*?^(?:```|~~~)[^\n]*$'     # bloc de code délimité
+    r'|^(?: {4}|\t)[^\n]*$'                   # bloc de code indenté
+    r'|^[ \t]{0,3}(?:#{1,6}[ \t]+|[-*+][ \t]+|\d+[.)][ \t]+|>[ \t]?)+'  # titres, listes, citations
+    r'|^[ \t]*(?:[-*_][ \t]*){3,}$'           # séparateurs
+    r'|^[ \t]*\|?(?:[ \t]*:?-+:?[ \t]*\|)+[ \t]*:?-*:?[ \t]*$'  # ligne de tableau
+    r'|`[^`\n]*`'                             # code en ligne
+    r'|!?\[|\]\([^)\n]*\)|\]\[[^\]\n]*\]|\]'   # liens et images (URL conservée)
+    r'|<[^>\n]+>'                             # autoliens et HTML
+    r'|https?://[^\s)]+'
+    r'|\*\*|__|\*|~~|\|'
+    r'|\n',                                   # une ligne = au plus un nœud
+    re.S | re.M
+)
+
+_LETTER_RE = re.compile(r'[^\W\d_]')
+
+
+class TextNode(NamedTuple):
+    text: str  # texte à traduire (sans espaces de bord, entités décodées)
+    leading: str
+    trailing: str
+
+
+Part = Union[str, TextNode]
+
+
+def _split(source: str, markup_re, unescape: bool) -> Iterator[Part]:
+    position = 0
+    for match in markup_re.finditer(source):
+        yield from _text_parts(source[position:match.start()], unescape)
+        yield match.group(0)
+        position = match.end()
+    yield from _text_parts(source[position:], unescape)
+
+
+def _text_parts(raw: str, unescape: bool) -> Iterator[Part]:
+    if not raw:
+        return
+    stripped = raw.strip()
+    if not stripped or not _LETTER_RE.search(stripped):
+        yield raw
+        return
+    start = raw.index(stripped)
+    text = html.unescape(stripped) if unescape else stripped
+    yield TextNode(text, raw[:start], raw[start + len(stripped):])
+
+
+def parse_document(source: str, document_format: str) -> List[Part]:
+    """Découpe ``source`` en morceaux de balisage et nœuds de texte."""
+    if document_format == FORMAT_HTML:
+        return list(_split(source, _HTML_MARKUP_RE, unescape=True))
+    if document_format == FORMAT_MARKDOWN:
+        return list(_split(source, _MARKDOWN_MARKUP_RE, unescape=False))
+    return list(_text_parts(source, unescape=False))
+
+
+def text_nodes(parts: Iterable[Part]) -> List[str]:
+    """Textes uniques à traduire, dans l'ordre d'apparition."""
+    return list(dict.fromkeys(part.text for part in parts if isinstance(part, TextNode)))
+
+
+def rebuild_document(parts: Iterable[Part], translations: Dict[str, str], document_format: str) -> str:
+    """Réassemble le document en remplaçant chaque nœud par sa traduction."""
+    output = []
+    for part in parts:
+        if not isinstance(part, TextNode):
+            output.append(part)
+            continue
+        translated = translations.get(part.text, part.text)
+        if document_format == FORMAT_HTML:
+            translated = html.escape(translated, quote=False)
+        output.append(f'{part.leading}{translated}{part.trailing}')
+    return ''.join(output)
+
+
+def translate_document(
+    source: str,
+    document_format: str,
+    translate_many: Callable[[List[str]], Dict[str, str]]
+) -> Tuple[str, dict]:
+    """
+    Traduit un document HTML/Markdown nœud par nœud.
+
+    Args:
+        source: document complet
+        document_format: ``html`` ou ``markdown``
+        translate_many: traduit une liste de textes uniques -> ``{texte: traduction}``
+
+    Returns:
+        (document traduit, statistiques de volume)
+    """
+    parts = parse_document(source, document_format)
+    unique_nodes = text_nodes(parts)
+    translations = translate_many(unique_nodes)
+    stats = {
+        'input_characters': len(source),
+        'text_nodes': sum(1 for part in parts if isinstance(part, TextNode)),
+        'unique_text_nodes': len(unique_nodes),
+        'text_characters': sum(len(text) for text in unique_nodes),
+    }
+    return rebuild_document(parts, translations, document_format), stats
+
+
+def document_text_length(source: str, document_format: str) -> int:
+    """Nombre de caractères réellement traduisibles (limite MAX_TEXT_LENGTH)."""
+    return sum(len(text) for text in text_nodes(parse_document(source, document_format)))
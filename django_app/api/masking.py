@@ -0,0 +1,169 @@
+"""
+Masquage des segments à ne pas traduire.
+
+Avant la recherche en cache et l'appel au service amont, les URL, adresses
+e-mail, nombres, extraits de code, variables de messages (printf ``%(name)s``,
+ICU ``{count, plural, ...}``, i18next ``{{name}}``) et termes du glossaire
+(noms de produits, marques : ``TRANSLATION_GLOSSARY``) sont remplacés par des marqueurs ``{0}``,
+``{1}``... puis restaurés dans la traduction. On envoie moins de caractères,
+ces segments ne sont plus déformés, et des messages qui ne diffèrent que par
+un nombre ou une URL partagent la même entrée de cache.
+
+Le glossaire est recherché en une seule passe par un automate d'Aho-Corasick.
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+
+# Constants
+DEFAULT_GLOSSARY = ('ESA Code', 'Esacode', 'Django')
+TRANSLATION_GLOSSARY = getattr(settings, 'TRANSLATION_GLOSSARY', DEFAULT_GLOSSARY)
+
+_PLACEHOLDER_RE = re.compile(r'\{\s*(\d+)\s*\}')
+_LETTER_RE = re.compile(r'[^\W\d_]')
+
+# Segments masqués par expression régulière (les marqueurs déjà présents dans le
+# texte sont masqués eux aussi pour ne pas être confondus avec les nôtres).
+# Pour les pluriels et sélecteurs ICU, seule la structure est masquée : le texte
+# de chaque cas reste traduit.
+_MASK_RE = re.compile(
+    r'`[^`\n]+`'                                         # code en ligne
+    r'|\b(?:https?|ftp)://[^\s<>"\')\]]+[^\s<>"\')\].,;:!?]'  # URL
+    r'|\bwww\.[^\s<>"\')\]]+[^\s<>"\')\].,;:!?]'
+    r'|\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b'                  # e-mail
+    r'|\{\s*\d+\s*\}'                                     # marqueur existant
+    r'|\{\{[^{}]+\}\}|\$t\([^()]*\)'                        # i18next : {{name}}, $t(key)
+    r'|%(?:\(\w+\)|\d+\$)?[-+#0]*(?:\d+|\*)?(?:\.\d+)?[sdifuxXeEgGcr%]'  # printf : %s, %(name)s, %1$d
+    r'|\{\s*\w+\s*,\s*(?:plural|selectordinal|select)\s*,(?:\s*offset:\s*\d+)?\s*=?\w+\s*\{\s*\#?'  # ICU : début
+    r'|\}\s*=?\w+\s*\{\s*\#?|\}\s*\}'                        # ICU : cas suivant, fin
+    r'|\{\s*[^\W\d]\w*\s*(?:,\s*(?:number|date|time|spellout|ordinal|duration)\s*(?:,[^{}]*)?)?\}'  # ICU : {name}
+    r'|(?<!\S)\#(?!\S)'                                    # ICU : nombre d'un pluriel
+    r'|(?<![\w.,])[-+]?\d+(?:[.,\s]\d{3})*(?:[.,]\d+)?%?(?![\w])'  # nombre
+)
+
+
+class MaskedText(NamedTuple):
+    text: str  # texte envoyé au cache et au service amont
+    spans: Tuple[str, ...]  # segments masqués, dans l'ordre des marqueurs
+
+
+class GlossaryMatcher:
+    """
+    Automate d'Aho-Corasick sur un ensemble de termes (insensible à la casse).
+    ``finditer`` retourne les occurrences les plus longues, sans chevauchement,
+    alignées sur des limites de mots.
+    """
+
+    def __init__(self, terms):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]  # longueurs des termes se terminant sur ce nœud
+        for term in terms:
+            if term.strip():
+                self._add(term.casefold())
+        self._build_failure_links()
+
+    def _add(self, term: str):
+        node = 0
+        for char in term:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(len(term))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def _iter_raw(self, text: str) -> Iterator[Tuple[int, int]]:
+        node = 0
+        for position, char in enumerate(text.casefold()):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length in self._output[node]:
+                yield position + 1 - length, position + 1
+
+    def finditer(self, text: str) -> List[Tuple[int, int]]:
+        if len(self._goto) == 1:
+            return []
+        candidates = sorted(
+            (start, end) for start, end in self._iter_raw(text)
+            if _is_word_boundary(text, start) and _is_word_boundary(text, end)
+        )
+        return _select_non_overlapping(candidates)
+
+
+def _is_word_boundary(text: str, index: int) -> bool:
+    if index <= 0 or index >= len(text):
+        return True
+    return not (text[index - 1].isalnum() and text[index].isalnum())
+
+
+def _select_non_overlapping(spans) -> List[Tuple[int, int]]:
+    """Garde, de gauche à droite, le segment le plus long à chaque position."""
+    selected = []
+    for start, end in sorted(spans, key=lambda span: (span[0], -span[1])):
+        if selected and start < selected[-1][1]:
+            continue
+        selected.append((start, end))
+    return selected
+
+
+@lru_cache(maxsize=1)
+def get_glossary_matcher() -> GlossaryMatcher:
+    return GlossaryMatcher(TRANSLATION_GLOSSARY)
+
+
+def mask_text(text: str) -> MaskedText:
+    """Remplace les segments à ne pas traduire par des marqueurs numérotés."""
+    spans = [match.span() for match in _MASK_RE.finditer(text)]
+    spans.extend(get_glossary_matcher().finditer(text))
+    if not spans:
+        return MaskedText(text, ())
+
+    parts = []
+    masked = []
+    position = 0
+    for start, end in _select_non_overlapping(spans):
+        parts.append(text[position:start])
+        parts.append('{%d}' % len(masked))
+        masked.append(text[start:end])
+        position = end
+    parts.append(text[position:])
+    return MaskedText(''.join(parts), tuple(masked))
+
+
+def has_translatable_text(masked_text: str) -> bool:
+    """Faux si le texte masqué ne contient plus que des marqueurs, chiffres ou ponctuation."""
+    return bool(_LETTER_RE.search(_PLACEHOLDER_RE.sub('', masked_text)))
+
+
+def unmask_text(translated: str, spans: Tuple[str, ...]) -> Optional[str]:
+    """
+    Restaure les segments masqués dans la traduction. Retourne ``None`` si le
+    service amont a perdu ou dupliqué un marqueur (la traduction est inutilisable).
+    """
+    if not spans:
+        return translated
+    found = [int(index) for index in _PLACEHOLDER_RE.findall(translated)]
+    if sorted(found) != list(range(len(spans))):
+        return None
+    return _PLACEHOLDER_RE.sub(lambda match: spans[int(match.group(1))], translated)
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('endpoint', models.CharField(max_length=32)),
+                ('source_language', models.CharField(max_length=16)),
+                ('target_language', models.CharField(blank=True, max_length=16)),
+                ('strategy', models.CharField(max_length=16)),
+                ('characters', models.PositiveIntegerField()),
+                ('cache_hit', models.BooleanField()),
+                ('duration_ms', models.FloatField()),
+                ('phrase', models.CharField(blank=True, max_length=200)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['phrase', 'target_language'], name='api_usageev_phrase_eabfa2_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('endpoint', models.CharField(max_length=32)),
+                ('source_language', models.CharField(max_length=16)),
+                ('target_language', models.CharField(blank=True, max_length=16)),
+                ('strategy', models.CharField(max_length=16)),
+                ('requests', models.PositiveIntegerField(default=0)),
+                ('characters', models.PositiveBigIntegerField(default=0)),
+                ('cache_hits', models.PositiveIntegerField(default=0)),
+                ('total_duration_ms', models.FloatField(default=0)),
+                ('max_duration_ms', models.FloatField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('hour', 'endpoint', 'source_language', 'target_language', 'strategy'), name='unique_usage_rollup')],
+            },
+        ),
+    ]
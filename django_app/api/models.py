@@ -1,3 +1,50 @@
 from django.db import models
 
-# Create your models here.
+
+class UsageEvent(models.Model):
+    """Un appel à l'API de traduction ou de détection (écrit par lots, voir api/usage.py)."""
+
+    created_at = models.DateTimeField(db_index=True)
+    endpoint = models.CharField(max_length=32)
+    source_language = models.CharField(max_length=16)
+    target_language = models.CharField(max_length=16, blank=True)
+    strategy = models.CharField(max_length=16)
+    characters = models.PositiveIntegerField()
+    cache_hit = models.BooleanField()
+    duration_ms = models.FloatField()
+    # Texte masqué (URL, nombres... remplacés), messages courts et USAGE_CAPTURE_PHRASES seulement
+    phrase = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['phrase', 'target_language'])]
+
+
+class UsageRollup(models.Model):
+    """Agrégat horaire par endpoint, paire de langues et stratégie."""
+
+    hour = models.DateTimeField()
+    endpoint = models.CharField(max_length=32)
+    source_language = models.CharField(max_length=16)
+    target_language = models.CharField(max_length=16, blank=True)
+    strategy = models.CharField(max_length=16)
+    requests = models.PositiveIntegerField(default=0)
+    characters = models.PositiveBigIntegerField(default=0)
+    cache_hits = models.PositiveIntegerField(default=0)
+    total_duration_ms = models.FloatField(default=0)
+    max_duration_ms = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['hour', 'endpoint', 'source_language', 'target_language', 'strategy'],
+                name='unique_usage_rollup',
+            )
+        ]
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cache_hits / self.requests if self.requests else 0.0
+
+    @property
+    def average_duration_ms(self) -> float:
+        return self.total_duration_ms / self.requests if self.requests else 0.0
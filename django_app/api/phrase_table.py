@@ -0,0 +1,164 @@
+"""
+Table de phrases compilée, en lecture seule et projetée en mémoire (mmap).
+
+Les phrases les plus demandées (textes de l'interface, extraits de la
+documentation) sont traduites hors ligne (``manage.py build_phrase_table``)
+dans un fichier immuable consulté par ``translate_text`` avant tout autre
+niveau de cache. Le fichier est projeté en mémoire avant le fork des workers :
+les pages sont partagées par tous les processus, sans copie par worker.
+
+Format (entiers big-endian) ::
+
+    en-tête   : magic (8 octets) | nombre d'entrées (u32) | position de l'index (u64)
+    données   : traductions UTF-8 concaténées
+    index     : entrées triées par clé : clé (2 x u64) | position (u64) | longueur (u32)
+
+La clé est le début du SHA-256 de ``langue cible + NUL + texte``. Une recherche
+est une dichotomie sur l'index avec ``struct.unpack_from`` directement dans le
+mmap. La reconstruction écrit un nouveau fichier puis le remplace
+atomiquement (``os.replace``) : les workers le reprojettent au prochain accès.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from time import monotonic
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Constants
+PHRASE_TABLE_PATH = getattr(
+    settings, 'PHRASE_TABLE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'phrase_table.bin')
+)
+PHRASE_TABLE_CHECK_INTERVAL = 2.0  # secondes entre deux vérifications du fichier
+
+MAGIC = b'ESAPHRT1'
+_header = struct.Struct('>8sIQ')
+_record = struct.Struct('>QQQI')
+_key = struct.Struct('>QQ')
+
+
+class PhraseTableError(Exception):
+    """Fichier de table de phrases invalide."""
+
+
+def phrase_key(text: str, target_language: str) -> Tuple[int, int]:
+    digest = hashlib.sha256(f"{target_language}\0{text}".encode('utf-8')).digest()
+    return _key.unpack_from(digest)
+
+
+class PhraseTable:
+    """Table de phrases projetée en mémoire (lecture seule)."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as table_file:
+            stat = os.fstat(table_file.fileno())
+            if stat.st_size < _header.size:
+                raise PhraseTableError(f"Phrase table too small: {path}")
+            self._map = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._index_offset = _header.unpack_from(self._map, 0)
+        if magic != MAGIC or self._index_offset + self.count * _record.size > len(self._map):
+            raise PhraseTableError(f"Invalid phrase table: {path}")
+        self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def get(self, text: str, target_language: str) -> Optional[str]:
+        key = phrase_key(text, target_language)
+        mapped, index_offset = self._map, self._index_offset
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if _key.unpack_from(mapped, index_offset + middle * _record.size) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count:
+            return None
+        first, second, offset, length = _record.unpack_from(mapped, index_offset + low * _record.size)
+        if (first, second) != key:
+            return None
+        return mapped[offset:offset + length].decode('utf-8')
+
+
+def write_phrase_table(path: str, entries: Iterable[Tuple[str, str, str]]) -> int:
+    """
+    Compile ``(texte, langue cible, traduction)`` dans ``path`` puis remplace
+    atomiquement l'ancien fichier. Retourne le nombre d'entrées.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    index = {}
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as output:
+        try:
+            output.write(_header.pack(MAGIC, 0, 0))
+            for text, target_language, translation in entries:
+                data = translation.encode('utf-8')
+                index[phrase_key(text, target_language)] = (output.tell(), len(data))
+                output.write(data)
+            index_offset = output.tell()
+            for key in sorted(index):
+                output.write(_record.pack(*key, *index[key]))
+            output.seek(0)
+            output.write(_header.pack(MAGIC, len(index), index_offset))
+            output.flush()
+            os.fsync(output.fileno())
+        except Exception:
+            os.unlink(output.name)
+            raise
+    os.chmod(output.name, 0o644)
+    os.replace(output.name, path)
+    return len(index)
+
+
+_lock = threading.Lock()
+_table: Optional[PhraseTable] = None
+_next_check = 0.0
+
+
+def get_phrase_table() -> Optional[PhraseTable]:
+    """
+    Table du processus courant, reprojetée si le fichier a été remplacé
+    (vérification au plus toutes les PHRASE_TABLE_CHECK_INTERVAL secondes).
+    """
+    global _table, _next_check
+    now = monotonic()
+    if now < _next_check:
+        return _table
+    with _lock:
+        if now < _next_check:
+            return _table
+        _next_check = now + PHRASE_TABLE_CHECK_INTERVAL
+        try:
+            stat = os.stat(PHRASE_TABLE_PATH)
+        except FileNotFoundError:
+            _table = None
+            return None
+        if _table is None or _table.identity != (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            try:
+                # L'ancienne projection reste valide pour les lectures en cours
+                _table = PhraseTable(PHRASE_TABLE_PATH)
+                logger.info("Phrase table mapped: %d entries", _table.count)
+            except (OSError, ValueError, PhraseTableError) as e:
+                logger.error("Phrase table unavailable: %s", e)
+                _table = None
+        return _table
+
+
+def lookup_phrases(texts, target_language: str) -> Dict[str, str]:
+    """Traductions présentes dans la table : ``{texte: traduction}``."""
+    table = get_phrase_table()
+    if table is None:
+        return {}
+    found = {}
+    for text in texts:
+        translation = table.get(text, target_language)
+        if translation is not None:
+            found[text] = translation
+    return found
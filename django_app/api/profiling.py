@@ -0,0 +1,183 @@
+"""
+Mesure du temps passé dans chaque phase d'une requête API.
+
+Toutes les requêtes décorées par ``profiled_view`` enregistrent la durée de leurs
+phases (``parse``, ``validate``, ``cache_lookup``, ``strategy``, chaque appel
+amont, ``serialize``...) et les renvoient dans l'en-tête ``Server-Timing``, sauf
+si la réponse peut être stockée par un cache partagé (``public``, ``s-maxage``).
+Le coût se limite à deux appels ``perf_counter()`` par phase.
+
+Les administrateurs (``X-Admin-Token`` + ``X-Debug-Mode: true``) peuvent en plus
+demander un profil de la requête via l'en-tête ``X-Profile`` :
+
+- ``X-Profile: cprofile`` : statistiques cProfile (30 fonctions les plus coûteuses) ;
+- ``X-Profile: flamegraph`` : piles échantillonnées au format « collapsed »
+  (``flamegraph.pl`` / speedscope), une pile par ligne suivie de son nombre
+  d'échantillons.
+
+Le profil est ajouté au corps JSON de la réponse sous la clé ``profile``.
+"""
+
+import contextvars
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+
+from django_app.compression import is_publicly_cacheable
+
+from .security import is_admin_request
+
+# Constants
+PROFILE_HEADER = 'X-Profile'
+PROFILE_SAMPLE_INTERVAL = 0.001  # secondes
+PROFILE_TOP_FUNCTIONS = 30
+
+_current_timer = contextvars.ContextVar('phase_timer', default=None)
+
+
+class PhaseTimer:
+    """Durées cumulées des phases d'une requête (ordre de première apparition)."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.phases = {}
+        self.threads = {threading.get_ident()}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, duration: float):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    def server_timing(self) -> str:
+        entries = [f'{name};dur={duration * 1000:.2f}' for name, duration in self.phases.items()]
+        entries.append(f'total;dur={(perf_counter() - self.started) * 1000:.2f}')
+        return ', '.join(entries)
+
+
+@contextmanager
+def _timed_phase(timer: PhaseTimer, name: str):
+    timer.threads.add(threading.get_ident())
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, perf_counter() - start)
+
+
+class _NoPhase:
+    """Contexte vide utilisé hors d'une requête profilée."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name: str):
+    """Mesure un bloc : ``with phase('cache_lookup'): ...``."""
+    timer = _current_timer.get()
+    if timer is None:
+        return _NO_PHASE
+    return _timed_phase(timer, name)
+
+
+def get_current_timer():
+    return _current_timer.get()
+
+
+class StackSampler:
+    """
+    Échantillonne à intervalle fixe les piles des threads ayant travaillé pour
+    la requête (thread de la requête et threads de traduction), au format collapsed.
+    """
+
+    def __init__(self, timer: PhaseTimer, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.timer = timer
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self.timer.threads):
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({code.co_filename.rsplit("/", 1)[-1]}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                if stack:
+                    self.samples[';'.join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def collapsed(self) -> str:
+        return '\n'.join(f'{stack} {count}' for stack, count in self.samples.most_common())
+
+
+def _run_profiled(mode: str, timer: PhaseTimer, view, request, args, kwargs):
+    """Exécute la vue sous le profileur demandé et retourne ``(réponse, profil)``."""
+    if mode == 'flamegraph':
+        with StackSampler(timer) as sampler:
+            response = view(request, *args, **kwargs)
+        return response, {'format': 'collapsed', 'data': sampler.collapsed()}
+
+    # cProfile ne suit que le thread de la requête ; le temps passé dans les
+    # threads de traduction apparaît comme attente sur le résultat
+    profiler = cProfile.Profile()
+    response = profiler.runcall(view, request, *args, **kwargs)
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+    return response, {'format': 'pstats', 'data': output.getvalue()}
+
+
+def profiled_view(view):
+    """
+    Décorateur de vue API : en-tête ``Server-Timing`` systématique et profil
+    à la demande pour les administrateurs.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        timer = PhaseTimer()
+        token = _current_timer.set(timer)
+        try:
+            mode = request.headers.get(PROFILE_HEADER, '').lower()
+            if mode in ('cprofile', 'flamegraph') and is_admin_request(request):
+                response, profile = _run_profiled(mode, timer, view, request, args, kwargs)
+                _attach_profile(response, profile)
+            else:
+                response = view(request, *args, **kwargs)
+        finally:
+            _current_timer.reset(token)
+        # Pas de temps par requête dans une réponse qu'un CDN resservira à d'autres clients
+        if not is_publicly_cacheable(response):
+            response.headers['Server-Timing'] = timer.server_timing()
+        return response
+    return wrapper
+
+
+def _attach_profile(response, profile: dict):
+    if response.get('Content-Type', '').startswith('application/json'):
+        payload = json.loads(response.content)
+        payload['profile'] = profile
+        response.content = json.dumps(payload)
@@ -0,0 +1,14 @@
+"""Reconnaissance des appelants privilégiés (jeton d'administration)."""
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+
+ADMIN_TOKEN = getattr(settings, 'ADMIN_TOKEN', 'votre_token_secret')
+
+
+def is_admin_request(request) -> bool:
+    """Vrai si la requête porte le jeton d'administration et active le mode debug."""
+    return (
+        constant_time_compare(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN) and
+        request.headers.get('X-Debug-Mode') == 'true'
+    )
@@ -0,0 +1,240 @@
+"""
+Cache de traduction réparti sur plusieurs nœuds (hachage cohérent).
+
+Avec ``TRANSLATION_CACHE_NODES = ['trans_a', 'trans_b', 'trans_c']`` (alias
+de ``CACHES``), chaque entrée est placée sur un anneau de hachage où chaque
+nœud occupe ``TRANSLATION_CACHE_VIRTUAL_NODES`` positions : ajouter un nœud ne
+déplace qu'environ 1/N des clés.
+
+- Écriture sur ``TRANSLATION_CACHE_REPLICAS`` nœuds consécutifs de l'anneau.
+- Lecture répartie entre les répliques ; en cas d'absence ou d'erreur, la
+  réplique suivante est essayée, et une entrée retrouvée ailleurs est recopiée
+  sur le nœud qui ne l'avait pas (réparation à la lecture, utile après l'ajout
+  d'un nœud).
+- Un nœud en erreur est écarté pendant ``TRANSLATION_CACHE_RETRY_INTERVAL``
+  secondes : une panne coûte une exception, pas un délai par requête.
+
+Sans ``TRANSLATION_CACHE_NODES``, le cache par défaut de Django est utilisé.
+"""
+
+import hashlib
+import itertools
+import logging
+import threading
+from bisect import bisect
+from time import monotonic
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# Constants
+TRANSLATION_CACHE_NODES = getattr(settings, 'TRANSLATION_CACHE_NODES', ())
+TRANSLATION_CACHE_REPLICAS = getattr(settings, 'TRANSLATION_CACHE_REPLICAS', 2)
+TRANSLATION_CACHE_VIRTUAL_NODES = getattr(settings, 'TRANSLATION_CACHE_VIRTUAL_NODES', 160)
+TRANSLATION_CACHE_RETRY_INTERVAL = getattr(settings, 'TRANSLATION_CACHE_RETRY_INTERVAL', 5.0)  # secondes
+TRANSLATION_CACHE_REPAIR_TIMEOUT = 3600  # durée de vie des copies réparées à la lecture
+
+_MISSING = object()
+
+
+def _ring_hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """Anneau de hachage cohérent avec nœuds virtuels (immuable)."""
+
+    def __init__(self, nodes: Iterable[str], virtual_nodes: int = TRANSLATION_CACHE_VIRTUAL_NODES):
+        self.nodes = list(dict.fromkeys(nodes))
+        points = sorted(
+            (_ring_hash(f"{node}#{index}"), node)
+            for node in self.nodes for index in range(virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def preference_list(self, key: str, count: int) -> List[str]:
+        """Les ``count`` premiers nœuds distincts après la clé, dans le sens de l'anneau."""
+        if not self.nodes:
+            return []
+        count = min(count, len(self.nodes))
+        start = bisect(self._hashes, _ring_hash(key))
+        found = []
+        for offset in range(len(self._owners)):
+            node = self._owners[(start + offset) % len(self._owners)]
+            if node not in found:
+                found.append(node)
+                if len(found) == count:
+                    break
+        return found
+
+
+class ShardedCache:
+    """
+    Sous-ensemble de l'API des caches Django (``get``, ``set``, ``get_many``,
+    ``set_many``, ``delete``) réparti sur plusieurs backends.
+    """
+
+    def __init__(self, nodes: Dict[str, object], replicas: int = TRANSLATION_CACHE_REPLICAS,
+                 virtual_nodes: int = TRANSLATION_CACHE_VIRTUAL_NODES,
+                 retry_interval: float = TRANSLATION_CACHE_RETRY_INTERVAL):
+        self.nodes = dict(nodes)
+        self.replicas = max(1, replicas)
+        self.retry_interval = retry_interval
+        self.virtual_nodes = virtual_nodes
+        self.ring = HashRing(self.nodes, virtual_nodes)
+        self._down_until: Dict[str, float] = {}
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    # Topologie
+
+    def add_node(self, name: str, backend):
+        with self._lock:
+            self.nodes = {**self.nodes, name: backend}
+            self.ring = HashRing(self.nodes, self.virtual_nodes)
+
+    def remove_node(self, name: str):
+        with self._lock:
+            self.nodes = {node: backend for node, backend in self.nodes.items() if node != name}
+            self.ring = HashRing(self.nodes, self.virtual_nodes)
+
+    def is_available(self, node: str) -> bool:
+        return self._down_until.get(node, 0) <= monotonic()
+
+    def _mark_down(self, node: str, error: Exception):
+        if self.is_available(node):
+            logger.warning("Translation cache node %s unavailable: %s", node, error)
+        self._down_until[node] = monotonic() + self.retry_interval
+
+    def _replicas(self, key: str) -> List[str]:
+        return [node for node in self.ring.preference_list(key, self.replicas) if self.is_available(node)]
+
+    def _read_order(self, key: str) -> List[str]:
+        # Rotation entre répliques : la charge de lecture d'une clé chaude est partagée
+        replicas = self._replicas(key)
+        if len(replicas) > 1:
+            shift = next(self._turn) % len(replicas)
+            replicas = replicas[shift:] + replicas[:shift]
+        return replicas
+
+    def _call(self, node: str, method: str, *args):
+        try:
+            return getattr(self.nodes[node], method)(*args)
+        except Exception as e:
+            self._mark_down(node, e)
+            raise
+
+    # Lecture
+
+    def get(self, key: str, default=None):
+        missed = []
+        for node in self._read_order(key):
+            try:
+                value = self._call(node, 'get', key, _MISSING)
+            except Exception:
+                continue
+            if value is not _MISSING:
+                self._repair({key: value}, missed)
+                return value
+            missed.append(node)
+        return default
+
+    def get_many(self, keys: Iterable[str]) -> dict:
+        found = {}
+        pending = {key: self._read_order(key) for key in keys}
+        missed = {key: [] for key in pending}
+        while pending:
+            # Une requête get_many par nœud et par tour : les clés absentes passent à la réplique suivante
+            by_node = {}
+            for key, nodes in pending.items():
+                if nodes:
+                    by_node.setdefault(nodes[0], []).append(key)
+            if not by_node:
+                break
+            for node, node_keys in by_node.items():
+                try:
+                    values = self._call(node, 'get_many', node_keys)
+                except Exception:
+                    values = {}
+                    failed = True
+                else:
+                    failed = False
+                for key in node_keys:
+                    pending[key].pop(0)
+                    if key in values:
+                        found[key] = values[key]
+                        del pending[key]
+                    elif not failed:
+                        missed[key].append(node)
+            for key in [key for key, nodes in pending.items() if not nodes]:
+                del pending[key]
+        for key, value in found.items():
+            self._repair({key: value}, missed[key])
+        return found
+
+    def _repair(self, values: dict, nodes: List[str]):
+        for node in nodes:
+            try:
+                self._call(node, 'set_many', values, TRANSLATION_CACHE_REPAIR_TIMEOUT)
+            except Exception:
+                pass
+
+    # Écriture
+
+    def set(self, key: str, value, timeout=DEFAULT_TIMEOUT):
+        for node in self._replicas(key):
+            try:
+                self._call(node, 'set', key, value, timeout)
+            except Exception:
+                continue
+
+    def set_many(self, mapping: dict, timeout=DEFAULT_TIMEOUT):
+        by_node = {}
+        for key, value in mapping.items():
+            for node in self._replicas(key):
+                by_node.setdefault(node, {})[key] = value
+        for node, values in by_node.items():
+            try:
+                self._call(node, 'set_many', values, timeout)
+            except Exception:
+                continue
+
+    def delete(self, key: str):
+        # Toutes les répliques, y compris celles marquées indisponibles
+        for node in self.ring.preference_list(key, self.replicas):
+            try:
+                self.nodes[node].delete(key)
+            except Exception:
+                continue
+
+
+class _CacheAlias:
+    """Nœud désigné par son alias : ``caches[alias]`` est propre à chaque thread."""
+
+    def __init__(self, alias: str):
+        self.alias = alias
+
+    def __getattr__(self, name):
+        from django.core.cache import caches
+
+        return getattr(caches[self.alias], name)
+
+
+_translation_cache = None
+
+
+def get_translation_cache():
+    """Cache des traductions : réparti si ``TRANSLATION_CACHE_NODES`` est défini, sinon le cache par défaut."""
+    global _translation_cache
+    if _translation_cache is None:
+        from django.core.cache import cache
+
+        if TRANSLATION_CACHE_NODES:
+            _translation_cache = ShardedCache({alias: _CacheAlias(alias) for alias in TRANSLATION_CACHE_NODES})
+        else:
+            _translation_cache = cache
+    return _translation_cache
@@ -0,0 +1,97 @@
+"""
+Démarrage des workers : configuration du logging et préchauffage.
+
+Les dépendances lourdes (``deep_translator``, ``langid``, ``requests``) ne sont
+plus importées avec ``api.views`` : les commandes de gestion qui n'en ont pas
+besoin (``migrate``, ``collectstatic``, ...) démarrent sans elles.
+
+``warm_up()`` est appelé par le serveur d'application *avant* le fork des
+workers (voir ``gunicorn.conf.py``) : le modèle langid, les tables de langues,
+les sessions amont et la projection de la table de phrases sont alors construits
+une seule fois dans le processus maître et partagés par tous les workers.
+"""
+
+import gc
+import logging
+from time import perf_counter
+
+logger = logging.getLogger(__name__)
+
+_warmed_up = False
+
+
+def configure_logging():
+    """Installe le pipeline de logs non bloquant (voir api/logging_pipeline.py)."""
+    from .logging_pipeline import configure_logging as configure_pipeline
+
+    configure_pipeline()
+
+
+def load_language_identifier():
+    """Charge le modèle langid (plusieurs secondes au premier appel)."""
+    import langid
+
+    langid.classify("warm up")
+
+
+def build_language_tables():
+    """Remplit les caches des fonctions de normalisation des codes de langue."""
+    from .views import LANGUAGE_CODES, LANGUAGE_NAMES, get_language_display_name
+
+    for code in set(LANGUAGE_CODES) | set(LANGUAGE_NAMES):
+        get_language_display_name(code)
+
+
+def map_phrase_table():
+    """Projette la table de phrases compilée : les pages sont partagées par les workers."""
+    from .phrase_table import get_phrase_table
+
+    get_phrase_table()
+
+
+def warm_up(freeze: bool = True) -> dict:
+    """
+    Précharge tout ce qui est coûteux au premier appel. Idempotent.
+
+    Args:
+        freeze: déplace les objets existants dans la génération permanente du
+            GC pour éviter que les collectes des workers ne touchent (et donc
+            ne dupliquent) les pages partagées.
+
+    Returns:
+        dict: durée de chaque étape en secondes
+    """
+    global _warmed_up
+    if _warmed_up:
+        return {}
+
+    from . import upstream
+
+    timings = {}
+    for name, step in (
+        ('imports', _import_heavy_dependencies),
+        ('langid_model', load_language_identifier),
+        ('language_tables', build_language_tables),
+        ('upstream_pools', upstream.open_pools),
+        ('phrase_table', map_phrase_table),
+    ):
+        start = perf_counter()
+        step()
+        timings[name] = perf_counter() - start
+
+    if freeze:
+        gc.collect()
+        gc.freeze()
+
+    _warmed_up = True
+    logger.info(
+        "Warm-up completed: %s",
+        ", ".join(f"{name}={duration:.2f}s" for name, duration in timings.items())
+    )
+    return timings
+
+
+def _import_heavy_dependencies():
+    import deep_translator  # noqa: F401
+    import langid  # noqa: F401
+    import requests  # noqa: F401
@@ -1,3 +1,609 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from time import sleep
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from api import catalog_jobs, local_engine, phrase_table, upstream, usage, views
+from api.catalogs import translate_catalog_stream
+from api.documents import IncrementalTranslator, document_version_key, split_segments, translate_plain_text
+from api.executor import PriorityExecutor
+from api.local_engine import LocalEngineUnavailable
+from api.markup import FORMAT_HTML, FORMAT_MARKDOWN, TextNode, parse_document, translate_document
+from api.masking import mask_text, unmask_text
+from api.models import UsageEvent
+from api.sharded_cache import HashRing, ShardedCache
+from api.views import LANGUAGE_CODES, LocalTranslationStrategy, get_strategy_name, get_translation_strategy
+
+
+def fake_translation(text, source_lang, target_lang):
+    return f"[{target_lang}] {text}"
+
+
+class TranslateGetTests(TestCase):
+    url = '/api/translate/'
+
+    def setUp(self):
+        cache.clear()
+        patches = [
+            mock.patch('api.views.perform_translation', side_effect=fake_translation),
+            mock.patch('api.usage.USAGE_ANALYTICS_ENABLED', False),
+        ]
+        self.perform_translation = patches[0].start()
+        for patch in patches[1:]:
+            patch.start()
+        for patch in patches:
+            self.addCleanup(patch.stop)
+
+    def canonical_response(self, params):
+        """Suit au plus une redirection ; une seconde serait une boucle."""
+        return self.canonical_response_with_headers(params)
+
+    def canonical_response_with_headers(self, params, **headers):
+        response = self.client.get(self.url, params, **headers)
+        if response.status_code == 301:
+            response = self.client.get(response['Location'], **headers)
+        return response
+
+    def test_every_language_alias_redirects_at_most_once(self):
+        for alias in LANGUAGE_CODES:
+            for field in ('target_language', 'source_language'):
+                params = {'message': 'Bonjour', 'source_language': 'fr', 'target_language': 'en', field: alias}
+                with self.subTest(field=field, alias=alias):
+                    self.assertNotEqual(self.canonical_response(params).status_code, 301)
+
+    def test_hebrew_codes_share_one_canonical_url(self):
+        locations = {
+            self.client.get(self.url, {'message': 'Bonjour', 'source_language': 'fr', 'target_language': code})
+            .get('Location')
+            for code in ('he', 'iw', 'HE')
+        }
+        locations.discard(None)
+        self.assertLessEqual(len(locations), 1)
+        response = self.canonical_response({'message': 'Bonjour', 'source_language': 'fr', 'target_language': 'iw'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_successful_response_is_publicly_cacheable(self):
+        response = self.canonical_response({'message': 'Bonjour', 'source_language': 'fr', 'target_language': 'en'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertTrue(response['ETag'])
+        self.assertNotIn('Server-Timing', response)
+
+    def test_if_none_match_returns_304_without_translating(self):
+        response = self.canonical_response({'message': 'Bonjour', 'source_language': 'fr', 'target_language': 'en'})
+        self.perform_translation.reset_mock()
+        revalidated = self.client.get(response.wsgi_request.get_full_path(), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+        self.perform_translation.assert_not_called()
+
+    def test_priority_header_selects_the_class(self):
+        with mock.patch('api.views.translate_segments', wraps=views.translate_segments) as translate_segments:
+            response = self.canonical_response_with_headers(
+                {'message': 'Bonjour', 'source_language': 'fr', 'target_language': 'en'},
+                HTTP_X_TRANSLATION_PRIORITY='interactive'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(translate_segments.call_args.args[3], 'interactive')
+
+    def test_auto_source_reports_detected_language(self):
+        response = self.canonical_response({'message': 'Bonjour tout le monde', 'target_language': 'en'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['source_language'], 'auto')
+        self.assertEqual(response.json()['detected_language'], 'fr')
+        self.assertTrue(response.json()['detected_language_name'])
+
+    def test_validation_errors_are_not_stored(self):
+        for params in (
+            {'message': 'x' * 600, 'target_language': 'en'},
+            {'message': 'Bonjour'},
+            {'message': 'Bonjour', 'target_language': 'xx-unknown'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertGreaterEqual(response.status_code, 400)
+                self.assertIn('no-store', response['Cache-Control'])
+
+    def test_upstream_errors_are_not_stored(self):
+        self.perform_translation.side_effect = RuntimeError("upstream down")
+        response = self.canonical_response({'message': 'Bonjour', 'source_language': 'fr', 'target_language': 'en'})
+        self.assertGreaterEqual(response.status_code, 400)
+        self.assertIn('no-store', response['Cache-Control'])
+        self.assertNotIn('public', response['Cache-Control'])
+        self.assertIn('Server-Timing', response)
+
+
+
+class LocalPairSelectionTests(TestCase):
+    def setUp(self):
+        models_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, models_dir)
+        os.makedirs(os.path.join(models_dir, 'fr-en'))
+        with open(os.path.join(models_dir, 'fr-en', 'phrases.tsv'), 'w', encoding='utf-8') as phrases:
+            phrases.write('bonjour\thello\n')
+        patches = [
+            mock.patch('api.local_engine.LOCAL_TRANSLATION_PAIRS', frozenset({'fr-en'})),
+            mock.patch('api.local_engine.LOCAL_MODELS_DIR', models_dir),
+            mock.patch('api.local_engine.detect_source_language', return_value='fr'),
+        ]
+        self.detect_source_language = patches[2].start()
+        for patch in patches[:2]:
+            patch.start()
+        for patch in patches:
+            self.addCleanup(patch.stop)
+
+    def test_auto_source_uses_detected_language(self):
+        self.assertEqual(get_strategy_name('auto', 'en', 'Bonjour'), 'local')
+        self.assertIsInstance(get_translation_strategy('auto', 'en', 'Bonjour'), LocalTranslationStrategy)
+        self.assertEqual(get_translation_strategy('auto', 'en', 'Bonjour').translate('Bonjour', 'auto', 'en'), 'Hello')
+
+    def test_other_targets_skip_detection(self):
+        self.assertEqual(get_strategy_name('auto', 'de', 'Bonjour'), 'google')
+        self.detect_source_language.assert_not_called()
+
+    def test_pair_that_failed_to_load_is_reported_as_remote(self):
+        local_engine.models.unavailable.add('fr-en')
+        self.addCleanup(local_engine.models.unavailable.discard, 'fr-en')
+        self.assertEqual(get_strategy_name('fr', 'en', 'Bonjour'), 'google')
+
+    def test_partially_covered_text_uses_remote_engine(self):
+        strategy = get_translation_strategy('fr', 'en', 'Bonjour Marie, à 9 h')
+        with mock.patch.object(strategy.fallback, 'translate', return_value='Hello Marie, at 9') as remote:
+            self.assertEqual(strategy.translate('Bonjour Marie, à 9 h', 'fr', 'en'), 'Hello Marie, at 9')
+        remote.assert_called_once()
+
+    def test_uncovered_text_does_not_fail_the_batch(self):
+        engine = local_engine.load_engine('fr-en')
+        covered, uncovered = engine.translate_batch(['Bonjour !', 'Bonjour Marie'])
+        self.assertEqual(covered, 'Hello !')
+        self.assertIsInstance(uncovered, LocalEngineUnavailable)
+        with mock.patch('api.local_engine.LOCAL_PHRASE_MIN_COVERAGE', 0.5):
+            self.assertEqual(engine.translate_batch(['Bonjour Marie']), ['Hello Marie'])
+
+
+class UpstreamTimeoutTests(TestCase):
+    def test_google_requests_have_a_timeout(self):
+        with mock.patch('api.upstream.get_session') as get_session:
+            get_session.return_value.get.return_value = mock.Mock(status_code=200, text='<div class="t0">Hello</div>')
+            self.assertEqual(upstream.google_translate('Bonjour', 'fr', 'en'), 'Hello')
+        self.assertEqual(get_session.return_value.get.call_args.kwargs['timeout'], upstream.UPSTREAM_HTTP_TIMEOUT)
+
+    def test_post_json_has_a_timeout(self):
+        with mock.patch('api.upstream.get_session') as get_session:
+            upstream.post_json('biotrack', 'https://biotrack.expeditalagbe.com/translate', json={})
+        self.assertEqual(get_session.return_value.post.call_args.kwargs['timeout'], upstream.UPSTREAM_HTTP_TIMEOUT)
+
+
+class UpstreamStatsTests(SimpleTestCase):
+    def test_concurrent_calls_are_all_counted(self):
+        scheduler = upstream.UpstreamScheduler({
+            'test': {'rate': 1e6, 'burst': 1e6, 'max_concurrency': 8, 'target_latency': 60.0},
+        })
+
+        def call_many():
+            for _ in range(200):
+                scheduler.call('test', int)
+        threads = [threading.Thread(target=call_many) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(scheduler.snapshot()['test']['calls'], 1600)
+        self.assertEqual(scheduler.snapshot()['test']['rejected'], 0)
+
+
+class MaskingTests(SimpleTestCase):
+    def test_message_variables_are_masked(self):
+        for text, expected in (
+            ("Hello %(name)s, %s and %1$d", "Hello {0}, {1} and {2}"),
+            ("Hi {{name}}, see $t(common.ok)", "Hi {0}, see {1}"),
+            ("Bonjour {user}, total {amount, number, currency}", "Bonjour {0}, total {1}"),
+            ("{count, plural, one {# file} other {# files}}", "{0} file{1} files{2}"),
+        ):
+            with self.subTest(text=text):
+                masked = mask_text(text)
+                self.assertEqual(masked.text, expected)
+                self.assertEqual(unmask_text(masked.text, masked.spans), text)
+
+    def test_percent_sign_in_prose_is_kept(self):
+        self.assertEqual(mask_text("20 % de réduction").text, "{0} % de réduction")
+
+
+class CatalogTests(SimpleTestCase):
+    po = (
+        'msgid ""\nmsgstr ""\n"Language: fr\\n"\n"Plural-Forms: nplurals=2; plural=(n > 1);\\n"\n\n'
+        'msgid "One file"\nmsgid_plural "%(count)s files"\nmsgstr[0] ""\nmsgstr[1] ""\n'
+    )
+
+    def translate(self, target_language):
+        output = io.StringIO()
+        translate_catalog_stream(
+            io.StringIO(self.po), output, 'po', target_language, lambda texts: {text: f"T {text}" for text in texts}
+        )
+        return output.getvalue()
+
+    def test_plural_forms_follow_target_language(self):
+        translated = self.translate('ru')
+        self.assertIn('"Plural-Forms: nplurals=3;', translated)
+        self.assertNotIn('plural=(n > 1)', translated)
+        self.assertIn('msgstr[2] "T %(count)s files"', translated)
+
+        translated = self.translate('ja')
+        self.assertIn('"Plural-Forms: nplurals=1; plural=0;\\n"', translated)
+        self.assertNotIn('msgstr[1]', translated)
+
+    def test_plural_forms_are_cleared_for_unknown_language(self):
+        translated = self.translate('xx')
+        self.assertNotIn('Plural-Forms', translated)
+        self.assertIn('msgstr[1] "T %(count)s files"', translated)
+
+
+class CatalogJobTests(TestCase):
+    url = '/api/translate-catalog/'
+
+    def setUp(self):
+        jobs_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, jobs_dir)
+        self.release = threading.Event()
+
+        def catalog_translator(source_lang, target_lang, priority):
+            def translate_many(texts):
+                self.release.wait(5)
+                return {text: f"[{target_lang}] {text}" for text in texts}
+            return translate_many
+
+        patches = [
+            mock.patch('api.catalog_jobs.CATALOG_JOBS_DIR', jobs_dir),
+            mock.patch('api.views.catalog_translator', catalog_translator),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.jobs = []
+        patch = mock.patch('api.views.start_catalog_job', side_effect=self.start_job)
+        patch.start()
+        self.addCleanup(patch.stop)
+        # Les travaux encore en cours finissent avant la restauration des patchs
+        self.addCleanup(self.finish_jobs)
+
+    def start_job(self, build):
+        job = catalog_jobs.start_catalog_job(build)
+        self.jobs.append(job)
+        return job
+
+    def finish_jobs(self):
+        self.release.set()
+        for job in self.jobs:
+            job.wait(5)
+
+    def post_catalog(self):
+        catalog = SimpleUploadedFile('messages.json', b'{"title": "Bonjour"}')
+        return self.client.post(self.url, {'catalog': catalog, 'target_languages': 'en'})
+
+    def test_fast_catalog_is_returned_directly(self):
+        self.release.set()
+        response = self.post_catalog()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), '{"title": "[en] Bonjour"}'.encode())
+
+    def test_slow_catalog_continues_in_background(self):
+        with mock.patch('api.views.CATALOG_SYNC_WAIT', 0):
+            response = self.post_catalog()
+        self.assertEqual(response.status_code, 202)
+        status_url = response.json()['status_url']
+        self.assertEqual(self.client.get(status_url).status_code, 202)
+
+        self.release.set()
+        response = self.wait_for_job(status_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('messages.en.json', response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content), '{"title": "[en] Bonjour"}'.encode())
+
+    def wait_for_job(self, status_url):
+        for _ in range(50):
+            response = self.client.get(status_url)
+            if response.status_code != 202:
+                return response
+            sleep(0.05)
+        return response
+
+    def test_unknown_job_is_not_found(self):
+        self.assertEqual(self.client.get(f"{self.url}../../etc/passwd/").status_code, 404)
+        self.assertEqual(self.client.get(f"{self.url}{catalog_jobs.CATALOG_JOB_NODE}.unknown-job/").status_code, 404)
+
+    def test_job_of_another_node_is_misdirected(self):
+        self.assertEqual(self.client.get(f"{self.url}othernode.unknown-job/").status_code, 421)
+
+    def test_stale_running_job_is_reported_failed(self):
+        with mock.patch('api.views.CATALOG_SYNC_WAIT', 0):
+            status_url = self.post_catalog().json()['status_url']
+        with mock.patch('api.catalog_jobs.CATALOG_JOB_STALE_AFTER', -1):
+            response = self.client.get(status_url)
+        self.assertEqual(response.status_code, 500)
+
+    def test_prune_keeps_running_jobs(self):
+        with mock.patch('api.views.CATALOG_SYNC_WAIT', 0):
+            status_url = self.post_catalog().json()['status_url']
+        with mock.patch('api.catalog_jobs.CATALOG_JOB_TIMEOUT', -1):
+            catalog_jobs.prune_jobs()
+            self.assertEqual(self.client.get(status_url).status_code, 202)
+
+            self.release.set()
+            self.assertEqual(self.wait_for_job(status_url).status_code, 200)
+            catalog_jobs.prune_jobs()
+        self.assertEqual(self.client.get(status_url).status_code, 404)
+
+
+@mock.patch('api.usage.USAGE_ANALYTICS_ENABLED', True)
+class UsagePrivacyTests(TestCase):
+    def setUp(self):
+        usage._buffer.drain()
+        self.addCleanup(usage._buffer.drain)
+
+    def recorded_phrase(self):
+        with mock.patch.object(usage._buffer, '_ensure_started'):
+            usage.record_usage('translate', 'fr', 'en', 'google', 7, False, 0.01, 'Bonjour')
+        return usage._buffer.drain()[-1][-1]
+
+    def test_phrases_are_not_captured_by_default(self):
+        self.assertEqual(self.recorded_phrase(), '')
+
+    @mock.patch('api.usage.USAGE_CAPTURE_PHRASES', True)
+    def test_phrases_are_captured_on_opt_in(self):
+        self.assertEqual(self.recorded_phrase(), 'Bonjour')
+
+    def test_prune_clears_old_phrases_then_old_events(self):
+        now = datetime.now(timezone.utc)
+        for age in (timedelta(hours=1), timedelta(days=3), timedelta(days=40)):
+            UsageEvent.objects.create(
+                created_at=now - age, endpoint='translate', source_language='fr', target_language='en',
+                strategy='google', characters=7, cache_hit=False, duration_ms=1.0, phrase='Bonjour'
+            )
+        usage._buffer.prune()
+        self.assertEqual(
+            sorted(UsageEvent.objects.values_list('phrase', flat=True)), ['', 'Bonjour']
+        )
+
+
+class _FlakyNode:
+    """Nœud de cache qui lève une erreur tant que ``down`` est vrai."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.down = False
+        self.calls = 0
+
+    def __getattr__(self, name):
+        method = getattr(self.backend, name)
+
+        def call(*args):
+            self.calls += 1
+            if self.down:
+                raise ConnectionError("node down")
+            return method(*args)
+        return call
+
+
+class ShardedCacheTests(SimpleTestCase):
+    def make_node(self, name):
+        backend = LocMemCache(f"sharded-cache-tests-{name}", {})
+        backend.clear()
+        self.addCleanup(backend.clear)
+        return backend
+
+    def test_adding_a_node_moves_about_one_nth_of_the_keys(self):
+        keys = [f"key-{index}" for index in range(4000)]
+        before = HashRing(['a', 'b', 'c'])
+        after = HashRing(['a', 'b', 'c', 'd'])
+        moved = [key for key in keys if before.preference_list(key, 1) != after.preference_list(key, 1)]
+        self.assertAlmostEqual(len(moved) / len(keys), 1 / 4, delta=0.05)
+        self.assertEqual({after.preference_list(key, 1)[0] for key in moved}, {'d'})
+
+    def test_down_replica_fails_over_and_is_skipped(self):
+        flaky = _FlakyNode(self.make_node('flaky'))
+        sharded = ShardedCache({'a': flaky, 'b': self.make_node('b')}, replicas=2, retry_interval=60)
+        sharded.set('greeting', 'hello')
+        flaky.down = True
+
+        for _ in range(3):
+            self.assertEqual(sharded.get('greeting'), 'hello')
+            self.assertEqual(sharded.get_many(['greeting']), {'greeting': 'hello'})
+        self.assertEqual(flaky.calls, 2)  # set, puis la seule tentative en échec
+        self.assertFalse(sharded.is_available('a'))
+
+        flaky.down = False
+        with mock.patch('api.sharded_cache.monotonic', return_value=sharded._down_until['a'] + 1):
+            self.assertTrue(sharded.is_available('a'))
+            for _ in range(2):
+                sharded.get('greeting')
+        self.assertGreater(flaky.calls, 2)
+
+    def test_read_repair_copies_value_to_replica_that_missed_it(self):
+        nodes = {'a': self.make_node('a'), 'b': self.make_node('b')}
+        sharded = ShardedCache(nodes, replicas=2)
+        nodes['a'].set('greeting', 'hello')
+
+        for _ in range(2):  # les lectures alternent entre les répliques
+            self.assertEqual(sharded.get('greeting'), 'hello')
+        self.assertEqual(nodes['b'].get('greeting'), 'hello')
+
+
+class IncrementalDocumentTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.batches = []
+
+    def translate_many(self, texts):
+        self.batches.append(list(texts))
+        return {text: f"[en] {text}" for text in texts}
+
+    def translate_version(self, text):
+        translator = IncrementalTranslator(document_version_key('doc-1', 'fr', 'en'), self.translate_many)
+        return translate_plain_text(text, translator), translator
+
+    def test_split_segments_round_trip(self):
+        for text in ('', 'Bonjour.', 'Bonjour.  Ça va ?\n\n  Oui !\tFin…  ', '\n Titre \n\nTexte; suite: fin.\n'):
+            with self.subTest(text=text):
+                self.assertEqual(''.join(split_segments(text)), text)
+
+    def test_revision_only_translates_changed_segment(self):
+        translated, translator = self.translate_version("Bonjour. Ça va ?\nÀ demain.")
+        self.assertEqual(translated, "[en] Bonjour. [en] Ça va ?\n[en] À demain.")
+        self.assertEqual(translator.report('doc-1'), {
+            'id': 'doc-1', 'previous_version': False, 'segments': 3, 'reused_segments': 0, 'translated_segments': 3,
+        })
+
+        translated, translator = self.translate_version("Bonjour. Tout va bien ?\nÀ demain.")
+        self.assertEqual(translated, "[en] Bonjour. [en] Tout va bien ?\n[en] À demain.")
+        self.assertEqual(self.batches[-1], ["Tout va bien ?"])
+        self.assertEqual(translator.report('doc-1'), {
+            'id': 'doc-1', 'previous_version': True, 'segments': 3, 'reused_segments': 2, 'translated_segments': 1,
+        })
+
+    def test_other_documents_do_not_share_versions(self):
+        self.translate_version("Bonjour.")
+        translator = IncrementalTranslator(document_version_key('doc-2', 'fr', 'en'), self.translate_many)
+        translate_plain_text("Bonjour.", translator)
+        self.assertEqual(self.batches, [["Bonjour."], ["Bonjour."]])
+        self.assertFalse(translator.previous_version)
+
+
+class PhraseTableTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'phrase_table.bin')
+        phrases = os.path.join(directory, 'phrases.txt')
+        with open(phrases, 'w', encoding='utf-8') as source:
+            source.write("Bonjour\nMerci beaucoup\n")
+
+        def translate_segments(texts, source_lang, target_lang, priority, pack=False):
+            return {text: f"[{target_lang}] {text}" for text in texts}, []
+
+        with mock.patch('api.views.translate_segments', translate_segments):
+            call_command(
+                'build_phrase_table', phrases=phrases, languages='en', source_language='fr',
+                output=self.path, stdout=io.StringIO()
+            )
+        for patch in (
+            mock.patch('api.phrase_table.PHRASE_TABLE_PATH', self.path),
+            mock.patch('api.phrase_table._table', None),
+            mock.patch('api.phrase_table._next_check', 0.0),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_lookup_hits_and_misses(self):
+        self.assertEqual(
+            phrase_table.lookup_phrases(['Bonjour', 'Merci beaucoup', 'Au revoir'], 'en'),
+            {'Bonjour': '[en] Bonjour', 'Merci beaucoup': '[en] Merci beaucoup'}
+        )
+        self.assertEqual(phrase_table.lookup_phrases(['Bonjour'], 'es'), {})
+
+    def test_rebuilt_table_is_remapped(self):
+        self.assertEqual(phrase_table.lookup_phrases(['Bonjour'], 'en'), {'Bonjour': '[en] Bonjour'})
+        phrase_table.write_phrase_table(self.path, [('Bonjour', 'en', 'Hello'), ('Salut', 'en', 'Hi')])
+        phrase_table._next_check = 0.0
+        self.assertEqual(phrase_table.lookup_phrases(['Bonjour', 'Salut'], 'en'), {'Bonjour': 'Hello', 'Salut': 'Hi'})
+
+
+class PriorityExecutorTests(SimpleTestCase):
+    def setUp(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def block(self):
+        self.started.set()
+        return self.release.wait(5)
+
+    def make_executor(self, interactive_reserved):
+        return PriorityExecutor({
+            'interactive': {'weight': 6, 'reserved': interactive_reserved},
+            'standard': {'weight': 3, 'reserved': 0},
+            'bulk': {'weight': 1, 'reserved': 0},
+        }, shared_workers=1)
+
+    def test_reserved_lane_serves_interactive_while_bulk_is_saturated(self):
+        executor = self.make_executor(interactive_reserved=1)
+        bulk = [executor.submit('bulk', self.block) for _ in range(3)]
+        self.assertTrue(self.started.wait(2))
+
+        self.assertEqual(executor.submit('interactive', str.upper, 'bonjour').result(timeout=2), 'BONJOUR')
+        self.assertFalse(any(future.done() for future in bulk))
+        self.assertEqual(executor.metrics()['bulk']['queued'], 2)
+
+    def test_shared_workers_favour_interactive_work(self):
+        executor = self.make_executor(interactive_reserved=0)
+        order = []
+        blocker = executor.submit('bulk', self.block)
+        self.assertTrue(self.started.wait(2))
+        futures = [executor.submit('bulk', order.append, 'bulk') for _ in range(3)]
+        futures += [executor.submit('interactive', order.append, 'interactive') for _ in range(3)]
+
+        self.release.set()
+        blocker.result(timeout=2)
+        for future in futures:
+            future.result(timeout=2)
+        self.assertEqual(order[-2:], ['bulk', 'bulk'])
+
+
+class MarkupRoundTripTests(SimpleTestCase):
+    documents = {
+        FORMAT_HTML: (
+            '<!DOCTYPE html>\n<p class="intro">Bonjour &amp; bienvenue <a href="/x?a=1&amp;b=2">ici</a>.</p>\n'
+            '<!-- Bonjour --><script>var s = "Bonjour";</script>\n<pre>Bonjour</pre><p>Bonjour &amp; bienvenue</p>\n'
+        ),
+        FORMAT_MARKDOWN: (
+            '# Titre\n\n- **Bonjour** et `code` [lien](https://example.com/a_b)\n'
+            '> Citation\n\n```python\nprint("Bonjour")\n```\n\n| A | B |\n|---|---|\n    indenté\n'
+        ),
+    }
+
+    @staticmethod
+    def markup(document, document_format):
+        return [part for part in parse_document(document, document_format) if not isinstance(part, TextNode)]
+
+    def test_identity_translation_is_byte_identical(self):
+        for document_format, source in self.documents.items():
+            with self.subTest(document_format=document_format):
+                translated, _ = translate_document(source, document_format, lambda texts: {t: t for t in texts})
+                self.assertEqual(translated, source)
+
+    def test_translation_only_replaces_text_nodes(self):
+        for document_format, source in self.documents.items():
+            with self.subTest(document_format=document_format):
+                batches = []
+
+                def translate_many(texts):
+                    batches.append(texts)
+                    return {text: text.upper() for text in texts}
+
+                translated, stats = translate_document(source, document_format, translate_many)
+                self.assertEqual(self.markup(translated, document_format), self.markup(source, document_format))
+                self.assertEqual(len(batches), 1)
+                self.assertEqual(len(batches[0]), stats['unique_text_nodes'])
+                self.assertIn('BONJOUR', translated)
+
+    def test_code_and_attributes_are_not_translated(self):
+        translated, stats = translate_document(
+            self.documents[FORMAT_HTML], FORMAT_HTML, lambda texts: {text: text.upper() for text in texts}
+        )
+        self.assertIn('<script>var s = "Bonjour";</script>', translated)
+        self.assertIn('<pre>Bonjour</pre>', translated)
+        self.assertIn('<!-- Bonjour -->', translated)
+        self.assertIn('BONJOUR &amp; BIENVENUE', translated)
+        self.assertLess(stats['unique_text_nodes'], stats['text_nodes'])
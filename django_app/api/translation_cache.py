@@ -0,0 +1,57 @@
+"""
+Cache des traductions.
+
+Les clés sont dérivées d'un condensé SHA-256 du texte : contrairement à
+``hash()``, dont la valeur change d'un processus à l'autre, elles sont stables
+entre workers et entre redémarrages, ce qui permet de préchauffer le cache
+depuis une commande de gestion.
+
+Les entrées sont stockées dans ``get_translation_cache()`` : le cache par
+défaut, ou un cache réparti sur plusieurs nœuds (``api/sharded_cache.py``).
+"""
+
+import hashlib
+
+from .sharded_cache import get_translation_cache
+
+# Constants
+CACHE_TIMEOUT = 3600  # 1 hour
+CACHE_KEY_PREFIX = "trans_"
+DETECT_CACHE_KEY_PREFIX = "lang_detect_"
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def translation_cache_key(message: str, target_language: str) -> str:
+    return f"{CACHE_KEY_PREFIX}{text_digest(message)}_{target_language}"
+
+
+def detection_cache_key(message: str) -> str:
+    return f"{DETECT_CACHE_KEY_PREFIX}{text_digest(message)}"
+
+
+def get_cached_translation(message: str, target_language: str):
+    """Réponse de traduction en cache (dict) ou ``None``."""
+    return get_translation_cache().get(translation_cache_key(message, target_language))
+
+
+def set_cached_translation(message: str, target_language: str, response_data: dict, timeout: int = CACHE_TIMEOUT):
+    get_translation_cache().set(translation_cache_key(message, target_language), response_data, timeout)
+
+
+def get_many_cached_translations(messages, target_language: str) -> dict:
+    """Traductions en cache pour plusieurs messages : ``{message: réponse}``."""
+    keys = {translation_cache_key(message, target_language): message for message in messages}
+    found = get_translation_cache().get_many(list(keys))
+    return {keys[key]: value for key, value in found.items()}
+
+
+def get_cached_detection(message: str):
+    """Résultat de détection de langue en cache (dict) ou ``None``."""
+    return get_translation_cache().get(detection_cache_key(message))
+
+
+def set_cached_detection(message: str, response_data: dict, timeout: int = CACHE_TIMEOUT):
+    get_translation_cache().set(detection_cache_key(message), response_data, timeout)
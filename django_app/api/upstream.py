@@ -0,0 +1,274 @@
+"""
+Accès réseau aux services de traduction amont.
+
+Chaque service amont dispose d'une ``requests.Session`` partagée (connexions
+keep-alive réutilisées entre les requêtes). ``requests`` n'est importé qu'au
+premier besoin pour ne pas alourdir le démarrage des commandes de gestion.
+
+Tous les appels amont passent par ``scheduler.call(upstream, fn, ...)`` :
+
+- un seau à jetons par service respecte son débit autorisé (``rate`` requêtes
+  par seconde, rafales de ``burst``) ;
+- la concurrence s'ajuste seule (AIMD) : +1 par fenêtre d'appels réussis et
+  rapides, divisée par deux sur un 429/503 ou une latence excessive ;
+- un appel qui ne peut partir tout de suite attend jusqu'à
+  ``UPSTREAM_QUEUE_TIMEOUT`` secondes avant d'échouer en ``UpstreamBusyError`` ;
+- chaque requête HTTP a un délai de connexion et de lecture
+  (``UPSTREAM_HTTP_TIMEOUT``), y compris celles de ``deep_translator``.
+
+Les limites s'appliquent par processus : diviser les limites d'un fournisseur
+par le nombre de workers dans ``UPSTREAM_LIMITS``.
+"""
+
+import logging
+import threading
+from time import monotonic, sleep
+from typing import Callable, Dict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Services amont connus
+UPSTREAM_HOSTS = {
+    'languesafrique': 'https://languesafrique.esacode.org',
+    'biotrack': 'https://biotrack.expeditalagbe.com',
+}
+UPSTREAM_POOL_SIZE = 10
+UPSTREAM_QUEUE_TIMEOUT = getattr(settings, 'UPSTREAM_QUEUE_TIMEOUT', 5.0)
+# (connexion, lecture) en secondes : un appel bloqué ne garde pas sa place AIMD indéfiniment
+UPSTREAM_HTTP_TIMEOUT = tuple(getattr(settings, 'UPSTREAM_HTTP_TIMEOUT', (3.05, 15)))
+
+# Limites par service (par processus)
+DEFAULT_UPSTREAM_LIMITS = {
+    'google': {'rate': 5.0, 'burst': 10, 'max_concurrency': 8, 'target_latency': 2.0},
+    'languesafrique': {'rate': 2.0, 'burst': 4, 'max_concurrency': 4, 'target_latency': 5.0},
+    'biotrack': {'rate': 2.0, 'burst': 4, 'max_concurrency': 4, 'target_latency': 10.0},
+}
+UPSTREAM_LIMITS = {**DEFAULT_UPSTREAM_LIMITS, **getattr(settings, 'UPSTREAM_LIMITS', {})}
+FALLBACK_LIMITS = {'rate': 2.0, 'burst': 4, 'max_concurrency': 4, 'target_latency': 5.0}
+
+# Statuts HTTP signalant une surcharge du fournisseur
+OVERLOAD_STATUS_CODES = (429, 503)
+
+_sessions: Dict[str, object] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(upstream: str):
+    """Retourne la session HTTP partagée (pool keep-alive) d'un service amont."""
+    session = _sessions.get(upstream)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(upstream)
+            if session is None:
+                import requests
+
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=UPSTREAM_POOL_SIZE
+                )
+                session.mount(UPSTREAM_HOSTS.get(upstream, 'https://'), adapter)
+                _sessions[upstream] = session
+    return session
+
+
+def open_pools():
+    """Prépare les sessions de tous les services amont (sans ouvrir de socket)."""
+    for upstream in UPSTREAM_HOSTS:
+        get_session(upstream)
+
+
+def close_pools():
+    """Ferme les connexions ouvertes (à appeler dans chaque worker après le fork)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+
+
+def post_json(upstream: str, url: str, **kwargs):
+    """POST via la session du service, sous le contrôle de l'ordonnanceur (délai ``UPSTREAM_HTTP_TIMEOUT``)."""
+    kwargs.setdefault('timeout', UPSTREAM_HTTP_TIMEOUT)
+
+    def send():
+        response = get_session(upstream).post(url, **kwargs)
+        response.raise_for_status()
+        return response
+    return scheduler.call(upstream, send)
+
+
+class _GoogleHTTP:
+    """
+    Remplace le module ``requests`` vu par ``deep_translator.google`` (qui
+    appelle ``requests.get`` sans délai) : session partagée et ``UPSTREAM_HTTP_TIMEOUT``.
+    """
+
+    @staticmethod
+    def get(url, **kwargs):
+        kwargs.setdefault('timeout', UPSTREAM_HTTP_TIMEOUT)
+        return get_session('google').get(url, **kwargs)
+
+
+def google_translate(text: str, source: str, target: str) -> str:
+    """Traduction Google (``deep_translator``) sous le contrôle de l'ordonnanceur, avec délai HTTP."""
+    from deep_translator import GoogleTranslator, google
+
+    google.requests = _GoogleHTTP
+    return scheduler.call('google', GoogleTranslator(source=source, target=target).translate, text)
+
+
+class UpstreamBusyError(Exception):
+    """Le service amont est saturé : l'appel n'a pas pu partir à temps."""
+    pass
+
+
+class TokenBucket:
+    """Seau à jetons : ``rate`` jetons par seconde, au plus ``burst`` en réserve."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: float) -> bool:
+        while True:
+            with self._lock:
+                now = monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            sleep(wait)
+
+
+class AIMDLimiter:
+    """Limite de concurrence à croissance additive et décroissance multiplicative."""
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1):
+        self.min_limit = min_concurrency
+        self.max_limit = max_concurrency
+        self.limit = float(max(min_concurrency, max_concurrency // 2))
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, deadline: float) -> bool:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    def release(self, success: bool, overloaded: bool):
+        with self._condition:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.min_limit, self.limit / 2)
+            elif success:
+                # +1 environ par « fenêtre » de ``limit`` appels réussis
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class _Upstream:
+    def __init__(self, name: str, limits: dict):
+        self.name = name
+        self.bucket = TokenBucket(limits['rate'], limits['burst'])
+        self.limiter = AIMDLimiter(limits['max_concurrency'])
+        self.target_latency = limits['target_latency']
+        self.stats = {'calls': 0, 'rejected': 0, 'overloaded': 0, 'errors': 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, counter: str):
+        # ``+=`` n'est pas atomique entre threads : sans verrou, des appels seraient perdus
+        with self._stats_lock:
+            self.stats[counter] += 1
+
+    def read_stats(self) -> dict:
+        with self._stats_lock:
+            return dict(self.stats)
+
+
+def is_overload_error(error: Exception) -> bool:
+    """Reconnaît un refus pour surcharge (HTTP 429/503, TooManyRequests de deep_translator)."""
+    if type(error).__name__ == 'TooManyRequests':
+        return True
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None) in OVERLOAD_STATUS_CODES
+
+
+class UpstreamScheduler:
+    """Point de passage unique des appels vers les services de traduction amont."""
+
+    def __init__(self, limits: Dict[str, dict] = None):
+        self.limits = limits or UPSTREAM_LIMITS
+        self._upstreams: Dict[str, _Upstream] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name: str) -> _Upstream:
+        upstream = self._upstreams.get(name)
+        if upstream is None:
+            with self._lock:
+                upstream = self._upstreams.setdefault(
+                    name, _Upstream(name, self.limits.get(name, FALLBACK_LIMITS))
+                )
+        return upstream
+
+    def call(self, name: str, fn: Callable, *args, timeout: float = None, **kwargs):
+        """
+        Exécute ``fn(*args, **kwargs)`` en respectant le débit et la
+        concurrence du service ``name``.
+
+        Raises:
+            UpstreamBusyError: si l'appel n'a pas pu partir avant ``timeout``
+        """
+        upstream = self._get(name)
+        deadline = monotonic() + (UPSTREAM_QUEUE_TIMEOUT if timeout is None else timeout)
+
+        if not upstream.limiter.acquire(deadline):
+            upstream.count('rejected')
+            raise UpstreamBusyError(f"{name}: concurrency limit reached")
+        success = overloaded = False
+        try:
+            if not upstream.bucket.acquire(deadline):
+                upstream.count('rejected')
+                raise UpstreamBusyError(f"{name}: rate limit reached")
+            upstream.count('calls')
+            start = monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                overloaded = is_overload_error(e)
+                upstream.count('overloaded' if overloaded else 'errors')
+                if overloaded:
+                    logger.warning("Upstream %s overloaded, limit reduced", name, extra={'upstream': name})
+                raise
+            latency = monotonic() - start
+            success = True
+            overloaded = latency > upstream.target_latency
+            return result
+        finally:
+            upstream.limiter.release(success, overloaded)
+
+    def snapshot(self) -> dict:
+        """État courant (limite, appels en cours, compteurs) de chaque service."""
+        return {
+            name: {
+                'limit': round(upstream.limiter.limit, 2),
+                'in_flight': upstream.limiter.in_flight,
+                **upstream.read_stats(),
+            }
+            for name, upstream in self._upstreams.items()
+        }
+
+
+scheduler = UpstreamScheduler()
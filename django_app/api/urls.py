@@ -1,11 +1,14 @@
 from django.urls import path
-from .views import detect_language, translate_text,create_page,create_and_translate_page
+from .views import detect_language, translate_text,create_page,create_and_translate_page,translate_catalog,translate_batch,catalog_job
 
 app_name = 'api'
 
 urlpatterns = [
     path('detect/', detect_language, name='detect_language'),
     path('translate/', translate_text, name='translate_text'),
+    path('translate/batch/', translate_batch, name='translate_batch'),
+    path('translate-catalog/', translate_catalog, name='translate_catalog'),
+    path('translate-catalog/<str:job_id>/', catalog_job, name='catalog_job'),
     path('create-page/', create_page, name='create_page'),
     path('create-translate-page/', create_and_translate_page, name='create_and_translate_page'),
 
@@ -0,0 +1,282 @@
+"""
+Statistiques d'utilisation de l'API, collectées sans bloquer les requêtes.
+
+``record_usage()`` ajoute un événement à un tampon en mémoire (aucune I/O) ;
+un thread d'arrière-plan le vide toutes les ``USAGE_FLUSH_INTERVAL`` secondes :
+insertion groupée des ``UsageEvent`` et mise à jour des agrégats horaires
+``UsageRollup`` (requêtes, caractères, taux de cache, latence par paire de
+langues et stratégie). Le masquage des phrases (``api/masking.py``) se fait
+aussi dans ce thread.
+
+Si le tampon est plein (base indisponible), les nouveaux événements sont
+abandonnés et comptés. ``hot_pairs()`` et ``hot_phrases()`` alimentent le
+préchauffage du cache (``warm_translation_cache --from-usage``).
+
+Les phrases ne sont conservées que sur option (``USAGE_CAPTURE_PHRASES``) : un
+texte envoyé en POST peut être privé. Le même thread purge, toutes les heures,
+les phrases de plus de ``USAGE_PHRASE_RETENTION_HOURS`` heures et les
+événements de plus de ``USAGE_RETENTION_DAYS`` jours (agrégats conservés).
+
+Réglages optionnels : ``USAGE_ANALYTICS_ENABLED``, ``USAGE_BUFFER_SIZE``,
+``USAGE_FLUSH_INTERVAL``, ``USAGE_CAPTURE_PHRASES``, ``USAGE_RETENTION_DAYS``,
+``USAGE_PHRASE_RETENTION_HOURS``.
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from time import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Constants
+USAGE_ANALYTICS_ENABLED = getattr(settings, 'USAGE_ANALYTICS_ENABLED', True)
+USAGE_BUFFER_SIZE = getattr(settings, 'USAGE_BUFFER_SIZE', 50000)
+USAGE_FLUSH_INTERVAL = getattr(settings, 'USAGE_FLUSH_INTERVAL', 5.0)  # secondes
+USAGE_BATCH_SIZE = 1000
+USAGE_PHRASE_MAX_LENGTH = 200
+USAGE_CAPTURE_PHRASES = getattr(settings, 'USAGE_CAPTURE_PHRASES', False)
+USAGE_RETENTION_DAYS = getattr(settings, 'USAGE_RETENTION_DAYS', 30)
+USAGE_PHRASE_RETENTION_HOURS = getattr(settings, 'USAGE_PHRASE_RETENTION_HOURS', 48)
+USAGE_PRUNE_INTERVAL = 3600  # secondes
+
+
+class _UsageBuffer:
+    """Tampon des événements et thread de vidage, redémarré après un fork."""
+
+    def __init__(self):
+        self.events = deque()
+        self.dropped = 0
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Processus enfant : les événements du parent seront écrits par le parent
+                self.events = deque()
+            self._thread = threading.Thread(target=self._run, name='usage-flusher', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def add(self, event: tuple):
+        self._ensure_started()
+        # deque.append est atomique : pas de verrou sur le chemin de la requête
+        if len(self.events) >= USAGE_BUFFER_SIZE:
+            self.dropped += 1
+            return
+        self.events.append(event)
+
+    def _run(self):
+        while True:
+            self._wake.wait(USAGE_FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+            if time() >= self._next_prune:
+                self._next_prune = time() + USAGE_PRUNE_INTERVAL
+                self.prune()
+
+    def prune(self):
+        from django.db import close_old_connections
+
+        close_old_connections()
+        try:
+            prune_usage_phrases(USAGE_PHRASE_RETENTION_HOURS)
+            prune_usage_events(USAGE_RETENTION_DAYS)
+        except Exception as e:
+            logger.error("Usage analytics pruning failed: %s", e)
+
+    def drain(self) -> list:
+        events = []
+        while self.events:
+            try:
+                events.append(self.events.popleft())
+            except IndexError:
+                break
+        return events
+
+    def flush(self):
+        from django.db import close_old_connections
+
+        events = self.drain()
+        if not events:
+            return
+        close_old_connections()
+        try:
+            for start in range(0, len(events), USAGE_BATCH_SIZE):
+                write_events(events[start:start + USAGE_BATCH_SIZE])
+        except Exception as e:
+            logger.error("Usage analytics flush failed for %d events: %s", len(events), e)
+        if self.dropped:
+            logger.warning("Usage analytics buffer full, %d events dropped", self.dropped)
+            self.dropped = 0
+
+
+_buffer = _UsageBuffer()
+
+
+def record_usage(
+    endpoint: str,
+    source_language: str,
+    target_language: str,
+    strategy: str,
+    characters: int,
+    cache_hit: bool,
+    duration: float,
+    phrase: str = '',
+):
+    """Enregistre un appel (``duration`` en secondes). Ne fait aucune I/O."""
+    if not USAGE_ANALYTICS_ENABLED:
+        return
+    if not USAGE_CAPTURE_PHRASES or len(phrase) > USAGE_PHRASE_MAX_LENGTH:
+        phrase = ''
+    _buffer.add((
+        time(), endpoint, source_language, target_language or '', strategy,
+        characters, cache_hit, duration * 1000, phrase
+    ))
+
+
+def flush_usage():
+    """Écrit immédiatement les événements en attente (commandes de gestion, fin de processus)."""
+    if _buffer._pid == os.getpid():
+        _buffer.flush()
+
+
+atexit.register(flush_usage)
+
+
+def _hour(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def write_events(events):
+    """Insère les événements et met à jour les agrégats horaires, en une transaction."""
+    from django.db import IntegrityError, transaction
+    from django.db.models import F
+    from django.db.models.functions import Greatest
+
+    from .masking import mask_text
+    from .models import UsageEvent, UsageRollup
+
+    rows = []
+    rollups = {}
+    for created, endpoint, source, target, strategy, characters, cache_hit, duration_ms, phrase in events:
+        rows.append(UsageEvent(
+            created_at=datetime.fromtimestamp(created, timezone.utc),
+            endpoint=endpoint,
+            source_language=source,
+            target_language=target,
+            strategy=strategy,
+            characters=characters,
+            cache_hit=cache_hit,
+            duration_ms=duration_ms,
+            phrase=mask_text(phrase).text[:USAGE_PHRASE_MAX_LENGTH] if phrase else '',
+        ))
+        totals = rollups.setdefault((_hour(created), endpoint, source, target, strategy), [0, 0, 0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += characters
+        totals[2] += int(cache_hit)
+        totals[3] += duration_ms
+        totals[4] = max(totals[4], duration_ms)
+
+    with transaction.atomic():
+        UsageEvent.objects.bulk_create(rows)
+        for (hour, endpoint, source, target, strategy), totals in rollups.items():
+            key = {
+                'hour': hour, 'endpoint': endpoint, 'source_language': source,
+                'target_language': target, 'strategy': strategy,
+            }
+            increments = {
+                'requests': F('requests') + totals[0],
+                'characters': F('characters') + totals[1],
+                'cache_hits': F('cache_hits') + totals[2],
+                'total_duration_ms': F('total_duration_ms') + totals[3],
+                'max_duration_ms': Greatest('max_duration_ms', totals[4]),
+            }
+            if UsageRollup.objects.filter(**key).update(**increments):
+                continue
+            try:
+                with transaction.atomic():
+                    UsageRollup.objects.create(
+                        **key, requests=totals[0], characters=totals[1], cache_hits=totals[2],
+                        total_duration_ms=totals[3], max_duration_ms=totals[4],
+                    )
+            except IntegrityError:
+                # Créé entre-temps par un autre worker
+                UsageRollup.objects.filter(**key).update(**increments)
+
+
+def hot_pairs(limit: int = 10, hours: int = 24, endpoint: str = 'translate') -> list:
+    """Paires de langues les plus demandées sur les ``hours`` dernières heures (agrégats)."""
+    from django.db.models import Max, Sum
+
+    from .models import UsageRollup
+
+    since = _hour(time()) - timedelta(hours=hours - 1)
+    pairs = (
+        UsageRollup.objects.filter(hour__gte=since, endpoint=endpoint)
+        .values('source_language', 'target_language')
+        .annotate(
+            requests=Sum('requests'),
+            characters=Sum('characters'),
+            cache_hits=Sum('cache_hits'),
+            total_duration_ms=Sum('total_duration_ms'),
+            max_duration_ms=Max('max_duration_ms'),
+        )
+        .order_by('-requests')[:limit]
+    )
+    return [
+        {
+            **pair,
+            'cache_hit_rate': pair['cache_hits'] / pair['requests'],
+            'average_duration_ms': pair['total_duration_ms'] / pair['requests'],
+        }
+        for pair in pairs
+    ]
+
+
+def hot_phrases(limit: int = 100, hours: int = 24, target_language: str = None) -> list:
+    """Phrases (masquées) les plus demandées : ``[{'phrase', 'target_language', 'requests'}]``."""
+    from django.db.models import Count
+
+    from .models import UsageEvent
+
+    events = UsageEvent.objects.filter(
+        created_at__gte=datetime.now(timezone.utc) - timedelta(hours=hours), endpoint='translate'
+    ).exclude(phrase='')
+    if target_language:
+        events = events.filter(target_language=target_language)
+    return list(
+        events.values('phrase', 'target_language')
+        .annotate(requests=Count('id'))
+        .order_by('-requests')[:limit]
+    )
+
+
+def prune_usage_events(days: int) -> int:
+    """Supprime les événements de plus de ``days`` jours (les agrégats sont conservés)."""
+    from .models import UsageEvent
+
+    deleted, _ = UsageEvent.objects.filter(created_at__lt=datetime.now(timezone.utc) - timedelta(days=days)).delete()
+    return deleted
+
+
+def prune_usage_phrases(hours: int) -> int:
+    """Efface les phrases des événements de plus de ``hours`` heures (l'événement est conservé)."""
+    from .models import UsageEvent
+
+    return UsageEvent.objects.filter(
+        created_at__lt=datetime.now(timezone.utc) - timedelta(hours=hours)
+    ).exclude(phrase='').update(phrase='')
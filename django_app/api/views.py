@@ -7,6 +7,10 @@ Date: 2024-02-20
 API Endpoints:
 - POST /api/detect/: Détection de langue
 - POST /api/translate/: Traduction de texte
+- GET /api/translate/: Traduction de textes courts (réponse cachable, ETag)
+- POST /api/translate/batch/: Traduction de plusieurs messages
+- POST /api/translate-catalog/: Traduction de catalogues .po / JSON
+- GET /api/translate-catalog/<job_id>/: Résultat d'une traduction de catalogue en arrière-plan
 - POST /api/create-page/: Création de page
 - POST /api/create-translate-page/: Création et traduction
 
@@ -21,37 +25,79 @@ Features:
 
 import json
 import logging
-import requests
-import langid
+import tempfile
+import zipfile
+from urllib.parse import urlencode
 from time import time
 from datetime import datetime
 from typing import Dict, Tuple, Optional, Union
 from functools import lru_cache
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 
-from django.http import JsonResponse
+from django.http import FileResponse, HttpResponseNotModified, HttpResponsePermanentRedirect, JsonResponse
+from django.urls import reverse
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.core.cache import cache
 from django.conf import settings
-from deep_translator import GoogleTranslator, MyMemoryTranslator
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from backend.middleware import session_exempt
+
+from .catalog_jobs import (
+    CATALOG_JOB_NODE,
+    CATALOG_SYNC_WAIT,
+    JOB_FAILED,
+    JOB_RUNNING,
+    CatalogJobError,
+    get_job_state,
+    job_node,
+    open_job_result,
+    start_catalog_job,
 )
+from .catalogs import (
+    CatalogFormatError,
+    detect_catalog_format,
+    localized_catalog_name,
+    translate_catalog_file,
+)
+from .documents import MAX_DOCUMENT_ID_LENGTH, IncrementalTranslator, document_version_key, translate_plain_text
+from .executor import API_KEY_HEADER, resolve_priority, translation_executor
+from .local_engine import LocalEngineUnavailable, resolve_local_pair, translate_local
+from .logging_pipeline import with_request_context
+from .markup import FORMAT_TEXT, SUPPORTED_FORMATS, document_text_length, translate_document
+from .masking import has_translatable_text, mask_text, unmask_text
+from .phrase_table import lookup_phrases
+from .profiling import phase, profiled_view
+from .security import is_admin_request
+from .translation_cache import (
+    get_cached_detection,
+    get_many_cached_translations,
+    set_cached_detection,
+    set_cached_translation,
+    text_digest,
+)
+from .upstream import UpstreamBusyError, google_translate, post_json
+from .usage import record_usage
+
+# deep_translator, langid et requests sont importés au premier usage
+# (voir api/startup.py pour le préchauffage avant le fork des workers)
 logger = logging.getLogger(__name__)
 
 # Constants
-ADMIN_TOKEN = getattr(settings, 'ADMIN_TOKEN', 'votre_token_secret')
-CACHE_TIMEOUT = 3600  # 1 hour
 MAX_TEXT_LENGTH = 5000
+MAX_DOCUMENT_LENGTH = 100000  # HTML/Markdown brut ; MAX_TEXT_LENGTH s'applique au texte extrait
+MAX_CATALOG_LANGUAGES = 20
+MAX_BATCH_ITEMS = 100
+MAX_GET_TEXT_LENGTH = 500  # GET /api/translate/ (URL cachable) ; au-delà, POST
+TRANSLATION_GET_MAX_AGE = getattr(settings, 'TRANSLATION_GET_MAX_AGE', 3600)  # navigateur
+TRANSLATION_GET_CDN_MAX_AGE = getattr(settings, 'TRANSLATION_GET_CDN_MAX_AGE', 24 * 3600)  # CDN (s-maxage)
+TRANSLATION_ETAG_VERSION = str(getattr(settings, 'TRANSLATION_ETAG_VERSION', 1))
+BUSY_RETRY_AFTER = 2  # secondes suggérées au client quand les services amont sont saturés
+# Textes courts regroupés en un seul appel amont (une ligne par texte)
+PACK_MAX_CHARACTERS = 1500
+PACK_MAX_ITEMS = 40
 DEFAULT_SOURCE_LANG = 'auto'
 TRANSLATION_TIMEOUT = 30
-THREAD_POOL_MAX_WORKERS = 1
-CACHE_KEY_PREFIX = "trans_"
-DETECT_CACHE_KEY_PREFIX = "lang_detect_"
 
 # Messages d'erreur utilisateur
 USER_FRIENDLY_MESSAGES = {
@@ -61,6 +107,7 @@ USER_FRIENDLY_MESSAGES = {
     'TimeoutError': 'Le service met trop de temps à répondre. Veuillez réessayer.',
     'TranslationError': 'La traduction a échoué. Veuillez réessayer.',
     'ConnectionError': 'Impossible de se connecter au service. Veuillez réessayer plus tard.',
+    'UpstreamBusyError': 'Le service de traduction est très sollicité. Veuillez réessayer dans quelques instants.',
     'Exception': 'Une erreur inattendue est survenue. Veuillez réessayer plus tard.'
 }
 
@@ -400,12 +447,8 @@ def get_error_response(error: Exception, request) -> Tuple[dict, int]:
     Génère une réponse d'erreur appropriée selon le type d'utilisateur.
     """
     error_type = type(error).__name__
-    is_admin = (
-        request.headers.get('X-Admin-Token') == ADMIN_TOKEN and
-        request.headers.get('X-Debug-Mode') == 'true'
-    )
     
-    if is_admin:
+    if is_admin_request(request):
         error_response = {
             'status': 'error',
             'message': str(error),
@@ -421,18 +464,30 @@ def get_error_response(error: Exception, request) -> Tuple[dict, int]:
             'message': USER_FRIENDLY_MESSAGES.get(error_type, USER_FRIENDLY_MESSAGES['Exception'])
         }
 
+    import requests
+
     if isinstance(error, json.JSONDecodeError):
         status_code = 400
     elif isinstance(error, TimeoutError):
         status_code = 408
-    elif isinstance(error, requests.exceptions.RequestException):
+    elif isinstance(error, (requests.exceptions.RequestException, UpstreamBusyError)):
         status_code = 503
     else:
         status_code = 500
 
-    logger.error(f"Error: {error_type} - {str(error)}")
+    if status_code == 503:
+        error_response['retry_after'] = BUSY_RETRY_AFTER
+
+    logger.error("Error: %s - %s", error_type, error, extra={'error_type': error_type, 'status_code': status_code})
     return error_response, status_code
 
+def error_json_response(error_response: dict, status_code: int) -> JsonResponse:
+    """Réponse d'erreur JSON ; ``Retry-After`` est ajouté quand le client doit patienter."""
+    response = JsonResponse(error_response, status=status_code)
+    if 'retry_after' in error_response:
+        response['Retry-After'] = str(error_response['retry_after'])
+    return response
+
 class TranslationError(Exception):
     """Custom exception for translation errors."""
     pass
@@ -446,9 +501,12 @@ class GoogleTranslationStrategy(TranslationStrategy):
     """Stratégie de traduction utilisant Google Translate."""
     def translate(self, text: str, source: str, target: str) -> str:
         try:
-            return GoogleTranslator(source=source, target=target).translate(text)
+            with phase('upstream_google'):
+                return google_translate(text, source, target)
+        except UpstreamBusyError:
+            raise
         except Exception as e:
-            logger.error(f"Google translation error: {str(e)}")
+            logger.error("Google translation error: %s", e, extra={'strategy': 'google'})
             raise TranslationError(f"Google translation failed: {str(e)}")
 
 class AfricanLanguageTranslationStrategy(TranslationStrategy):
@@ -461,20 +519,27 @@ class AfricanLanguageTranslationStrategy(TranslationStrategy):
                 # Utilisation des services locaux pour la traduction
                 try:
                     # 1. Création de la page avec le service local
-                    local_translation_url = LocalPageCreationService.create_page(
-                        local_message=text,
-                        local_target_language=target
+                    with phase('upstream_create_page'):
+                        local_translation_url = LocalPageCreationService.create_page(
+                            local_message=text,
+                            local_target_language=target
+                        )
+                    logger.info(
+                        "African translation page created: %s", local_translation_url,
+                        extra={'strategy': 'african', 'sampled': True}
                     )
-                    logger.info(f"African translation page created: {local_translation_url}")
 
                     # 2. Traduction avec le service local
-                    local_translated_text = LocalTranslationService.translate_url(local_translation_url)
-                    logger.info("African translation completed successfully")
+                    with phase('upstream_translate_page'):
+                        local_translated_text = LocalTranslationService.translate_url(local_translation_url)
+                    logger.info("African translation completed successfully", extra={'strategy': 'african', 'sampled': True})
 
                     return local_translated_text
 
+                except UpstreamBusyError:
+                    raise
                 except Exception as e:
-                    logger.error(f"Local translation error: {str(e)}")
+                    logger.error("Local translation error: %s", e, extra={'strategy': 'african'})
                     # En cas d'échec, on retourne un message d'erreur plus informatif
                     return (
                         f"[Erreur de traduction en {AFRICAN_LANGUAGES[target]}. "
@@ -482,10 +547,13 @@ class AfricanLanguageTranslationStrategy(TranslationStrategy):
                     )
             
             # Pour les autres langues, utiliser Google Translate
-            return GoogleTranslator(source=source, target=target).translate(text)
+            with phase('upstream_google'):
+                return google_translate(text, source, target)
 
+        except UpstreamBusyError:
+            raise
         except Exception as e:
-            logger.error(f"Translation error: {str(e)}")
+            logger.error("Translation error: %s", e, extra={'strategy': 'african'})
             if target in AFRICAN_LANGUAGES:
                 raise TranslationError(
                     f"La traduction en {AFRICAN_LANGUAGES[target]} a échoué: {str(e)}"
@@ -493,6 +561,26 @@ class AfricanLanguageTranslationStrategy(TranslationStrategy):
             else:
                 raise TranslationError(str(e))
 
+class LocalTranslationStrategy(TranslationStrategy):
+    """
+    Moteur local sur CPU (``api/local_engine.py``), sans appel réseau. Sans
+    modèle pour la paire (ex. langue source détectée différente) ou si la table
+    de phrases ne couvre pas le texte, repli sur la stratégie distante ``fallback``.
+    """
+    def __init__(self, fallback: TranslationStrategy):
+        self.fallback = fallback
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        try:
+            with phase('local_engine'):
+                return translate_local(text, source, target)
+        except LocalEngineUnavailable as e:
+            logger.info("Local engine unavailable, using remote engine: %s", e, extra={'strategy': 'local'})
+            return self.fallback.translate(text, source, target)
+        except Exception as e:
+            logger.error("Local translation error: %s", e, extra={'strategy': 'local'})
+            raise TranslationError(f"Local translation failed: {str(e)}")
+
 def is_african_language(lang_code: str) -> bool:
     """Vérifie si une langue est une langue africaine."""
     return normalize_language_code(lang_code) in AFRICAN_LANGUAGES
@@ -511,11 +599,40 @@ def normalize_language_code(code: str) -> str:
     normalized = code.lower().strip()
     return LANGUAGE_CODES.get(normalized, normalized)
 
-def get_translation_strategy(source_lang: str, target_lang: str) -> TranslationStrategy:
-    """Sélectionne la stratégie de traduction appropriée."""
+def canonical_language_code(code: str) -> str:
+    """
+    Forme stable d'un code de langue pour les URL canoniques. ``normalize_language_code``
+    n'est pas idempotent (``he`` -> ``iw`` -> ``he``) : on le réapplique jusqu'à
+    retrouver une valeur déjà vue et l'on retient la plus petite valeur du cycle,
+    identique quel que soit le code de départ.
+    """
+    seen = []
+    while code not in seen:
+        seen.append(code)
+        code = normalize_language_code(code)
+    return min(seen[seen.index(code):])
+
+def get_translation_strategy(source_lang: str, target_lang: str, text: str = '') -> TranslationStrategy:
+    """
+    Sélectionne la stratégie de traduction appropriée : moteur local si une paire
+    de ``LOCAL_TRANSLATION_PAIRS`` correspond (langue de ``text`` détectée quand
+    la source est ``auto``), sinon moteur distant.
+    """
     if is_african_language(source_lang) or is_african_language(target_lang):
-        return AfricanLanguageTranslationStrategy()
-    return GoogleTranslationStrategy()
+        remote = AfricanLanguageTranslationStrategy()
+    else:
+        remote = GoogleTranslationStrategy()
+    if resolve_local_pair(text, source_lang, target_lang):
+        return LocalTranslationStrategy(fallback=remote)
+    return remote
+
+def get_strategy_name(source_lang: str, target_lang: str, text: str = '') -> str:
+    """Nom court de la stratégie qui traduit ``text`` (statistiques d'utilisation), sans l'instancier."""
+    if resolve_local_pair(text, source_lang, target_lang):
+        return 'local'
+    if is_african_language(source_lang) or is_african_language(target_lang):
+        return 'african'
+    return 'google'
 
 def validate_request_data(data: Dict) -> Tuple[bool, Optional[str], Optional[Dict]]:
     """Valide les données de la requête."""
@@ -526,11 +643,24 @@ def validate_request_data(data: Dict) -> Tuple[bool, Optional[str], Optional[Dic
         message = str(data.get('message', '')).strip()
         target_language = str(data.get('target_language', '')).strip().lower()
         source_language = str(data.get('source_language', 'auto')).strip().lower()
+        document_format = str(data.get('format', FORMAT_TEXT)).strip().lower()
+        document_id = str(data.get('document_id') or '').strip()
 
         if not message:
             return False, "Message is required", None
-        
-        if len(message) > MAX_TEXT_LENGTH:
+
+        if len(document_id) > MAX_DOCUMENT_ID_LENGTH:
+            return False, f"Document id exceeds {MAX_DOCUMENT_ID_LENGTH} characters", None
+
+        if document_format not in SUPPORTED_FORMATS:
+            return False, f"Unsupported format: {document_format}", None
+
+        if document_format != FORMAT_TEXT and len(message) > MAX_DOCUMENT_LENGTH:
+            return False, f"Document exceeds maximum length of {MAX_DOCUMENT_LENGTH} characters", None
+
+        # Pour HTML/Markdown, seul le texte extrait compte (le balisage n'est pas traduit)
+        text_length = len(message) if document_format == FORMAT_TEXT else document_text_length(message, document_format)
+        if text_length > MAX_TEXT_LENGTH:
             return False, f"Message exceeds maximum length of {MAX_TEXT_LENGTH} characters", None
 
         if not target_language:
@@ -546,26 +676,246 @@ def validate_request_data(data: Dict) -> Tuple[bool, Optional[str], Optional[Dic
         return True, None, {
             'message': message,
             'target_language': target_language,
-            'source_language': source_language
+            'source_language': source_language,
+            'format': document_format,
+            'document_id': document_id
         }
     except Exception as e:
-        logger.error(f"Validation error: {str(e)}")
+        logger.error("Validation error: %s", e)
         return False, f"Validation error: {str(e)}", None
 
 def perform_translation(text: str, source_lang: str, target_lang: str) -> str:
     """Effectue la traduction avec la stratégie appropriée."""
     start_time = time()
     try:
-        strategy = get_translation_strategy(source_lang, target_lang)
+        with phase('strategy'):
+            strategy = get_translation_strategy(source_lang, target_lang, text)
         result = strategy.translate(text, source_lang, target_lang)
         
-        logger.info(f"Translation completed in {time() - start_time:.2f} seconds")
+        duration = time() - start_time
+        logger.info(
+            "Translation completed in %.2f seconds", duration,
+            extra={'strategy': type(strategy).__name__, 'duration_ms': round(duration * 1000, 1), 'sampled': True}
+        )
         return result
     
+    except UpstreamBusyError:
+        raise
     except Exception as e:
-        logger.error(f"Translation error: {str(e)}")
+        logger.error("Translation error: %s", e)
         raise TranslationError(f"Translation failed: {str(e)}")
 
+def build_translation_response(message: str, source_lang: str, target_lang: str, translated_text: str) -> Dict:
+    """Construit la réponse de traduction (également stockée telle quelle en cache)."""
+    return {
+        'status': 'success',
+        'source_language': source_lang,
+        'target_language': target_lang,
+        'target_language_name': get_language_display_name(target_lang),
+        'original_text': message,
+        'translated_text': translated_text
+    }
+
+def perform_packed_translation(texts, source_lang: str, target_lang: str) -> list:
+    """
+    Traduit plusieurs textes d'une seule ligne en un appel amont (textes joints
+    par des retours à la ligne). Si le découpage de la réponse ne correspond
+    pas, chaque texte est retraduit séparément.
+    """
+    if len(texts) > 1:
+        lines = perform_translation('\n'.join(texts), source_lang, target_lang).split('\n')
+        if len(lines) == len(texts) and all(line.strip() for line in lines):
+            return [line.strip() for line in lines]
+        logger.warning("Packed translation misaligned, translating items separately", extra={'items': len(texts)})
+    return [perform_translation(text, source_lang, target_lang) for text in texts]
+
+def pack_texts(texts) -> list:
+    """Regroupe les textes d'une ligne en lots de PACK_MAX_ITEMS / PACK_MAX_CHARACTERS."""
+    packs = []
+    current, size = [], 0
+    for text in texts:
+        if '\n' in text:
+            packs.append([text])
+            continue
+        if current and (len(current) >= PACK_MAX_ITEMS or size + len(text) > PACK_MAX_CHARACTERS):
+            packs.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text) + 1
+    if current:
+        packs.append(current)
+    return packs
+
+def _run_translations(
+    texts, source_lang: str, target_lang: str, priority: str, deadline: float, pack: bool = False
+) -> Dict[str, str]:
+    """Traduit ``texts`` en parallèle dans la classe de priorité ``priority``."""
+    groups = pack_texts(texts) if pack else [[text] for text in texts]
+    futures = [
+        (group, translation_executor.submit(priority, perform_packed_translation, group, source_lang, target_lang))
+        for group in groups
+    ]
+    translations = {}
+    try:
+        for group, future in futures:
+            translations.update(zip(group, future.result(timeout=max(0, deadline - time()))))
+    except FuturesTimeoutError:
+        for _, future in futures:
+            future.cancel()
+        raise TimeoutError(f"Translation exceeded {TRANSLATION_TIMEOUT} seconds")
+    return translations
+
+def translate_segments(
+    texts, source_lang: str, target_lang: str, priority: str, pack: bool = False
+) -> Tuple[Dict[str, str], list]:
+    """
+    Traduit plusieurs textes : table de phrases compilée (``api/phrase_table.py``),
+    puis lecture groupée du cache, puis traductions manquantes soumises en
+    parallèle dans la classe de priorité ``priority`` (regroupées en lots d'un
+    seul appel amont si ``pack``).
+
+    URL, nombres, code et termes du glossaire sont masqués avant la recherche en
+    cache (voir ``api/masking.py``) : des textes qui ne diffèrent que par ces
+    segments partagent la même entrée.
+
+    Returns:
+        ({texte: traduction}, textes effectivement envoyés au service amont)
+    """
+    with phase('phrase_table'):
+        translations = lookup_phrases(texts, target_lang)
+    masked = {text: mask_text(text) for text in texts if text not in translations}
+    templates = list(dict.fromkeys(item.text for item in masked.values()))
+
+    with phase('cache_lookup'):
+        cached = get_many_cached_translations(templates, target_lang) if templates else {}
+    template_translations = {template: response['translated_text'] for template, response in cached.items()}
+    # Un gabarit sans texte (ex. une URL seule) n'a pas besoin du service amont
+    template_translations.update(
+        (template, template) for template in templates
+        if template not in template_translations and not has_translatable_text(template)
+    )
+    missing = [template for template in templates if template not in template_translations]
+
+    deadline = time() + TRANSLATION_TIMEOUT
+    template_translations.update(_run_translations(missing, source_lang, target_lang, priority, deadline, pack))
+
+    unmasked_retries = []
+    for text, item in masked.items():
+        restored = unmask_text(template_translations[item.text], item.spans)
+        if restored is None:
+            unmasked_retries.append(text)
+        else:
+            translations[text] = restored
+    # Marqueur perdu par le service amont : on retraduit le texte brut, sans le mettre en cache
+    translations.update(_run_translations(unmasked_retries, source_lang, target_lang, priority, deadline))
+    rejected = {masked[text].text for text in unmasked_retries}
+
+    with phase('cache_store'):
+        for template in missing:
+            if template not in rejected:
+                set_cached_translation(
+                    template, target_lang,
+                    build_translation_response(template, source_lang, target_lang, template_translations[template])
+                )
+    return translations, missing + unmasked_retries
+
+def translate_document_data(cleaned_data: Dict, priority: str) -> Dict:
+    """Traduit un document HTML/Markdown en ne traduisant que ses nœuds de texte."""
+    upstream_texts = []
+
+    def translate_many(texts):
+        translations, missing = translate_segments(
+            texts, cleaned_data['source_language'], cleaned_data['target_language'], priority
+        )
+        upstream_texts.extend(missing)
+        return translations
+
+    translated_document, stats = translate_document(cleaned_data['message'], cleaned_data['format'], translate_many)
+    stats['upstream_characters'] = sum(len(text) for text in upstream_texts)
+
+    response_data = build_translation_response(
+        cleaned_data['message'],
+        cleaned_data['source_language'],
+        cleaned_data['target_language'],
+        translated_document
+    )
+    response_data['format'] = cleaned_data['format']
+    response_data['stats'] = stats
+    return response_data
+
+def translate_document_version(cleaned_data: Dict, priority: str, owner: str = '') -> Dict:
+    """
+    Traduit une nouvelle version d'un document identifié par ``document_id`` :
+    seuls les segments modifiés depuis la version précédente sont traduits
+    (voir ``api/documents.py``).
+    """
+    source_lang, target_lang = cleaned_data['source_language'], cleaned_data['target_language']
+    upstream_texts = []
+
+    def translate_many(texts):
+        translations, missing = translate_segments(texts, source_lang, target_lang, priority)
+        upstream_texts.extend(missing)
+        return translations
+
+    translator = IncrementalTranslator(
+        document_version_key(cleaned_data['document_id'], source_lang, target_lang, owner), translate_many
+    )
+    if cleaned_data['format'] == FORMAT_TEXT:
+        translated_document = translate_plain_text(cleaned_data['message'], translator)
+        stats = {'input_characters': len(cleaned_data['message'])}
+    else:
+        translated_document, stats = translate_document(cleaned_data['message'], cleaned_data['format'], translator)
+    stats['upstream_characters'] = sum(len(text) for text in upstream_texts)
+
+    response_data = build_translation_response(cleaned_data['message'], source_lang, target_lang, translated_document)
+    response_data['format'] = cleaned_data['format']
+    response_data['stats'] = stats
+    response_data['document'] = translator.report(cleaned_data['document_id'])
+    return response_data
+
+def catalog_translator(source_lang: str, target_lang: str, priority: str):
+    """Fonction ``translate_many`` pour les catalogues : cache, masquage et lots groupés."""
+    def translate_many(texts):
+        translations, _ = translate_segments(texts, source_lang, target_lang, priority, pack=True)
+        return translations
+    return translate_many
+
+def validate_catalog_request(request) -> Tuple[bool, Optional[str], Optional[Dict]]:
+    """Valide une requête multipart de traduction de catalogue."""
+    try:
+        catalog = request.FILES.get('catalog')
+        if catalog is None:
+            return False, "Catalog file is required", None
+
+        catalog_format = str(request.POST.get('format', '')).strip().lower() or detect_catalog_format(catalog.name)
+        target_languages = [
+            normalize_language_code(code.strip().lower())
+            for code in request.POST.get('target_languages', '').split(',') if code.strip()
+        ]
+        source_language = normalize_language_code(str(request.POST.get('source_language', 'auto')).strip().lower())
+
+        if not target_languages:
+            return False, "Target languages are required", None
+
+        if len(target_languages) > MAX_CATALOG_LANGUAGES:
+            return False, f"At most {MAX_CATALOG_LANGUAGES} target languages per request", None
+
+        unsupported = [code for code in target_languages if code not in LANGUAGE_NAMES and code not in AFRICAN_LANGUAGES]
+        if unsupported:
+            return False, f"Unsupported target language: {', '.join(unsupported)}", None
+
+        return True, None, {
+            'catalog': catalog,
+            'format': catalog_format,
+            'target_languages': list(dict.fromkeys(target_languages)),
+            'source_language': source_language
+        }
+    except CatalogFormatError as e:
+        return False, str(e), None
+    except Exception as e:
+        logger.error("Validation error: %s", e)
+        return False, f"Validation error: {str(e)}", None
+
 def validate_detect_data(data: Dict) -> Tuple[bool, Optional[str], Optional[Dict]]:
     """Valide les données de la requête pour la détection de langue."""
     try:
@@ -584,18 +934,23 @@ def validate_detect_data(data: Dict) -> Tuple[bool, Optional[str], Optional[Dict
             'message': message
         }
     except Exception as e:
-        logger.error(f"Validation error: {str(e)}")
+        logger.error("Validation error: %s", e)
         return False, f"Validation error: {str(e)}", None
 
 
 # Mise à jour des vues
+@session_exempt
 @require_http_methods(["POST"])
 @csrf_exempt
+@with_request_context
+@profiled_view
 def detect_language(request):
     """Vue optimisée pour la détection de langue."""
     try:
-        data = json.loads(request.body)
-        is_valid, error_message, cleaned_data = validate_detect_data(data)
+        with phase('parse'):
+            data = json.loads(request.body)
+        with phase('validate'):
+            is_valid, error_message, cleaned_data = validate_detect_data(data)
         
         if not is_valid:
             error_response, status_code = get_error_response(
@@ -604,35 +959,174 @@ def detect_language(request):
             )
             return JsonResponse(error_response, status=status_code)
 
-        cache_key = f"{DETECT_CACHE_KEY_PREFIX}{hash(cleaned_data['message'])}"
-        cached_result = cache.get(cache_key)
-        
-        if cached_result:
-            return JsonResponse(cached_result)
+        start_time = time()
+        response_data, cached = detect_message_language(cleaned_data['message'])
+        record_usage(
+            'detect', response_data['language'], '', 'langid',
+            len(cleaned_data['message']), cached, time() - start_time
+        )
+        with phase('serialize'):
+            return JsonResponse(response_data)
 
-        lang_code = langid.classify(cleaned_data['message'])[0]
-        lang_code = normalize_language_code(lang_code)
-        
-        response_data = {
-            'status': 'success',
-            'language': lang_code,
-            'language_name': get_language_display_name(lang_code)
+    except Exception as e:
+        error_response, status_code = get_error_response(e, request)
+        return error_json_response(error_response, status_code)
+
+def detect_message_language(message: str) -> Tuple[Dict, bool]:
+    """Détection de langue (cache, sinon langid) ; retourne ``(réponse, trouvée en cache)``."""
+    with phase('cache_lookup'):
+        cached_result = get_cached_detection(message)
+    if cached_result:
+        return cached_result, True
+
+    import langid
+
+    with phase('classify'):
+        lang_code = langid.classify(message)[0]
+    lang_code = normalize_language_code(lang_code)
+
+    response_data = {
+        'status': 'success',
+        'language': lang_code,
+        'language_name': get_language_display_name(lang_code)
+    }
+
+    with phase('cache_store'):
+        set_cached_detection(message, response_data)
+    return response_data, False
+
+def translate_message_data(cleaned_data: Dict, priority: str) -> Dict:
+    """Traduit un message texte (table de phrases, cache, puis service amont)."""
+    start_time = time()
+    # File de la classe de priorité de l'appelant (interactive / standard / bulk)
+    translations, upstream_texts = translate_segments(
+        [cleaned_data['message']],
+        cleaned_data['source_language'],
+        cleaned_data['target_language'],
+        priority
+    )
+    response_data = build_translation_response(
+        cleaned_data['message'],
+        cleaned_data['source_language'],
+        cleaned_data['target_language'],
+        translations[cleaned_data['message']]
+    )
+    if cleaned_data['source_language'] == 'auto':
+        detection, _ = detect_message_language(cleaned_data['message'])
+        response_data['detected_language'] = detection['language']
+        response_data['detected_language_name'] = detection['language_name']
+    record_usage(
+        'translate', cleaned_data['source_language'], cleaned_data['target_language'],
+        get_strategy_name(cleaned_data['source_language'], cleaned_data['target_language'], cleaned_data['message']),
+        len(cleaned_data['message']), not upstream_texts, time() - start_time, cleaned_data['message']
+    )
+    logger.info(
+        "Translation served",
+        extra={
+            'cache_tier': 'miss' if upstream_texts else 'cache',
+            'duration_ms': round((time() - start_time) * 1000, 1),
+            'sampled': True,
         }
-        
-        cache.set(cache_key, response_data, CACHE_TIMEOUT)
-        return JsonResponse(response_data)
+    )
+    return response_data
+
+def canonical_translation_query(cleaned_data: Dict) -> str:
+    """Query string canonique d'une traduction GET : une seule URL (clé de cache) par traduction."""
+    return urlencode([
+        ('message', cleaned_data['message']),
+        ('source_language', canonical_language_code(cleaned_data['source_language'])),
+        ('target_language', canonical_language_code(cleaned_data['target_language'])),
+    ])
+
+def translation_etag(cleaned_data: Dict) -> str:
+    """
+    ETag dérivé de l'entrée (langues + texte) : la revalidation se fait sans
+    traduire. ``TRANSLATION_ETAG_VERSION`` invalide les copies des caches HTTP.
+    """
+    digest = text_digest('\0'.join((
+        TRANSLATION_ETAG_VERSION,
+        cleaned_data['source_language'],
+        cleaned_data['target_language'],
+        cleaned_data['message'],
+    )))
+    # Faible : le contenu est équivalent, pas garanti identique octet par octet
+    return f'W/"{digest[:32]}"'
+
+def etag_matches(request, etag: str) -> bool:
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # Comparaison faible (RFC 9110) : W/"x" et "x" sont équivalents
+    candidates = (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+    return etag.removeprefix('W/') in candidates
+
+def patch_translation_cache_headers(response, etag: str):
+    response['ETag'] = etag
+    response['Cache-Control'] = (
+        f'public, max-age={TRANSLATION_GET_MAX_AGE}, s-maxage={TRANSLATION_GET_CDN_MAX_AGE}'
+    )
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+def translate_text_get(request):
+    """
+    ``GET /api/translate/?message=...&source_language=...&target_language=...`` :
+    textes courts uniquement (``MAX_GET_TEXT_LENGTH``), réponse cachable par
+    les navigateurs et les CDN. Les paramètres sont normalisés par une
+    redirection permanente vers l'URL canonique ; ``If-None-Match`` est traité
+    avant toute traduction.
+    """
+    try:
+        with phase('validate'):
+            data = {key: request.GET.get(key, '') for key in ('message', 'source_language', 'target_language')}
+            is_valid, error_message, cleaned_data = validate_request_data(data)
+            if is_valid and len(cleaned_data['message']) > MAX_GET_TEXT_LENGTH:
+                is_valid, error_message = False, (
+                    f"GET translations are limited to {MAX_GET_TEXT_LENGTH} characters, use POST"
+                )
+
+        if not is_valid:
+            error_response, status_code = get_error_response(ValueError(error_message), request)
+            response = JsonResponse(error_response, status=status_code)
+            patch_cache_control(response, no_store=True)
+            return response
+
+        canonical_query = canonical_translation_query(cleaned_data)
+        if request.META.get('QUERY_STRING', '') != canonical_query:
+            return HttpResponsePermanentRedirect(f"{request.path}?{canonical_query}")
+
+        etag = translation_etag(cleaned_data)
+        if etag_matches(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            response_data = translate_message_data(cleaned_data, resolve_priority(request))
+            with phase('serialize'):
+                response = JsonResponse(response_data)
+        patch_translation_cache_headers(response, etag)
+        return response
 
     except Exception as e:
         error_response, status_code = get_error_response(e, request)
-        return JsonResponse(error_response, status=status_code)
+        response = error_json_response(error_response, status_code)
+        # Une erreur (ex. 503) ne doit pas rester dans un cache intermédiaire
+        patch_cache_control(response, no_store=True)
+        return response
 
-@require_http_methods(["POST"])
+@session_exempt
+@require_http_methods(["GET", "POST"])
 @csrf_exempt
+@with_request_context
+@profiled_view
 def translate_text(request):
-    """Vue principale pour la traduction de texte."""
+    """Vue principale pour la traduction de texte (GET : textes courts, réponse cachable)."""
+    if request.method == 'GET':
+        return translate_text_get(request)
     try:
-        data = json.loads(request.body)
-        is_valid, error_message, cleaned_data = validate_request_data(data)
+        with phase('parse'):
+            data = json.loads(request.body)
+        with phase('validate'):
+            is_valid, error_message, cleaned_data = validate_request_data(data)
         
         if not is_valid:
             error_response, status_code = get_error_response(
@@ -641,39 +1135,206 @@ def translate_text(request):
             )
             return JsonResponse(error_response, status=status_code)
 
-        cache_key = f"{CACHE_KEY_PREFIX}{hash(cleaned_data['message'])}_{cleaned_data['target_language']}"
-        cached_result = cache.get(cache_key)
-        
-        if cached_result:
-            return JsonResponse(cached_result)
-
-        with ThreadPoolExecutor(max_workers=THREAD_POOL_MAX_WORKERS) as executor:
-            future = executor.submit(
-                perform_translation,
-                cleaned_data['message'],
-                cleaned_data['source_language'],
-                cleaned_data['target_language']
+        start_time = time()
+        if cleaned_data['document_id'] or cleaned_data['format'] != FORMAT_TEXT:
+            if cleaned_data['document_id']:
+                response_data = translate_document_version(
+                    cleaned_data, resolve_priority(request, data), request.headers.get(API_KEY_HEADER, '')
+                )
+            else:
+                response_data = translate_document_data(cleaned_data, resolve_priority(request, data))
+            record_usage(
+                'translate', cleaned_data['source_language'], cleaned_data['target_language'],
+                get_strategy_name(cleaned_data['source_language'], cleaned_data['target_language'], cleaned_data['message']),
+                response_data['stats']['input_characters'], response_data['stats']['upstream_characters'] == 0,
+                time() - start_time
+            )
+            logger.info(
+                "Document translation served",
+                extra={
+                    'format': cleaned_data['format'],
+                    'reused_segments': response_data.get('document', {}).get('reused_segments'),
+                    'upstream_characters': response_data['stats']['upstream_characters'],
+                    'duration_ms': round((time() - start_time) * 1000, 1),
+                    'sampled': True,
+                }
             )
-            translated_text = future.result(timeout=TRANSLATION_TIMEOUT)
+            with phase('serialize'):
+                return JsonResponse(response_data)
 
-        response_data = {
-            'status': 'success',
-            'source_language': cleaned_data['source_language'],
-            'target_language': cleaned_data['target_language'],
-            'target_language_name': get_language_display_name(cleaned_data['target_language']), 
-            'original_text': cleaned_data['message'],
-            'translated_text': translated_text
-        }
-        
-        cache.set(cache_key, response_data, CACHE_TIMEOUT)
-        return JsonResponse(response_data)
+        response_data = translate_message_data(cleaned_data, resolve_priority(request, data))
+        with phase('serialize'):
+            return JsonResponse(response_data)
 
     except Exception as e:
         error_response, status_code = get_error_response(e, request)
-        return JsonResponse(error_response, status=status_code)
+        return error_json_response(error_response, status_code)
 
+@session_exempt
 @require_http_methods(["POST"])
 @csrf_exempt
+@with_request_context
+@profiled_view
+def translate_batch(request):
+    """
+    Traduit plusieurs messages en une requête (utilisée par le client SDK) :
+    ``{"items": [{"message": ..., "target_language": ...}, ...]}``.
+    Chaque élément est validé séparément et reçoit son propre résultat, dans l'ordre.
+    """
+    try:
+        with phase('parse'):
+            data = json.loads(request.body)
+        items = data.get('items') if isinstance(data, dict) else None
+
+        if not isinstance(items, list) or not items:
+            error_message = "Items are required"
+        elif len(items) > MAX_BATCH_ITEMS:
+            error_message = f"At most {MAX_BATCH_ITEMS} items per batch"
+        else:
+            error_message = None
+        if error_message:
+            error_response, status_code = get_error_response(
+                ValueError(error_message),
+                request
+            )
+            return JsonResponse(error_response, status=status_code)
+
+        priority = resolve_priority(request, data)
+        results = [None] * len(items)
+        groups = {}  # (source, cible) -> [(position, message)]
+        with phase('validate'):
+            validated = [validate_request_data(item) for item in items]
+        for index, (is_valid, error_message, cleaned_data) in enumerate(validated):
+            if not is_valid:
+                results[index] = {'status': 'error', 'message': error_message}
+            elif cleaned_data['format'] != FORMAT_TEXT:
+                results[index] = translate_document_data(cleaned_data, priority)
+            else:
+                key = (cleaned_data['source_language'], cleaned_data['target_language'])
+                groups.setdefault(key, []).append((index, cleaned_data['message']))
+
+        for (source_language, target_language), entries in groups.items():
+            translations, _ = translate_segments(
+                list(dict.fromkeys(message for _, message in entries)), source_language, target_language, priority
+            )
+            for index, message in entries:
+                results[index] = build_translation_response(
+                    message, source_language, target_language, translations[message]
+                )
+
+        with phase('serialize'):
+            return JsonResponse({'status': 'success', 'results': results})
+
+    except Exception as e:
+        error_response, status_code = get_error_response(e, request)
+        return error_json_response(error_response, status_code)
+
+@session_exempt
+@require_http_methods(["POST"])
+@csrf_exempt
+@with_request_context
+@profiled_view
+def translate_catalog(request):
+    """
+    Traduit un catalogue ``.po`` ou JSON (champ multipart ``catalog``) vers une
+    ou plusieurs langues (``target_languages=en,es``). Retourne le catalogue
+    traduit au même format, ou une archive zip s'il y a plusieurs langues.
+    """
+    try:
+        is_valid, error_message, cleaned_data = validate_catalog_request(request)
+
+        if not is_valid:
+            error_response, status_code = get_error_response(
+                ValueError(error_message),
+                request
+            )
+            return JsonResponse(error_response, status=status_code)
+
+        # Classe bulk par défaut : un catalogue ne doit pas retarder les traductions interactives
+        priority = resolve_priority(request, {'priority': request.POST.get('priority', 'bulk')})
+        catalog = cleaned_data['catalog']
+        targets = cleaned_data['target_languages']
+        start_time = time()
+
+        # Copie du fichier reçu : le travail peut survivre à la requête (et à ses fichiers temporaires)
+        source = tempfile.TemporaryFile()
+        for chunk in catalog.chunks():
+            source.write(chunk)
+
+        def translate_into(output, target_language):
+            stats = translate_catalog_file(
+                source, output, cleaned_data['format'], target_language,
+                catalog_translator(cleaned_data['source_language'], target_language, priority)
+            )
+            logger.info(
+                "Catalog translated",
+                extra={'target_language': target_language, 'duration_ms': round((time() - start_time) * 1000, 1), **stats}
+            )
+
+        # Résultat écrit sur disque au fil de l'eau : la mémoire ne dépend pas de la taille du catalogue
+        def build(result):
+            with source:
+                if len(targets) == 1:
+                    translate_into(result, targets[0])
+                    return localized_catalog_name(catalog.name, targets[0])
+                with zipfile.ZipFile(result, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    for target_language in targets:
+                        with archive.open(localized_catalog_name(catalog.name, target_language), 'w') as entry:
+                            translate_into(entry, target_language)
+                return f"{localized_catalog_name(catalog.name, 'translations').rsplit('.', 1)[0]}.zip"
+
+        job = start_catalog_job(build)
+        if not job.wait(CATALOG_SYNC_WAIT):
+            return JsonResponse({
+                'status': JOB_RUNNING,
+                'job_id': job.job_id,
+                'status_url': reverse('api:catalog_job', args=[job.job_id]),
+            }, status=202)
+        if job.error is not None:
+            raise job.error
+        return catalog_job_result(job.job_id)
+
+    except Exception as e:
+        error_response, status_code = get_error_response(e, request)
+        return error_json_response(error_response, status_code)
+
+def catalog_job_result(job_id: str) -> FileResponse:
+    state = get_job_state(job_id)
+    return FileResponse(open_job_result(job_id), as_attachment=True, filename=state['filename'])
+
+@session_exempt
+@require_http_methods(["GET"])
+@with_request_context
+def catalog_job(request, job_id):
+    """
+    État d'une traduction de catalogue lancée par ``translate_catalog`` : ``202``
+    tant qu'elle tourne, puis le fichier traduit (ou l'erreur).
+    """
+    try:
+        state = get_job_state(job_id)
+        if state is None:
+            if job_node(job_id) != CATALOG_JOB_NODE:
+                # Résultats non partagés entre machines : le répartiteur doit router sur le préfixe du job_id
+                logger.error("Catalog job polled on the wrong node", extra={'job_id': job_id, 'node': CATALOG_JOB_NODE})
+                return JsonResponse({'status': 'error', 'message': "Catalog job runs on another node"}, status=421)
+            return JsonResponse({'status': 'error', 'message': "Unknown or expired catalog job"}, status=404)
+        if state['status'] == JOB_RUNNING:
+            response = JsonResponse({'status': JOB_RUNNING, 'job_id': job_id}, status=202)
+            response['Retry-After'] = str(BUSY_RETRY_AFTER)
+            return response
+        if state['status'] == JOB_FAILED:
+            raise CatalogJobError(state.get('message', ''))
+        return catalog_job_result(job_id)
+
+    except Exception as e:
+        error_response, status_code = get_error_response(e, request)
+        return error_json_response(error_response, status_code)
+
+@session_exempt
+@require_http_methods(["POST"])
+@csrf_exempt
+@with_request_context
+@profiled_view
 def create_page(request):
     """Vue pour créer une page dans une langue africaine."""
     try:
@@ -698,10 +1359,13 @@ def create_page(request):
 
     except Exception as e:
         error_response, status_code = get_error_response(e, request)
-        return JsonResponse(error_response, status=status_code)
+        return error_json_response(error_response, status_code)
 
+@session_exempt
 @require_http_methods(["POST"])
 @csrf_exempt
+@with_request_context
+@profiled_view
 def create_and_translate_page(request):
     """Vue combinée pour créer et traduire une page localement."""
     try:
@@ -725,13 +1389,15 @@ def create_and_translate_page(request):
             return JsonResponse(error_response, status=status_code)
 
         # 1. Création de la page
-        translation_url = LocalPageCreationService.create_page(
-            message, 
-            target_language
-        )
+        with phase('upstream_create_page'):
+            translation_url = LocalPageCreationService.create_page(
+                message, 
+                target_language
+            )
         
         # 2. Traduction de la page
-        translated_text = LocalTranslationService.translate_url(translation_url)
+        with phase('upstream_translate_page'):
+            translated_text = LocalTranslationService.translate_url(translation_url)
 
         return JsonResponse({
             'status': 'success',
@@ -740,7 +1406,7 @@ def create_and_translate_page(request):
 
     except Exception as e:
         error_response, status_code = get_error_response(e, request)
-        return JsonResponse(error_response, status=status_code)
+        return error_json_response(error_response, status_code)
 
 class LocalPageCreationService:
     """Service pour la création de pages de traduction locale."""
@@ -772,8 +1438,7 @@ class LocalPageCreationService:
             "target_language": local_target_language
         }
 
-        local_response = requests.post(local_create_url, headers=local_headers, json=local_payload)
-        local_response.raise_for_status()
+        local_response = post_json('languesafrique', local_create_url, headers=local_headers, json=local_payload)
         local_data = local_response.json()
         
         local_translation_url = local_data.get('data', {}).get('translation', {}).get('url')
@@ -810,8 +1475,7 @@ class LocalTranslationService:
             "id": None
         }
 
-        local_response = requests.post(local_translate_url, headers=local_headers, json=local_payload)
-        local_response.raise_for_status()
+        local_response = post_json('biotrack', local_translate_url, headers=local_headers, json=local_payload)
         
         local_result = local_response.json()
         # Extraction du texte traduit de la réponse imbriquée
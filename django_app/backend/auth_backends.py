@@ -0,0 +1,166 @@
+"""
+Authentification par adresse e-mail.
+
+Les comptes du site utilisent l'e-mail comme ``username`` (colonne unique,
+donc indexée). ``EmailBackend`` retrouve le compte en une seule requête sur
+cet index, en acceptant l'e-mail tel que saisi ou en minuscules (comptes
+créés avant la normalisation).
+
+Les échecs sont comptés dans le cache par e-mail et par adresse IP ; une
+tentative refusée l'est avant toute requête et tout calcul de hachage du mot
+de passe :
+
+- par IP, au-delà de ``LOGIN_MAX_FAILURES_PER_IP`` échecs sur la fenêtre.
+  L'adresse est celle du client, lue dans ``LOGIN_CLIENT_IP_HEADER`` derrière
+  un proxy (``REMOTE_ADDR`` serait celle du proxy, partagée par tous) ;
+- par e-mail, pas de blocage : au-delà de ``LOGIN_MAX_FAILURES_PER_EMAIL``
+  échecs, chaque nouvel échec impose une attente qui double, plafonnée à
+  ``LOGIN_BACKOFF_MAX`` secondes. Un tiers qui connaît l'adresse ralentit les
+  essais sur le compte sans pouvoir en bloquer le propriétaire.
+
+La raison de l'échec est exposée dans ``request.login_failure`` pour que la
+vue choisisse son message sans nouvelle requête.
+
+À activer dans les réglages :
+
+    AUTHENTICATION_BACKENDS = ['backend.auth_backends.EmailBackend']
+"""
+
+import hashlib
+from time import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+# Constants
+LOGIN_FAILURE_WINDOW = getattr(settings, 'LOGIN_FAILURE_WINDOW', 15 * 60)  # secondes
+LOGIN_MAX_FAILURES_PER_EMAIL = getattr(settings, 'LOGIN_MAX_FAILURES_PER_EMAIL', 5)
+LOGIN_MAX_FAILURES_PER_IP = getattr(settings, 'LOGIN_MAX_FAILURES_PER_IP', 50)
+LOGIN_BACKOFF_BASE = getattr(settings, 'LOGIN_BACKOFF_BASE', 1)  # secondes, premier délai par e-mail
+LOGIN_BACKOFF_MAX = getattr(settings, 'LOGIN_BACKOFF_MAX', 30)  # secondes
+LOGIN_FAILURE_KEY_PREFIX = "login_fail_"
+LOGIN_WAIT_KEY_PREFIX = "login_wait_"
+# En-tête posé par le proxy de confiance (ex. 'X-Forwarded-For', 'X-Real-IP') et nombre
+# de proxys de confiance : l'adresse du client est la n-ième en partant de la droite
+LOGIN_CLIENT_IP_HEADER = getattr(settings, 'LOGIN_CLIENT_IP_HEADER', None)
+LOGIN_TRUSTED_PROXY_COUNT = getattr(settings, 'LOGIN_TRUSTED_PROXY_COUNT', 1)
+
+# Raisons d'échec (request.login_failure)
+FAILURE_THROTTLED = 'throttled'
+FAILURE_UNKNOWN_EMAIL = 'unknown_email'
+FAILURE_BAD_PASSWORD = 'bad_password'
+FAILURE_INACTIVE = 'inactive'
+
+
+def normalize_email(email) -> str:
+    return str(email or '').strip().lower()
+
+
+def get_client_ip(request) -> str:
+    """Adresse du client : ``LOGIN_CLIENT_IP_HEADER`` derrière un proxy de confiance, sinon ``REMOTE_ADDR``."""
+    if request is None:
+        return ''
+    if LOGIN_CLIENT_IP_HEADER:
+        # Les entrées de gauche sont fournies par le client ; seules les dernières viennent de nos proxys
+        forwarded = [value.strip() for value in request.headers.get(LOGIN_CLIENT_IP_HEADER, '').split(',')]
+        forwarded = [value for value in forwarded if value]
+        if forwarded:
+            return forwarded[-min(LOGIN_TRUSTED_PROXY_COUNT, len(forwarded))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _email_digest(email: str) -> str:
+    return hashlib.sha256(email.encode('utf-8')).hexdigest()
+
+
+def _failure_keys(email: str, ip: str):
+    keys = [f"{LOGIN_FAILURE_KEY_PREFIX}email_{_email_digest(email)}"]
+    if ip:
+        keys.append(f"{LOGIN_FAILURE_KEY_PREFIX}ip_{ip}")
+    return keys
+
+
+def _wait_key(email: str) -> str:
+    return f"{LOGIN_WAIT_KEY_PREFIX}{_email_digest(email)}"
+
+
+def is_login_throttled(email: str, ip: str) -> bool:
+    """Vrai si l'IP a dépassé son nombre d'échecs, ou si l'e-mail est en période d'attente."""
+    keys = _failure_keys(email, ip) + [_wait_key(email)]
+    values = cache.get_many(keys)
+    if ip and values.get(keys[1], 0) >= LOGIN_MAX_FAILURES_PER_IP:
+        return True
+    return values.get(keys[-1], 0) > time()
+
+
+def get_login_backoff(failures: int) -> float:
+    """Attente imposée après ``failures`` échecs sur un e-mail (0 sous le seuil)."""
+    excess = failures - LOGIN_MAX_FAILURES_PER_EMAIL
+    if excess < 0:
+        return 0
+    return min(LOGIN_BACKOFF_MAX, LOGIN_BACKOFF_BASE * 2 ** min(excess, 32))
+
+
+def record_login_failure(email: str, ip: str):
+    counts = []
+    for key in _failure_keys(email, ip):
+        # add() ne fait rien si la clé existe : la fenêtre part du premier échec
+        if cache.add(key, 1, LOGIN_FAILURE_WINDOW):
+            counts.append(1)
+            continue
+        try:
+            counts.append(cache.incr(key))
+        except ValueError:
+            cache.set(key, 1, LOGIN_FAILURE_WINDOW)
+            counts.append(1)
+    backoff = get_login_backoff(counts[0])
+    if backoff:
+        cache.set(_wait_key(email), time() + backoff, LOGIN_FAILURE_WINDOW)
+
+
+def reset_login_failures(email: str):
+    cache.delete_many([_failure_keys(email, '')[0], _wait_key(email)])
+
+
+class EmailBackend(ModelBackend):
+    """Authentification par e-mail : une requête indexée, échecs limités via le cache."""
+
+    def authenticate(self, request, username=None, password=None, email=None, **kwargs):
+        raw_email = str(email or username or '').strip()
+        normalized = normalize_email(raw_email)
+        if not normalized or password is None:
+            return None
+
+        ip = get_client_ip(request)
+        if is_login_throttled(normalized, ip):
+            self._fail(request, FAILURE_THROTTLED)
+            return None
+
+        UserModel = get_user_model()
+        candidates = {raw_email, normalized}
+        users = list(UserModel._default_manager.filter(**{f'{UserModel.USERNAME_FIELD}__in': candidates})[:2])
+        # Deux comptes possibles pour d'anciennes adresses en casse mixte : on préfère la saisie exacte
+        user = next((item for item in users if item.get_username() == raw_email), users[0] if users else None)
+
+        if user is None:
+            # Pas de hachage factice : la vue indique déjà si l'adresse est inconnue
+            record_login_failure(normalized, ip)
+            self._fail(request, FAILURE_UNKNOWN_EMAIL)
+            return None
+        if not user.check_password(password):
+            record_login_failure(normalized, ip)
+            self._fail(request, FAILURE_BAD_PASSWORD)
+            return None
+        if not self.user_can_authenticate(user):
+            self._fail(request, FAILURE_INACTIVE)
+            return None
+
+        reset_login_failures(normalized)
+        return user
+
+    @staticmethod
+    def _fail(request, reason: str):
+        if request is not None:
+            request.login_failure = reason
@@ -0,0 +1,100 @@
+import random
+import uuid
+from contextlib import contextmanager
+from time import perf_counter
+from unittest import mock
+
+from django.contrib.auth import base_user
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from backend.auth_backends import EmailBackend
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le débit des connexions sous une attaque de type credential stuffing : "
+        "ancien chemin (ModelBackend + requête sur email) contre EmailBackend."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help="Comptes créés pour la mesure")
+        parser.add_argument('--attempts', type=int, default=300, help="Tentatives par scénario")
+        parser.add_argument('--ips', type=int, default=10, help="Adresses IP attaquantes")
+        parser.add_argument('--unknown-ratio', type=float, default=0.3, help="Part d'adresses inexistantes")
+
+    def handle(self, *args, **options):
+        run = uuid.uuid4().hex[:8]
+        emails = [f"bench_login_{run}_{index}@example.com" for index in range(options['users'])]
+        encoded = make_password('correct horse battery staple')
+        User.objects.bulk_create(User(username=email, email=email, password=encoded) for email in emails)
+
+        rng = random.Random(42)
+        ips = [f"10.{rng.randrange(256)}.{rng.randrange(256)}.{index}" for index in range(options['ips'])]
+        attempts = []
+        for index in range(options['attempts']):
+            if rng.random() < options['unknown_ratio']:
+                email = f"bench_login_{run}_missing_{index}@example.com"
+            else:
+                email = rng.choice(emails)
+            attempts.append((email, rng.choice(ips), f"wrong-{index}"))
+
+        try:
+            self._report('ancien chemin', self._run(attempts, self._legacy_attempt))
+            self._report('EmailBackend', self._run(attempts, self._email_backend_attempt))
+        finally:
+            User.objects.filter(username__startswith=f"bench_login_{run}_").delete()
+
+    @staticmethod
+    def _legacy_attempt(request, email, password):
+        # Ancien login_user : authenticate() puis requête non indexée pour choisir le message
+        if ModelBackend().authenticate(request, username=email, password=password) is None:
+            User.objects.filter(email=email).exists()
+
+    @staticmethod
+    def _email_backend_attempt(request, email, password):
+        EmailBackend().authenticate(request, username=email, password=password)
+
+    def _run(self, attempts, attempt):
+        factory = RequestFactory()
+        with self._count_hashes() as hashes, CaptureQueriesContext(connection) as queries:
+            start = perf_counter()
+            for email, ip, password in attempts:
+                attempt(factory.post('/backend/login/', REMOTE_ADDR=ip), email, password)
+            elapsed = perf_counter() - start
+        return {
+            'attempts': len(attempts),
+            'seconds': elapsed,
+            'queries': len(queries.captured_queries),
+            'hashes': hashes['count'],
+        }
+
+    @staticmethod
+    @contextmanager
+    def _count_hashes():
+        counter = {'count': 0}
+        real_check, real_make = base_user.check_password, base_user.make_password
+
+        def counted_check(*args, **kwargs):
+            counter['count'] += 1
+            return real_check(*args, **kwargs)
+
+        def counted_make(*args, **kwargs):
+            counter['count'] += 1
+            return real_make(*args, **kwargs)
+
+        with mock.patch.object(base_user, 'check_password', counted_check), \
+                mock.patch.object(base_user, 'make_password', counted_make):
+            yield counter
+
+    def _report(self, name, result):
+        self.stdout.write(
+            f"{name:<15} {result['attempts'] / result['seconds']:>9.1f} tentatives/s  "
+            f"{result['queries'] / result['attempts']:.2f} requêtes/tentative  "
+            f"{result['hashes']} hachages pour {result['attempts']} tentatives"
+        )
@@ -0,0 +1,116 @@
+"""
+Sessions : chemin rapide sans session pour les pages qui n'en ont pas besoin.
+
+Les vues marquées ``session_exempt`` (pages vitrine du site, endpoints de
+``api/``) ne chargent jamais la session ni l'utilisateur et n'écrivent aucun
+cookie de session. Elles reçoivent une session vide en lecture seule et un
+``AnonymousUser``.
+
+Pour la barre de navigation, un cookie lisible ``signed_in`` indique si le
+visiteur est connecté. Il est tenu à jour sur les requêtes qui chargent déjà la
+session, sans requête supplémentaire.
+
+    MIDDLEWARE = [
+        ...
+        'backend.middleware.SessionMiddleware',  # remplace django.contrib.sessions
+        ...
+    ]
+"""
+
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.base import SessionBase
+from django.contrib.sessions.middleware import SessionMiddleware as DjangoSessionMiddleware
+
+# Constants
+AUTH_HINT_COOKIE = 'signed_in'
+
+
+def session_exempt(view):
+    """Marque une vue (fonction ou classe) comme n'utilisant ni session ni utilisateur."""
+    if isinstance(view, type):
+        view.session_exempt = True
+        return view
+
+    @wraps(view)
+    def wrapped_view(*args, **kwargs):
+        return view(*args, **kwargs)
+
+    wrapped_view.session_exempt = True
+    return wrapped_view
+
+
+def is_session_exempt(view_func) -> bool:
+    if getattr(view_func, 'session_exempt', False):
+        return True
+    return getattr(getattr(view_func, 'view_class', None), 'session_exempt', False)
+
+
+class ExemptSession(SessionBase):
+    """Session vide : aucune lecture du stockage, écritures ignorées."""
+
+    def __init__(self):
+        super().__init__(None)
+        self._session_cache = {}
+
+    accessed = property(lambda self: False, lambda self, value: None)
+    modified = property(lambda self: False, lambda self, value: None)
+
+    def load(self):
+        return {}
+
+    def exists(self, session_key):
+        return False
+
+    def create(self):
+        pass
+
+    def save(self, must_create=False):
+        pass
+
+    def delete(self, session_key=None):
+        pass
+
+
+class SessionMiddleware(DjangoSessionMiddleware):
+    """``SessionMiddleware`` de Django, avec le chemin rapide des vues ``session_exempt``."""
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if is_session_exempt(view_func):
+            request.session = ExemptSession()
+            request.user = AnonymousUser()
+            request.session_exempt = True
+
+    def process_response(self, request, response):
+        if getattr(request, 'session_exempt', False):
+            return response
+        response = super().process_response(request, response)
+        self._sync_auth_hint(request, response)
+        return response
+
+    @staticmethod
+    def _sync_auth_hint(request, response):
+        session = getattr(request, 'session', None)
+        # Seulement si la session a déjà été chargée par cette requête
+        if session is None or not session.accessed:
+            return
+        signed_in = SESSION_KEY in session
+        if signed_in and AUTH_HINT_COOKIE not in request.COOKIES:
+            response.set_cookie(
+                AUTH_HINT_COOKIE, '1',
+                max_age=None if session.get_expire_at_browser_close() else session.get_expiry_age(),
+                domain=settings.SESSION_COOKIE_DOMAIN,
+                path=settings.SESSION_COOKIE_PATH,
+                secure=settings.SESSION_COOKIE_SECURE or None,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+        elif not signed_in and AUTH_HINT_COOKIE in request.COOKIES:
+            response.delete_cookie(
+                AUTH_HINT_COOKIE,
+                path=settings.SESSION_COOKIE_PATH,
+                domain=settings.SESSION_COOKIE_DOMAIN,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
@@ -0,0 +1,169 @@
+"""
+Moteur de sessions « cache d'abord », avec écriture différée optionnelle en base.
+
+Les sessions sont lues et écrites dans le cache (``SESSION_CACHE_ALIAS``).
+Avec ``SESSION_WRITE_BEHIND = True``, chaque sauvegarde est aussi recopiée
+dans la table ``django_session`` par un thread d'arrière-plan, par lots
+(``bulk_create`` avec mise à jour en cas de conflit) : la requête n'attend
+jamais la base, et une session évincée du cache est relue depuis la base.
+
+Une session supprimée (déconnexion, ``cycle_key``) laisse une pierre tombale
+dans le cache : tant que la suppression en base est en file, la ligne
+encore présente n'est jamais relue.
+
+    SESSION_ENGINE = 'backend.session_store'
+"""
+
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.contrib.sessions.backends.cache import SessionStore as CacheSessionStore
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Constants
+KEY_PREFIX = "backend.session_store"
+SESSION_WRITE_BEHIND = getattr(settings, 'SESSION_WRITE_BEHIND', False)
+SESSION_WRITE_BEHIND_INTERVAL = getattr(settings, 'SESSION_WRITE_BEHIND_INTERVAL', 1.0)  # secondes
+SESSION_WRITE_BEHIND_BATCH = 500
+SESSION_TOMBSTONE = '__deleted__'
+SESSION_TOMBSTONE_TIMEOUT = 3600  # couvre largement l'intervalle de vidage (et ses nouvelles tentatives)
+
+
+class _WriteBehind:
+    """
+    File des écritures de sessions vers la base. Plusieurs sauvegardes d'une
+    même session entre deux vidages n'en produisent qu'une.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Redémarrage après fork : le thread du processus parent n'existe pas dans l'enfant
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='session-write-behind', daemon=True)
+            self._thread.start()
+
+    def save(self, session_key: str, session_data: str, expire_date):
+        self._ensure_started()
+        self._queue.put((session_key, session_data, expire_date))
+
+    def delete(self, session_key: str):
+        self._ensure_started()
+        self._queue.put((session_key, None, None))
+
+    def _run(self):
+        while True:
+            pending = {}
+            item = self._queue.get()
+            pending[item[0]] = item
+            # Regroupe ce qui arrive pendant l'intervalle
+            try:
+                while len(pending) < SESSION_WRITE_BEHIND_BATCH:
+                    item = self._queue.get(timeout=SESSION_WRITE_BEHIND_INTERVAL)
+                    pending[item[0]] = item
+            except queue.Empty:
+                pass
+            try:
+                self.flush(pending.values())
+            except Exception as e:
+                logger.error("Session write-behind failed for %d sessions: %s", len(pending), e)
+
+    @staticmethod
+    def flush(items):
+        from django.contrib.sessions.models import Session
+        from django.db import close_old_connections
+
+        close_old_connections()
+        saved = [
+            Session(session_key=key, session_data=data, expire_date=expire_date)
+            for key, data, expire_date in items if data is not None
+        ]
+        deleted = [key for key, data, _ in items if data is None]
+        if saved:
+            Session.objects.bulk_create(
+                saved,
+                update_conflicts=True,
+                unique_fields=['session_key'],
+                update_fields=['session_data', 'expire_date'],
+            )
+        if deleted:
+            Session.objects.filter(session_key__in=deleted).delete()
+
+
+write_behind = _WriteBehind()
+
+
+class SessionStore(CacheSessionStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def load(self):
+        try:
+            session_data = self._cache.get(self.cache_key)
+        except Exception:
+            session_data = None
+        if session_data == SESSION_TOMBSTONE:
+            session_data = None
+        elif session_data is None and SESSION_WRITE_BEHIND and self.session_key:
+            session_data = self._load_from_db()
+        if session_data is not None:
+            return session_data
+        self._session_key = None
+        return {}
+
+    def _load_from_db(self):
+        from django.contrib.sessions.models import Session
+
+        session = Session.objects.filter(session_key=self.session_key, expire_date__gt=timezone.now()).first()
+        if session is None:
+            return None
+        session_data = self.decode(session.session_data)
+        self._cache.set(self.cache_key, session_data, self.get_expiry_age(expiry=session.expire_date))
+        return session_data
+
+    def exists(self, session_key):
+        if super().exists(session_key):
+            return True
+        if not SESSION_WRITE_BEHIND:
+            return False
+        from django.contrib.sessions.models import Session
+
+        return Session.objects.filter(session_key=session_key).exists()
+
+    def save(self, must_create=False):
+        super().save(must_create=must_create)
+        if SESSION_WRITE_BEHIND:
+            write_behind.save(
+                self.session_key,
+                self.encode(self._get_session(no_load=must_create)),
+                self.get_expiry_date(),
+            )
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            session_key = self.session_key
+        super().delete(session_key)
+        if SESSION_WRITE_BEHIND and session_key:
+            self._cache.set(self.cache_key_prefix + session_key, SESSION_TOMBSTONE, SESSION_TOMBSTONE_TIMEOUT)
+            write_behind.delete(session_key)
+
+    @classmethod
+    def clear_expired(cls):
+        if SESSION_WRITE_BEHIND:
+            from django.contrib.sessions.models import Session
+
+            Session.objects.filter(expire_date__lt=timezone.now()).delete()
@@ -1,3 +1,144 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from backend.auth_backends import FAILURE_BAD_PASSWORD, FAILURE_THROTTLED, EmailBackend, get_client_ip
+from backend.middleware import AUTH_HINT_COOKIE, ExemptSession
+from backend.session_store import SessionStore, write_behind
+
+DJANGO_SESSION_MIDDLEWARE = 'django.contrib.sessions.middleware.SessionMiddleware'
+SITE_MIDDLEWARE = [
+    'backend.middleware.SessionMiddleware' if entry == DJANGO_SESSION_MIDDLEWARE else entry
+    for entry in settings.MIDDLEWARE
+]
+
+
+class ExemptSessionTests(TestCase):
+    def test_writes_are_ignored(self):
+        session = ExemptSession()
+        session['key'] = 'value'
+        session.save()
+        self.assertFalse(session.modified)
+        self.assertFalse(session.accessed)
+        self.assertIsNone(session.session_key)
+
+
+@override_settings(MIDDLEWARE=SITE_MIDDLEWARE, SESSION_ENGINE='backend.session_store')
+class SessionMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='visitor@example.com', password='secret-password')
+
+    def test_exempt_page_skips_session_and_user(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('front:welcome'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.wsgi_request.session, ExemptSession)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertNotIn(AUTH_HINT_COOKIE, response.cookies)
+
+    def test_signed_in_cookie_follows_login_and_logout(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('front:success'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies[AUTH_HINT_COOKIE].value, '1')
+
+        # Déjà présent : pas réécrit à chaque requête
+        response = self.client.get(reverse('front:success'))
+        self.assertNotIn(AUTH_HINT_COOKIE, response.cookies)
+
+        response = self.client.get(reverse('backend:logout_user'))
+        self.assertEqual(response.cookies[AUTH_HINT_COOKIE].value, '')
+        self.assertEqual(response.cookies[AUTH_HINT_COOKIE]['max-age'], 0)
+
+
+class WriteBehindSessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patches = [
+            mock.patch('backend.session_store.SESSION_WRITE_BEHIND', True),
+            # Pas de thread : le test décide quand la base est écrite
+            mock.patch.object(write_behind, 'save'),
+            mock.patch.object(write_behind, 'delete'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _persisted_session(self):
+        store = SessionStore()
+        store['user'] = 42
+        store.save()
+        write_behind.flush([(store.session_key, store.encode({'user': 42}), store.get_expiry_date())])
+        return store
+
+    def test_evicted_session_is_reloaded_from_database(self):
+        store = self._persisted_session()
+        cache.clear()
+        self.assertEqual(SessionStore(store.session_key).load(), {'user': 42})
+
+    def test_deleted_session_is_not_reloaded_before_database_delete(self):
+        store = self._persisted_session()
+        session_key = store.session_key
+        store.delete()
+        write_behind.delete.assert_called_once_with(session_key)
+
+        reloaded = SessionStore(session_key)
+        self.assertEqual(reloaded.load(), {})
+        self.assertIsNone(reloaded.session_key)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class EmailBackendThrottlingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        User.objects.create_user(username='owner@example.com', password='secret-password')
+        self.clock = 1000.0
+        patch = mock.patch('backend.auth_backends.time', side_effect=lambda: self.clock)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def attempt(self, password, ip='203.0.113.7'):
+        request = self.factory.post('/backend/login/', REMOTE_ADDR=ip)
+        user = EmailBackend().authenticate(request, username='owner@example.com', password=password)
+        return user, getattr(request, 'login_failure', None)
+
+    def test_email_failures_back_off_instead_of_locking(self):
+        for index in range(5):
+            self.assertEqual(self.attempt(f'wrong-{index}', ip=f'198.51.100.{index}')[1], FAILURE_BAD_PASSWORD)
+        self.assertEqual(self.attempt('secret-password')[1], FAILURE_THROTTLED)
+
+        # L'attente est courte et plafonnée : le propriétaire se connecte ensuite
+        self.clock += 2
+        user, failure = self.attempt('secret-password')
+        self.assertIsNotNone(user)
+
+    def test_backoff_is_capped(self):
+        for index in range(20):
+            self.attempt(f'wrong-{index}')
+            self.clock += 60
+        self.attempt('wrong-again')
+        self.clock += 31
+        self.assertIsNotNone(self.attempt('secret-password')[0])
+
+
+class ClientIpTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_remote_addr_without_trusted_header(self):
+        request = self.factory.get('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.7')
+        self.assertEqual(get_client_ip(request), '10.0.0.1')
+
+    @mock.patch('backend.auth_backends.LOGIN_CLIENT_IP_HEADER', 'X-Forwarded-For')
+    def test_trusted_proxy_header_ignores_client_supplied_entries(self):
+        request = self.factory.get('/', REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7')
+        self.assertEqual(get_client_ip(request), '203.0.113.7')
+        with mock.patch('backend.auth_backends.LOGIN_TRUSTED_PROXY_COUNT', 2):
+            self.assertEqual(get_client_ip(request), '1.2.3.4')
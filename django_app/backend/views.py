@@ -2,11 +2,28 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login,logout
 from django.contrib import messages
+from django.db import IntegrityError, transaction
+
+from .auth_backends import (
+    FAILURE_BAD_PASSWORD,
+    FAILURE_INACTIVE,
+    FAILURE_THROTTLED,
+    FAILURE_UNKNOWN_EMAIL,
+    normalize_email,
+)
+
+# Messages selon la raison de l'échec renseignée par EmailBackend (request.login_failure)
+LOGIN_FAILURE_MESSAGES = {
+    FAILURE_THROTTLED: "Trop de tentatives de connexion. Veuillez réessayer dans quelques instants.",
+    FAILURE_UNKNOWN_EMAIL: "Adresse e-mail incorrecte.",
+    FAILURE_BAD_PASSWORD: "Mot de passe incorrect.",
+    FAILURE_INACTIVE: "Ce compte est désactivé.",
+}
 
 
 def register_user(request):
     if request.method == 'POST':
-        email = request.POST.get('email')
+        email = normalize_email(request.POST.get('email'))
         password = request.POST.get('password')
         confirm_password = request.POST.get('confirm_password')
 
@@ -15,14 +32,14 @@ def register_user(request):
             messages.error(request, "Les mots de passe ne correspondent pas.")
             return redirect('front:register')  # Rediriger vers la page d'inscription avec le message d'erreur
 
-        # Vérifier si l'email est déjà utilisé comme username
-        if User.objects.filter(username=email).exists():
+        # Créer un nouvel utilisateur avec l'email comme username
+        # (la contrainte d'unicité du username signale un email déjà utilisé)
+        try:
+            with transaction.atomic():
+                User.objects.create_user(username=email, email=email, password=password)
+        except IntegrityError:
             messages.error(request, "Cet email est déjà utilisé comme identifiant.")
             return redirect('front:register')  # Rediriger vers la page d'inscription avec le message d'erreur
-
-        # Créer un nouvel utilisateur avec l'email comme username
-        user = User.objects.create_user(username=email, email=email, password=password)
-        user.save()
         # Stockez un marqueur dans la session pour indiquer une inscription réussie
         request.session['inscription_reussie'] = True
 
@@ -43,11 +60,8 @@ def login_user(request):
             # Rediriger vers la page de succès ou autre
             return redirect('front:success')  # Rediriger vers la page de succès après la connexion
         else:
-            try:
-                user = User.objects.get(email=email)
-                messages.error(request, "Mot de passe incorrect.")
-            except User.DoesNotExist:
-                messages.error(request, "Adresse e-mail incorrecte.")
+            failure = getattr(request, 'login_failure', None)
+            messages.error(request, LOGIN_FAILURE_MESSAGES.get(failure, "Adresse e-mail ou mot de passe incorrect."))
 
             return redirect('front:login')  # Rediriger vers la page de connexion avec le message d'erreur
 
@@ -0,0 +1,383 @@
+"""
+Compression des réponses HTTP (gzip / Brotli) et service des fichiers statiques
+pré-compressés.
+
+- ``CompressionMiddleware`` : négociation ``Accept-Encoding`` (q-values), seuil de
+  taille minimal, règles par type de contenu, compression en flux pour les
+  ``StreamingHttpResponse`` et mesure des octets envoyés / du temps CPU.
+- ``serve_precompressed`` : vue de service des fichiers statiques qui renvoie
+  directement les variantes ``.br`` / ``.gz`` générées au déploiement.
+
+Activation (settings.py) ::
+
+    MIDDLEWARE = [
+        'django_app.compression.CompressionMiddleware',  # le plus haut possible
+        ...
+    ]
+
+Réglages optionnels :
+
+- ``COMPRESSION_MIN_SIZE`` : taille minimale (octets) avant compression (défaut 860)
+- ``COMPRESSION_CONTENT_TYPES`` : types compressibles (préfixes)
+- ``COMPRESSION_GZIP_LEVEL`` / ``COMPRESSION_BROTLI_QUALITY`` : niveaux de compression
+- ``COMPRESSION_SERVER_TIMING`` : ajoute ``Server-Timing: compress`` aux réponses
+  (sauf celles qu'un cache partagé peut stocker)
+- ``COMPRESSION_MAX_RANDOM_BYTES`` : longueur maximale du bourrage aléatoire
+  des réponses gzip (défaut 100, 0 pour le désactiver)
+
+Atténuation de BREACH : comme ``GZipMiddleware``, chaque réponse gzip reçoit un
+nom de fichier aléatoire de longueur variable dans son en-tête, ce qui brouille
+la mesure de la taille compressée. Brotli n'a pas d'en-tête équivalent : les
+réponses qui contiennent le jeton CSRF sont donc servies en gzip.
+"""
+
+import gzip
+import logging
+import mimetypes
+import os
+import secrets
+import string
+import struct
+import threading
+import zlib
+from time import perf_counter, thread_time
+from typing import Iterator, List, Optional
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.utils.regex_helper import _lazy_re_compile
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # Brotli est optionnel : on se rabat sur gzip
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Constants
+MIN_COMPRESS_SIZE = getattr(settings, 'COMPRESSION_MIN_SIZE', 860)
+GZIP_LEVEL = getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6)
+BROTLI_QUALITY = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+SERVER_TIMING_ENABLED = getattr(settings, 'COMPRESSION_SERVER_TIMING', True)
+MAX_RANDOM_BYTES = getattr(settings, 'COMPRESSION_MAX_RANDOM_BYTES', 100)
+COMPRESSIBLE_CONTENT_TYPES = tuple(getattr(settings, 'COMPRESSION_CONTENT_TYPES', (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/x-gettext',
+    'image/svg+xml',
+)))
+
+# Les variantes pré-compressées sont cherchées dans cet ordre de préférence
+PRECOMPRESSED_VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+
+# Noms produits par ManifestStaticFilesStorage : style.3f2a9c1b04de.css
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+_hashed_name_re = _lazy_re_compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+_accept_encoding_re = _lazy_re_compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+class CompressionStats:
+    """Compteurs cumulés (octets avant / après, temps CPU) par encodage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def record(self, encoding: str, original: int, compressed: int, cpu_seconds: float):
+        with self._lock:
+            counter = self._counters.setdefault(
+                encoding, {'responses': 0, 'original_bytes': 0, 'wire_bytes': 0, 'cpu_seconds': 0.0}
+            )
+            counter['responses'] += 1
+            counter['original_bytes'] += original
+            counter['wire_bytes'] += compressed
+            counter['cpu_seconds'] += cpu_seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {encoding: dict(counter) for encoding, counter in self._counters.items()}
+
+
+compression_stats = CompressionStats()
+
+
+def parse_accept_encoding(header: str) -> List[str]:
+    """Retourne les encodages acceptés triés par préférence (q-values décroissantes)."""
+    accepted = []
+    for position, match in enumerate(_accept_encoding_re.finditer(header or '')):
+        coding = match.group(1).lower()
+        try:
+            quality = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            quality = 0.0
+        if quality > 0:
+            accepted.append((-quality, position, coding))
+    return [coding for _, _, coding in sorted(accepted)]
+
+
+def select_encoding(request, available=('br', 'gzip')) -> Optional[str]:
+    """Choisit le meilleur encodage supporté par le client parmi ``available``."""
+    for coding in parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        if coding == '*':
+            return available[0] if available else None
+        if coding in available:
+            return coding
+    return None
+
+
+def supported_encodings() -> tuple:
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    return content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+
+
+def gzip_header(max_random_bytes: int = 0) -> bytes:
+    """En-tête gzip (mtime 0), avec un nom de fichier aléatoire de 1 à ``max_random_bytes`` octets."""
+    if not max_random_bytes:
+        return b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+    length = secrets.randbelow(max_random_bytes) + 1
+    filename = ''.join(secrets.choice(string.ascii_letters) for _ in range(length)).encode()
+    return b'\x1f\x8b\x08' + bytes([gzip.FNAME]) + b'\x00\x00\x00\x00\x00\xff' + filename + b'\x00'
+
+
+class _StreamCompressor:
+    """Compresseur incrémental commun à gzip et Brotli (flush à chaque morceau)."""
+
+    def __init__(self, encoding: str, max_random_bytes: int = 0):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            # Deflate brut : l'en-tête (avec bourrage) et la fin gzip sont écrits ici
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+            self._header = gzip_header(max_random_bytes)
+            self._crc = 0
+            self._size = 0
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._compressor.process(chunk) + self._compressor.flush()
+        self._crc = zlib.crc32(chunk, self._crc)
+        self._size += len(chunk)
+        data = self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return self._take_header() + data
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        trailer = struct.pack('<II', self._crc, self._size & 0xffffffff)
+        return self._take_header() + self._compressor.flush(zlib.Z_FINISH) + trailer
+
+    def _take_header(self) -> bytes:
+        header, self._header = self._header, b''
+        return header
+
+
+def compress_bytes(data: bytes, encoding: str, max_random_bytes: int = 0) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    compressed = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if not max_random_bytes:
+        return compressed
+    # gzip.compress écrit un en-tête fixe de 10 octets, sans nom de fichier
+    return gzip_header(max_random_bytes) + compressed[10:]
+
+
+def embeds_csrf_token(request, response) -> bool:
+    """Vrai si la réponse contient (ou pose) le jeton CSRF."""
+    return bool(request.META.get('CSRF_COOKIE_NEEDS_UPDATE')) or settings.CSRF_COOKIE_NAME in response.cookies
+
+
+def is_publicly_cacheable(response) -> bool:
+    """Vrai si un cache partagé (CDN) peut stocker la réponse : ``public`` ou ``s-maxage``, sans ``private``/``no-store``."""
+    directives = {
+        directive.split('=', 1)[0].strip().lower()
+        for directive in response.get('Cache-Control', '').split(',')
+    }
+    return bool(directives & {'public', 's-maxage'}) and not directives & {'private', 'no-store'}
+
+
+def _add_server_timing(response, name: str, duration_seconds: float, description: str = ''):
+    # Une réponse servie à tous par un CDN ne doit pas exposer les temps d'une requête particulière
+    if not SERVER_TIMING_ENABLED or is_publicly_cacheable(response):
+        return
+    entry = f'{name};dur={duration_seconds * 1000:.2f}'
+    if description:
+        entry += f';desc="{description}"'
+    existing = response.headers.get('Server-Timing')
+    response.headers['Server-Timing'] = f'{existing}, {entry}' if existing else entry
+
+
+class CompressionMiddleware:
+    """
+    Compresse les réponses (Brotli de préférence, sinon gzip) selon l'en-tête
+    ``Accept-Encoding`` du client.
+
+    Les réponses déjà encodées, trop petites, non compressibles ou partielles
+    (206) sont laissées telles quelles. Les réponses en flux sont compressées
+    morceau par morceau sans être mises en mémoire.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.status_code in (204, 206, 304) or response.has_header('Content-Encoding'):
+            return response
+        if not is_compressible(response.get('Content-Type', '')):
+            return response
+
+        # La réponse dépend désormais de l'en-tête du client, même non compressée
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        # Brotli n'a pas de bourrage aléatoire : gzip pour les réponses porteuses du jeton CSRF
+        available = ('gzip',) if embeds_csrf_token(request, response) else supported_encodings()
+        encoding = select_encoding(request, available)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            self._compress_streaming(request, response, encoding)
+        else:
+            if len(response.content) < MIN_COMPRESS_SIZE:
+                return response
+            original_size = len(response.content)
+            cpu_start, wall_start = thread_time(), perf_counter()
+            compressed = compress_bytes(response.content, encoding, MAX_RANDOM_BYTES)
+            cpu_seconds, wall_seconds = thread_time() - cpu_start, perf_counter() - wall_start
+            if len(compressed) >= original_size:
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+            compression_stats.record(encoding, original_size, len(compressed), cpu_seconds)
+            _add_server_timing(response, 'compress', wall_seconds, encoding)
+            logger.debug(
+                "Compressed %s %s: %d -> %d bytes (%.2f ms CPU)",
+                request.method, request.path, original_size, len(compressed), cpu_seconds * 1000
+            )
+
+        # Un ETag fort ne peut plus désigner le contenu encodé
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _compress_streaming(self, request, response, encoding: str):
+        original_stream = response.streaming_content
+        path = request.path
+
+        def compressed_stream(stream: Iterator[bytes]) -> Iterator[bytes]:
+            compressor = _StreamCompressor(encoding, MAX_RANDOM_BYTES)
+            original_size = wire_size = 0
+            cpu_seconds = 0.0
+            for chunk in stream:
+                original_size += len(chunk)
+                cpu_start = thread_time()
+                data = compressor.compress(chunk)
+                cpu_seconds += thread_time() - cpu_start
+                if data:
+                    wire_size += len(data)
+                    yield data
+            data = compressor.finish()
+            wire_size += len(data)
+            compression_stats.record(encoding, original_size, wire_size, cpu_seconds)
+            logger.debug("Compressed stream %s: %d -> %d bytes", path, original_size, wire_size)
+            yield data
+
+        if response.is_async:
+            async def async_compressed_stream():
+                compressor = _StreamCompressor(encoding, MAX_RANDOM_BYTES)
+                async for chunk in original_stream:
+                    data = compressor.compress(chunk)
+                    if data:
+                        yield data
+                yield compressor.finish()
+
+            response.streaming_content = async_compressed_stream()
+        else:
+            response.streaming_content = compressed_stream(original_stream)
+        # La taille finale n'est pas connue à l'avance
+        del response.headers['Content-Length']
+
+
+def precompress_file(path: str, min_size: int = MIN_COMPRESS_SIZE) -> List[str]:
+    """
+    Écrit les variantes ``.gz`` (et ``.br`` si disponible) de ``path`` à côté
+    du fichier, uniquement si elles sont plus petites que l'original.
+    """
+    with open(path, 'rb') as source:
+        data = source.read()
+    if len(data) < min_size:
+        return []
+    written = []
+    for encoding in supported_encodings():
+        suffix = dict(PRECOMPRESSED_VARIANTS)[encoding]
+        if encoding == 'br':
+            compressed = brotli.compress(data, quality=11)
+        else:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) < len(data):
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+            written.append(path + suffix)
+    return written
+
+
+def find_precompressed(full_path: str, request) -> tuple:
+    """
+    Retourne ``(chemin, encodage)`` de la meilleure variante pré-compressée
+    disponible pour ``full_path`` (ou ``(full_path, None)``).
+    """
+    accepted = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    for encoding, suffix in PRECOMPRESSED_VARIANTS:
+        if encoding in accepted or '*' in accepted:
+            candidate = full_path + suffix
+            if os.path.isfile(candidate):
+                return candidate, encoding
+    return full_path, None
+
+
+def serve_precompressed(request, path, document_root=None):
+    """
+    Sert un fichier statique en privilégiant les variantes ``.br``/``.gz``
+    générées au déploiement (aucune compression à la volée). Les fichiers avec
+    empreinte sont servis avec un cache navigateur immuable d'un an.
+    """
+    document_root = os.path.abspath(document_root or settings.STATIC_ROOT)
+    full_path = os.path.abspath(os.path.join(document_root, path))
+    if not full_path.startswith(document_root + os.sep) or not os.path.isfile(full_path):
+        raise Http404("Fichier statique introuvable")
+
+    served_path, encoding = find_precompressed(full_path, request)
+    stat = os.stat(served_path)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type, _ = mimetypes.guess_type(full_path)
+    response = FileResponse(
+        open(served_path, 'rb'),
+        content_type=content_type or 'application/octet-stream',
+        filename=os.path.basename(full_path)
+    )
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if _hashed_name_re.search(path):
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    if is_compressible(content_type or ''):
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
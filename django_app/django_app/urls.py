@@ -1,7 +1,8 @@
 from django.contrib import admin
-from django.urls import path, include
-# from django.conf.urls.static import static
-# from django.conf import settings
+from django.urls import path, re_path, include
+from django.conf import settings
+
+from .compression import serve_precompressed
 
 urlpatterns = [
     path('welcomesuperadmin/', admin.site.urls),
@@ -10,5 +11,15 @@ urlpatterns = [
     path('backend/', include('backend.urls')), # Inclure les URL de l'application "backend"
 
     # Ajoutez d'autres URL au besoin
-    # + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT) + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 ]
+
+# Fichiers statiques servis par Django (variantes .br/.gz pré-compressées) quand
+# aucun serveur frontal ne s'en charge
+if getattr(settings, 'SERVE_STATIC', False):
+    urlpatterns += [
+        re_path(
+            r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'),
+            serve_precompressed,
+            {'document_root': settings.STATIC_ROOT},
+        ),
+    ]
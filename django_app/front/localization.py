@@ -0,0 +1,130 @@
+"""
+Localisation du site calculée à la construction.
+
+``python manage.py localize_site --languages en,es`` :
+
+1. extrait les textes de ``front/templates`` (y compris ``includes/``) ;
+2. déduplique les textes identiques entre pages ;
+3. ne traduit que les textes absents du catalogue de la langue
+   (``front/locale_catalogs/<langue>.json``) : une reconstruction ne retraduit
+   que ce qui a changé ;
+4. écrit les templates traduits dans ``front/templates/localized/<langue>/``.
+
+À l'exécution, ``LocalizedTemplateView`` sert la version traduite demandée par
+``?lang=`` ou le cookie ``site_lang`` : aucune traduction n'a lieu pendant la requête.
+"""
+
+import html
+import json
+import os
+import re
+from typing import Dict
+
+from django.views.generic import TemplateView
+
+from .page_cache import get_requested_language
+from .text_extraction import TEMPLATES_DIR, iter_text_nodes, list_templates
+
+# Constants
+LOCALIZED_DIR_NAME = 'localized'
+LOCALIZED_TEMPLATES_DIR = os.path.join(TEMPLATES_DIR, LOCALIZED_DIR_NAME)
+CATALOGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locale_catalogs')
+
+_template_reference_re = re.compile(r'(\{%\s*(?:extends|include)\s+)([\'"])([^\'"]+)\2')
+_html_lang_re = re.compile(r'(<html\b[^>]*?\blang=")[^"]*(")', re.I)
+# Accolade qui ouvrirait une variable, une balise ou un commentaire de template
+_template_brace_re = re.compile(r'\{(?=[{%#]|$)')
+
+
+def localized_template_name(language: str, template_name: str) -> str:
+    return f'{LOCALIZED_DIR_NAME}/{language}/{template_name}'
+
+
+def catalog_path(language: str) -> str:
+    return os.path.join(CATALOGS_DIR, f'{language}.json')
+
+
+def load_catalog(language: str) -> Dict[str, str]:
+    """Catalogue ``{texte source: traduction}`` d'une langue (vide s'il n'existe pas)."""
+    try:
+        with open(catalog_path(language), encoding='utf-8') as catalog:
+            return json.load(catalog)
+    except FileNotFoundError:
+        return {}
+
+
+def save_catalog(language: str, catalog: Dict[str, str]):
+    os.makedirs(CATALOGS_DIR, exist_ok=True)
+    temporary_path = catalog_path(language) + '.tmp'
+    with open(temporary_path, 'w', encoding='utf-8') as target:
+        json.dump(catalog, target, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temporary_path, catalog_path(language))
+
+
+def escape_template_syntax(text: str) -> str:
+    """
+    Neutralise les ``{{``, ``{%`` et ``{#`` d'une traduction : le texte vient
+    d'un service externe et ne doit jamais devenir du code de template.
+    """
+    return _template_brace_re.sub('{% templatetag openbrace %}', text)
+
+
+def localize_template_source(source: str, language: str, catalog: Dict[str, str], templates) -> str:
+    """
+    Remplace les textes de ``source`` par leur traduction et redirige les
+    ``{% extends %}``/``{% include %}`` vers les templates traduits.
+    """
+    parts = []
+    position = 0
+    for node in iter_text_nodes(source):
+        translation = catalog.get(node.text)
+        if translation:
+            parts.append(source[position:node.start])
+            parts.append(escape_template_syntax(html.escape(translation, quote=False)))
+            position = node.end
+    parts.append(source[position:])
+    localized = ''.join(parts)
+
+    def redirect_reference(match):
+        name = match.group(3)
+        if name not in templates:
+            return match.group(0)
+        quote = match.group(2)
+        return f'{match.group(1)}{quote}{localized_template_name(language, name)}{quote}'
+
+    localized = _template_reference_re.sub(redirect_reference, localized)
+    return _html_lang_re.sub(lambda m: f'{m.group(1)}{language}{m.group(2)}', localized, count=1)
+
+
+def write_localized_templates(language: str, catalog: Dict[str, str]) -> int:
+    """Écrit tous les templates traduits d'une langue ; retourne leur nombre."""
+    templates = set(list_templates())
+    for name in templates:
+        with open(os.path.join(TEMPLATES_DIR, name), encoding='utf-8') as template:
+            source = template.read()
+        target_path = os.path.join(LOCALIZED_TEMPLATES_DIR, language, name)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        with open(target_path, 'w', encoding='utf-8') as target:
+            target.write(localize_template_source(source, language, catalog, templates))
+    return len(templates)
+
+
+def localized_languages():
+    """Langues pour lesquelles des templates traduits ont été générés."""
+    if not os.path.isdir(LOCALIZED_TEMPLATES_DIR):
+        return []
+    return sorted(os.listdir(LOCALIZED_TEMPLATES_DIR))
+
+
+class LocalizedTemplateView(TemplateView):
+    """
+    ``TemplateView`` qui sert la version pré-traduite du template quand une
+    langue est demandée (``?lang=en`` ou cookie ``site_lang``) et qu'elle existe.
+    """
+
+    def get_template_names(self):
+        names = super().get_template_names()
+        language = get_requested_language(self.request)
+        if not language:
+            return names
+        return [localized_template_name(language, name) for name in names] + names
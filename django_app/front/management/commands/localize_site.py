@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.views import LANGUAGE_NAMES, normalize_language_code, perform_translation
+from front.localization import load_catalog, save_catalog, write_localized_templates
+from front.text_extraction import extract_template_strings
+
+
+class Command(BaseCommand):
+    help = (
+        "Traduit les textes des templates du site et génère les pages pré-traduites "
+        "(seuls les textes nouveaux ou modifiés sont envoyés au service de traduction)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--languages', required=True, help="Codes de langue séparés par des virgules")
+        parser.add_argument('--source-language', default='fr', help="Langue des templates (défaut fr)")
+        parser.add_argument('--concurrency', type=int, default=4, help="Traductions simultanées (défaut 4)")
+
+    def handle(self, *args, **options):
+        languages = [normalize_language_code(code) for code in options['languages'].split(',') if code.strip()]
+        unknown = [code for code in languages if code not in LANGUAGE_NAMES]
+        if unknown:
+            raise CommandError(f"Langues non supportées : {', '.join(unknown)}")
+
+        strings = extract_template_strings()
+        self.stdout.write(f"{len(strings)} textes uniques dans les templates")
+
+        for language in languages:
+            catalog = load_catalog(language)
+            missing = [text for text in strings if text not in catalog]
+            stale = set(catalog) - set(strings)
+
+            translated = self._translate(missing, options['source_language'], language, options['concurrency'])
+            catalog.update(translated)
+            for text in stale:
+                del catalog[text]
+            save_catalog(language, catalog)
+
+            pages = write_localized_templates(language, catalog)
+            self.stdout.write(self.style.SUCCESS(
+                f"{language} : {len(translated)}/{len(missing)} textes traduits, "
+                f"{len(strings) - len(missing)} réutilisés, {len(stale)} supprimés, {pages} templates générés"
+            ))
+
+    def _translate(self, texts, source_language, target_language, concurrency):
+        def translate(text):
+            try:
+                return text, perform_translation(text, source_language, target_language)
+            except Exception as e:
+                self.stderr.write(f"{target_language} : échec pour {text[:40]!r} ({e})")
+                return text, None
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            results = executor.map(translate, texts)
+            # Un échec n'est pas enregistré : il sera retenté à la prochaine construction
+            return {text: translation for text, translation in results if translation}
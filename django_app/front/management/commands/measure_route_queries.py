@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from front.page_cache import PAGE_CACHE_ALIAS
+from front.urls import urlpatterns
+
+DJANGO_SESSION_MIDDLEWARE = 'django.contrib.sessions.middleware.SessionMiddleware'
+SITE_SESSION_MIDDLEWARE = 'backend.middleware.SessionMiddleware'
+
+# Configurations comparées : sessions Django en base (avant) / cache + vues sans session (après)
+CONFIGURATIONS = (
+    ('avant', DJANGO_SESSION_MIDDLEWARE, 'django.contrib.sessions.backends.db'),
+    ('après', SITE_SESSION_MIDDLEWARE, 'backend.session_store'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compte les requêtes SQL par page du site (visiteur anonyme et visiteur connecté), "
+        "avec les sessions Django en base puis avec le moteur cache et les vues sans session."
+    )
+
+    def handle(self, *args, **options):
+        routes = [
+            (pattern.name, reverse(f'front:{pattern.name}'))
+            for pattern in urlpatterns if isinstance(pattern, URLPattern) and pattern.name
+        ]
+        user = User.objects.create_user(username='measure_route_queries@example.com')
+        try:
+            results = {label: self._measure(routes, user, middleware, engine) for label, middleware, engine in CONFIGURATIONS}
+        finally:
+            user.delete()
+
+        self.stdout.write(f"{'route':<28} {'anonyme avant/après':>22} {'connecté avant/après':>22}")
+        totals = {label: [0, 0] for label, _, _ in CONFIGURATIONS}
+        for name, _ in routes:
+            before, after = results['avant'][name], results['après'][name]
+            for label, counts in (('avant', before), ('après', after)):
+                totals[label][0] += counts[0]
+                totals[label][1] += counts[1]
+            self.stdout.write(f"{name:<28} {before[0]:>10} / {after[0]:<10} {before[1]:>10} / {after[1]:<10}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'total':<28} {totals['avant'][0]:>10} / {totals['après'][0]:<10} "
+            f"{totals['avant'][1]:>10} / {totals['après'][1]:<10}"
+        ))
+
+    def _measure(self, routes, user, session_middleware, session_engine):
+        middleware = [
+            session_middleware if entry in (DJANGO_SESSION_MIDDLEWARE, SITE_SESSION_MIDDLEWARE) else entry
+            for entry in settings.MIDDLEWARE
+        ]
+        counts = {}
+        with override_settings(MIDDLEWARE=middleware, SESSION_ENGINE=session_engine):
+            anonymous = Client()
+            signed_in = Client()
+            signed_in.force_login(user)
+            for name, url in routes:
+                counts[name] = (self._count(anonymous, url), self._count(signed_in, url))
+        return counts
+
+    @staticmethod
+    def _count(client, url):
+        # Cache de pages vidé : on mesure le rendu de la vue, pas un HIT
+        caches[PAGE_CACHE_ALIAS].clear()
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        return len(queries.captured_queries)
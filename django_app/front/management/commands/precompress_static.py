@@ -0,0 +1,43 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from django_app.compression import is_compressible, precompress_file
+
+
+class Command(BaseCommand):
+    help = "Génère les variantes .gz/.br des fichiers statiques compressibles (après collectstatic)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--root',
+            default=None,
+            help="Dossier à parcourir (défaut : STATIC_ROOT)",
+        )
+
+    def handle(self, *args, **options):
+        root = options['root'] or settings.STATIC_ROOT
+        if not root or not os.path.isdir(root):
+            raise CommandError(f"Dossier statique introuvable : {root}")
+
+        original_total = compressed_total = files = 0
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(('.gz', '.br')):
+                    continue
+                content_type, _ = mimetypes.guess_type(filename)
+                if not is_compressible(content_type or ''):
+                    continue
+                path = os.path.join(dirpath, filename)
+                written = precompress_file(path)
+                if not written:
+                    continue
+                files += 1
+                original_total += os.path.getsize(path)
+                compressed_total += min(os.path.getsize(variant) for variant in written)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{files} fichiers pré-compressés : {original_total} -> {compressed_total} octets"
+        ))
@@ -0,0 +1,225 @@
+"""
+Cache de pages complètes pour les vues ``TemplateView`` purement statiques du site.
+
+Le rendu HTML est mis en cache par URL et par langue, servi avec un ETag fort,
+des en-têtes ``Cache-Control`` adaptés à un CDN et une réponse
+``304 Not Modified`` quand le client possède déjà la bonne version.
+
+Exclusions automatiques :
+
+- les vues qui redéfinissent ``get``/``post``/``dispatch``/``get_context_data``
+  (ex. ``ConfirmationView``, ``SuccessView``) ou qui déclarent ``page_cache = False`` ;
+- les requêtes portant un cookie de session, de messages ou le témoin de
+  connexion ``signed_in`` (contenu personnalisé) ;
+- les réponses qui posent des cookies (ex. jeton CSRF des formulaires).
+
+Le cache est invalidé à chaque déploiement : la version est lue dans
+``PAGE_CACHE_VERSION`` (ou la variable d'environnement ``RELEASE_VERSION``), à
+défaut calculée à partir des fichiers de templates et du manifeste des fichiers
+statiques (``staticfiles.json``, qui change avec chaque ``collectstatic``).
+"""
+
+import hashlib
+import os
+import re
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.urls import URLPattern
+from django.utils.cache import patch_vary_headers
+from django.views.generic import TemplateView
+
+from backend.middleware import AUTH_HINT_COOKIE
+
+# Constants
+PAGE_CACHE_ALIAS = getattr(settings, 'PAGE_CACHE_ALIAS', 'default')
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 24 * 3600)
+PAGE_CACHE_MAX_AGE = getattr(settings, 'PAGE_CACHE_MAX_AGE', 300)  # navigateur
+PAGE_CACHE_CDN_MAX_AGE = getattr(settings, 'PAGE_CACHE_CDN_MAX_AGE', 3600)  # CDN (s-maxage)
+PAGE_CACHE_KEY_PREFIX = "page_"
+PAGE_LANGUAGE_COOKIE = 'site_lang'
+
+# Méthodes dont la redéfinition indique un rendu dépendant de la requête
+DYNAMIC_VIEW_METHODS = ('get', 'post', 'dispatch', 'get_context_data', 'render_to_response')
+
+_language_re = re.compile(r'^[a-zA-Z]{2,3}(?:-[a-zA-Z0-9]{2,8})?$')
+
+
+def is_static_template_view(view_class) -> bool:
+    """Vrai si la vue se contente de rendre un template sans logique propre."""
+    if view_class is None or not issubclass(view_class, TemplateView):
+        return False
+    if not getattr(view_class, 'page_cache', True):
+        return False
+    return all(
+        getattr(view_class, name, None) is getattr(TemplateView, name, None)
+        for name in DYNAMIC_VIEW_METHODS
+    )
+
+
+@lru_cache(maxsize=1)
+def get_built_languages() -> frozenset:
+    """Langues dont les templates traduits existent (générés par ``localize_site`` avant le démarrage)."""
+    from .localization import localized_languages
+
+    return frozenset(localized_languages())
+
+
+def resolve_built_language(code: str):
+    """
+    Répertoire de langue construit correspondant à ``code``, sinon ``None``.
+    ``localize_site`` écrit les codes normalisés (``zh-CN``, ``iw`` pour ``he``) :
+    on suit les normalisations successives jusqu'à trouver une langue construite.
+    """
+    from api.views import normalize_language_code
+
+    built = get_built_languages()
+    seen = []
+    while code not in seen:
+        if code in built:
+            return code
+        seen.append(code)
+        code = normalize_language_code(code)
+    return None
+
+
+def get_requested_language(request):
+    """
+    Langue demandée explicitement (``?lang=`` puis cookie ``site_lang``) parmi
+    les langues construites, sinon ``None`` : une valeur inconnue ne crée pas
+    de clé de cache distincte.
+    """
+    for candidate in (request.GET.get('lang'), request.COOKIES.get(PAGE_LANGUAGE_COOKIE)):
+        if candidate and _language_re.match(candidate):
+            language = resolve_built_language(candidate)
+            if language:
+                return language
+    return None
+
+
+def get_page_language(request) -> str:
+    """Langue de la page demandée, à défaut la langue par défaut du site."""
+    return get_requested_language(request) or getattr(request, 'LANGUAGE_CODE', settings.LANGUAGE_CODE).lower()
+
+
+@lru_cache(maxsize=1)
+def get_deploy_version() -> str:
+    """Identifiant de déploiement utilisé pour invalider le cache des pages."""
+    version = getattr(settings, 'PAGE_CACHE_VERSION', None) or os.environ.get('RELEASE_VERSION')
+    if version:
+        return str(version)
+
+    # Empreinte des templates de l'application (taille + date de modification)
+    templates_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+    digest = hashlib.sha1()
+    for dirpath, _, filenames in sorted(os.walk(templates_dir)):
+        for filename in sorted(filenames):
+            stat = os.stat(os.path.join(dirpath, filename))
+            digest.update(f"{dirpath}/{filename}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    # Les pages référencent les fichiers statiques par leur nom haché : le manifeste en fait partie
+    digest.update(_read_static_manifest())
+    return digest.hexdigest()[:12]
+
+
+def _read_static_manifest() -> bytes:
+    """Contenu du manifeste ``staticfiles.json`` (``ManifestStaticFilesStorage``), vide sans manifeste."""
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    manifest_storage = getattr(staticfiles_storage, 'manifest_storage', None)
+    if manifest_storage is None:
+        return b''
+    try:
+        with manifest_storage.open(staticfiles_storage.manifest_name) as manifest:
+            return manifest.read()
+    except (FileNotFoundError, OSError):
+        return b''
+
+
+def get_page_cache_key(request) -> str:
+    url_digest = hashlib.sha1(f"{request.get_host()}{request.path}".encode()).hexdigest()
+    return f"{PAGE_CACHE_KEY_PREFIX}{get_deploy_version()}_{get_page_language(request)}_{url_digest}"
+
+
+def _has_private_cookie(request) -> bool:
+    # Le témoin de connexion change la barre de navigation de base.html
+    return any(name in request.COOKIES for name in (settings.SESSION_COOKIE_NAME, 'messages', AUTH_HINT_COOKIE))
+
+
+def _etag_matches(request, etag: str) -> bool:
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # Comparaison faible : la compression transforme l'ETag fort en W/"..."
+    candidates = (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+    return etag in candidates
+
+
+def _patch_cache_headers(response, etag: str):
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = (
+        f'public, max-age={PAGE_CACHE_MAX_AGE}, s-maxage={PAGE_CACHE_CDN_MAX_AGE}'
+    )
+    patch_vary_headers(response, ('Cookie',))
+
+
+def cache_static_page(view):
+    """
+    Enveloppe une vue ``TemplateView`` statique avec le cache de pages.
+    Les vues dynamiques sont retournées telles quelles.
+    """
+    if not is_static_template_view(getattr(view, 'view_class', None)):
+        return view
+
+    @wraps(view)
+    def cached_view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or _has_private_cookie(request):
+            return view(request, *args, **kwargs)
+
+        page_cache = caches[PAGE_CACHE_ALIAS]
+        cache_key = get_page_cache_key(request)
+        cached_page = page_cache.get(cache_key)
+
+        if cached_page is None:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response = response.render()
+            cacheable = (
+                response.status_code == 200
+                and not response.cookies
+                and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+            )
+            if not cacheable:
+                return response
+            etag = '"%s"' % hashlib.sha1(response.content).hexdigest()
+            cached_page = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': etag,
+            }
+            page_cache.set(cache_key, cached_page, PAGE_CACHE_TIMEOUT)
+            cache_status = 'MISS'
+        else:
+            cache_status = 'HIT'
+
+        if _etag_matches(request, cached_page['etag']):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(cached_page['content'], content_type=cached_page['content_type'])
+        _patch_cache_headers(response, cached_page['etag'])
+        response.headers['X-Page-Cache'] = cache_status
+        return response
+
+    return cached_view
+
+
+def cache_static_pages(urlpatterns):
+    """Applique ``cache_static_page`` à toutes les routes éligibles d'une liste d'URL."""
+    return [
+        URLPattern(pattern.pattern, cache_static_page(pattern.callback), pattern.default_args, pattern.name)
+        if isinstance(pattern, URLPattern) else pattern
+        for pattern in urlpatterns
+    ]
@@ -48,25 +48,21 @@ function translateUserInput() {
 
 }
 
+// Client partagé : debounce, annulation des requêtes obsolètes, cache local
+const translationClient = new TranslationClient({ endpoint: '/api/translate/' });
+
+// Traduction automatique pendant la saisie (une seule requête après la dernière frappe)
+document.getElementById('inputText')?.addEventListener('input', () => {
+    const inputText = document.getElementById('inputText').value.trim();
+    const selectedLanguage = document.getElementById('selectLanguage').value;
+    if (inputText !== '' && selectedLanguage !== '') {
+        translateText(inputText, selectedLanguage);
+    }
+});
+
 // Fonction pour traduire le texte
 function translateText(inputText, selectedLanguage) {
-    const myHeaders = new Headers();
-    myHeaders.append("Content-Type", "application/json");
-
-    const raw = JSON.stringify({
-        "message": inputText,
-        "target_language": selectedLanguage
-    });
-
-    const requestOptions = {
-        method: "POST",
-        headers: myHeaders,
-        body: raw,
-        redirect: "follow"
-    };
-
-    return fetch("https://projets.expeditalagbe.com/flask_lang_api/translate", requestOptions)
-        .then((response) => response.json())
+    return translationClient.translate(inputText, selectedLanguage)
         .then((result) => {
             // Vérifiez si le statut est 'success' avant d'afficher les informations de traduction
             if (result.status === 'success') {
@@ -76,7 +72,9 @@ function translateText(inputText, selectedLanguage) {
                 `;
 
                 const sourceLanguageElement = document.getElementById('sourceLanguage');
-                sourceLanguageElement.textContent = `langue Source: ${result.source_language_name}`;
+                // En détection automatique, le serveur renvoie la langue détectée
+                const sourceLanguageName = result.detected_language_name || result.source_language;
+                sourceLanguageElement.textContent = `langue Source: ${sourceLanguageName}`;
                 updateButtonVisibility();
 
             } else {
@@ -93,6 +91,10 @@ function translateText(inputText, selectedLanguage) {
             }
         })
         .catch((error) => {
+            // Requête remplacée par une saisie plus récente : rien à afficher
+            if (error.name === 'AbortError') {
+                return;
+            }
             console.error(error);
             const errorMessage = getErrorMessage('general_error');
             const outputText = document.getElementById('outputText');
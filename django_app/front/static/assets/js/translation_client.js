@@ -0,0 +1,132 @@
+// Client navigateur de l'API de traduction (/api/translate/)
+// - debounce : une seule requête après la dernière saisie / le dernier clic
+// - annulation (AbortController) de la requête précédente encore en cours
+// - cache LRU des derniers résultats
+// - nouvelle tentative après Retry-After quand le service est saturé (429/503)
+// - textes courts envoyés en GET : réponse réutilisable par le cache HTTP du navigateur et les CDN
+
+class TranslationClient {
+    constructor(options = {}) {
+        this.endpoint = options.endpoint || '/api/translate/';
+        this.debounceDelay = options.debounceDelay ?? 400;
+        this.cacheSize = options.cacheSize ?? 100;
+        this.maxRetries = options.maxRetries ?? 2;
+        this.maxGetLength = options.maxGetLength ?? 500;
+        // Classe de priorité côté serveur : la page de démo attend la réponse
+        this.priority = options.priority ?? 'interactive';
+        this.cache = new Map();
+        this.controller = null;
+        this.timer = null;
+        this.pendingReject = null;
+    }
+
+    // Traduction différée : seul le dernier appel dans la fenêtre de debounce part.
+    // Les appels remplacés sont rejetés avec une AbortError.
+    translate(message, targetLanguage, sourceLanguage = 'auto') {
+        clearTimeout(this.timer);
+        if (this.pendingReject) {
+            this.pendingReject(new DOMException('Remplacée par une requête plus récente', 'AbortError'));
+        }
+        return new Promise((resolve, reject) => {
+            this.pendingReject = reject;
+            this.timer = setTimeout(() => {
+                this.pendingReject = null;
+                this.translateNow(message, targetLanguage, sourceLanguage).then(resolve, reject);
+            }, this.debounceDelay);
+        });
+    }
+
+    // Traduction immédiate ; annule la requête précédente encore en cours.
+    async translateNow(message, targetLanguage, sourceLanguage = 'auto') {
+        const key = `${sourceLanguage}|${targetLanguage}|${message}`;
+        if (this.cache.has(key)) {
+            const cached = this.cache.get(key);
+            this.cache.delete(key);
+            this.cache.set(key, cached);
+            return cached;
+        }
+
+        if (this.controller) {
+            this.controller.abort();
+        }
+        const controller = new AbortController();
+        this.controller = controller;
+
+        try {
+            const payload = {
+                message: message.trim(),
+                source_language: sourceLanguage,
+                target_language: targetLanguage
+            };
+            const result = payload.message.length <= this.maxGetLength
+                ? await this.get(payload, controller.signal)
+                : await this.post(payload, controller.signal);
+            if (result.status === 'success') {
+                this.remember(key, result);
+            }
+            return result;
+        } finally {
+            if (this.controller === controller) {
+                this.controller = null;
+            }
+        }
+    }
+
+    // Paramètres dans l'ordre canonique attendu par le serveur (sinon redirection) ;
+    // la priorité passe par un en-tête pour ne pas multiplier les URL en cache
+    get(payload, signal) {
+        const query = new URLSearchParams(payload).toString();
+        return this.send(`${this.endpoint}?${query}`, {
+            method: 'GET',
+            headers: { 'X-Translation-Priority': this.priority }
+        }, signal);
+    }
+
+    post(payload, signal) {
+        return this.send(this.endpoint, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ ...payload, priority: this.priority })
+        }, signal);
+    }
+
+    async send(url, init, signal) {
+        for (let attempt = 0; ; attempt++) {
+            const response = await fetch(url, { ...init, signal: signal });
+            if ((response.status === 429 || response.status === 503) && attempt < this.maxRetries) {
+                await this.wait(this.retryDelay(response, attempt), signal);
+                continue;
+            }
+            return response.json();
+        }
+    }
+
+    retryDelay(response, attempt) {
+        const header = response.headers.get('Retry-After');
+        const seconds = Number(header);
+        if (header && !Number.isNaN(seconds)) {
+            return seconds * 1000;
+        }
+        if (header && !Number.isNaN(Date.parse(header))) {
+            return Math.max(0, Date.parse(header) - Date.now());
+        }
+        return 500 * Math.pow(2, attempt);
+    }
+
+    wait(delay, signal) {
+        return new Promise((resolve, reject) => {
+            const timer = setTimeout(resolve, delay);
+            signal.addEventListener('abort', () => {
+                clearTimeout(timer);
+                reject(new DOMException('Requête annulée', 'AbortError'));
+            }, { once: true });
+        });
+    }
+
+    remember(key, result) {
+        this.cache.set(key, result);
+        if (this.cache.size > this.cacheSize) {
+            this.cache.delete(this.cache.keys().next().value);
+        }
+    }
+}
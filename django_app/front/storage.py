@@ -0,0 +1,130 @@
+"""
+Stockage des fichiers statiques pour la production.
+
+``OptimizedManifestStaticFilesStorage`` étend ``ManifestStaticFilesStorage`` :
+
+1. minification des CSS/JS non minifiés (avant le calcul des empreintes) ;
+2. renommage avec empreinte (``style.css`` -> ``style.3f2a9c1b04de.css``) et
+   manifeste ``staticfiles.json`` utilisé par ``{% static %}`` ;
+3. génération des variantes ``.gz``/``.br`` des fichiers avec empreinte.
+
+Activation (settings.py) ::
+
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'front.storage.OptimizedManifestStaticFilesStorage'},
+    }
+
+Les noms avec empreinte étant immuables, ``serve_precompressed`` les sert avec
+``Cache-Control: public, max-age=31536000, immutable``.
+"""
+
+import logging
+import mimetypes
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+from django_app.compression import is_compressible, precompress_file
+
+logger = logging.getLogger(__name__)
+
+# Chaînes, commentaires et url() non quotées : le texte de ces jetons n'est jamais réécrit
+_css_token_re = re.compile(
+    r'''("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|/\*.*?\*/|url\(\s*[^)'"\s][^)]*\))''', re.S | re.I
+)
+_css_space_re = re.compile(r'\s+')
+_css_punctuation_re = re.compile(r'\s*([{};,>])\s*')
+# Chaîne continuée sur la ligne suivante
+_js_line_continuation_re = re.compile(r'\\\r?\n')
+
+
+def _minify_css_code(code: str) -> str:
+    code = _css_space_re.sub(' ', code)
+    code = _css_punctuation_re.sub(r'\1', code)
+    return code.replace(';}', '}')
+
+
+def minify_css(source: str) -> str:
+    """
+    Minification CSS prudente : commentaires (hors ``/*! ... */`` de licence),
+    blancs et ``;`` superflus. Le contenu des chaînes et des ``url()`` est
+    recopié tel quel.
+    """
+    output = []
+    code = []
+    for index, part in enumerate(_css_token_re.split(source)):
+        if index % 2 == 0:
+            code.append(part)
+        elif part.startswith('/*') and not part.startswith('/*!'):
+            code.append(' ')
+        else:
+            output.append(_minify_css_code(''.join(code)))
+            output.append(part)
+            code = []
+    output.append(_minify_css_code(''.join(code)))
+    return ''.join(output).strip()
+
+
+def minify_js(source: str) -> str:
+    """
+    Minification JS prudente : indentation et lignes vides uniquement. Un
+    fichier contenant un gabarit (`` `...` ``) ou une chaîne continuée en fin
+    de ligne est laissé tel quel : ces littéraux s'étendent sur plusieurs
+    lignes et leurs blancs font partie du texte.
+    """
+    if '`' in source or _js_line_continuation_re.search(source):
+        return source
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line) + '\n'
+
+
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+
+class OptimizedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Fichiers statiques minifiés, avec empreinte et pré-compressés."""
+
+    # Une référence vers un fichier absent (template ou url() CSS) ne doit
+    # casser ni collectstatic ni le rendu d'une page
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+
+        for name in paths:
+            self._minify(name)
+
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+
+        for hashed_name in hashed_names:
+            content_type, _ = mimetypes.guess_type(hashed_name)
+            if is_compressible(content_type or '') and self.exists(hashed_name):
+                precompress_file(self.path(hashed_name))
+
+    def _minify(self, name: str):
+        minifier = next((m for ext, m in MINIFIERS.items() if name.endswith(ext)), None)
+        if minifier is None or '.min.' in name:
+            return
+        path = self.path(name)
+        with open(path, encoding='utf-8') as source:
+            original = source.read()
+        minified = minifier(original)
+        if len(minified) < len(original):
+            with open(path, 'w', encoding='utf-8') as target:
+                target.write(minified)
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            logger.warning("Static file not found, served without hash: %s", name)
+            return name
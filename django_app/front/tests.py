@@ -1,3 +1,136 @@
-from django.test import TestCase
+import gzip
+import json
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.http import HttpResponse, StreamingHttpResponse
+from django.core.cache import caches
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from django_app.compression import CompressionMiddleware
+
+from backend.middleware import AUTH_HINT_COOKIE
+from front.localization import localize_template_source
+from front.page_cache import PAGE_CACHE_ALIAS, PAGE_LANGUAGE_COOKIE, get_deploy_version, get_requested_language
+from front.storage import minify_css, minify_js
+
+
+@mock.patch('front.page_cache.get_built_languages', return_value=frozenset({'en', 'zh-CN', 'iw'}))
+class RequestedLanguageTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_codes_resolve_to_built_directories(self, built_languages):
+        for requested, expected in (('en', 'en'), ('EN', 'en'), ('zh-cn', 'zh-CN'), ('zh', 'zh-CN'), ('he', 'iw')):
+            with self.subTest(requested=requested):
+                self.assertEqual(get_requested_language(self.factory.get('/', {'lang': requested})), expected)
+
+    def test_unbuilt_or_invalid_languages_fall_back(self, built_languages):
+        for requested in ('de', 'xx', 'not a language'):
+            with self.subTest(requested=requested):
+                self.assertIsNone(get_requested_language(self.factory.get('/', {'lang': requested})))
+
+    def test_cookie_is_used_when_query_is_unknown(self, built_languages):
+        request = self.factory.get('/', {'lang': 'xx'})
+        request.COOKIES[PAGE_LANGUAGE_COOKIE] = 'zh-cn'
+        self.assertEqual(get_requested_language(request), 'zh-CN')
+
+
+@override_settings(
+    PAGE_CACHE_VERSION=None,
+    STORAGES={'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'}},
+)
+class DeployVersionTests(SimpleTestCase):
+    def setUp(self):
+        static_root = self.enterContext(tempfile.TemporaryDirectory())
+        self.manifest_path = f"{static_root}/staticfiles.json"
+        self.enterContext(override_settings(STATIC_ROOT=static_root))
+        self.enterContext(mock.patch.dict('os.environ', {'RELEASE_VERSION': ''}))
+        self.addCleanup(get_deploy_version.cache_clear)
+
+    def _version_with_manifest(self, paths):
+        with open(self.manifest_path, 'w') as manifest:
+            json.dump({'paths': paths, 'version': '1.1'}, manifest)
+        get_deploy_version.cache_clear()
+        return get_deploy_version()
+
+    def test_collectstatic_changes_the_version(self):
+        before = self._version_with_manifest({'css/site.css': 'css/site.3f2a9c1b04de.css'})
+        after = self._version_with_manifest({'css/site.css': 'css/site.77b0e1a2c3d4.css'})
+        self.assertNotEqual(before, after)
+
+
+class CompressionBreachTests(SimpleTestCase):
+    body = b'<p>' + b'Bonjour tout le monde. ' * 200 + b'</p>'
+
+    def compress(self, response, **meta):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='br, gzip', **meta)
+        return CompressionMiddleware(lambda request: response).process_response(request, response)
+
+    def test_gzip_responses_are_randomly_padded(self):
+        with mock.patch('django_app.compression.brotli', None):
+            sizes = {len(self.compress(HttpResponse(self.body)).content) for _ in range(20)}
+        self.assertGreater(len(sizes), 1)
+        with mock.patch('django_app.compression.brotli', None):
+            self.assertEqual(gzip.decompress(self.compress(HttpResponse(self.body)).content), self.body)
+
+    def test_streaming_gzip_is_padded_and_valid(self):
+        with mock.patch('django_app.compression.brotli', None):
+            response = self.compress(StreamingHttpResponse(iter([self.body[:100], self.body[100:]])))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.body)
+
+    def test_csrf_pages_avoid_brotli(self):
+        response = self.compress(HttpResponse(self.body), CSRF_COOKIE_NEEDS_UPDATE=True)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+
+class PageCacheCookieTests(TestCase):
+    def setUp(self):
+        caches[PAGE_CACHE_ALIAS].clear()
+        self.addCleanup(caches[PAGE_CACHE_ALIAS].clear)
+
+    def test_signed_in_hint_does_not_poison_the_cache(self):
+        self.client.cookies[AUTH_HINT_COOKIE] = '1'
+        signed_in = self.client.get(reverse('front:about'))
+        self.assertNotIn('X-Page-Cache', signed_in)
+        self.assertContains(signed_in, reverse('front:success'))
+
+        del self.client.cookies[AUTH_HINT_COOKIE]
+        anonymous = self.client.get(reverse('front:about'))
+        self.assertEqual(anonymous['X-Page-Cache'], 'MISS')
+        self.assertNotContains(anonymous, reverse('front:success'))
+        self.assertContains(anonymous, reverse('front:login'))
+
+
+class LocalizeTemplateSourceTests(SimpleTestCase):
+    def test_translation_cannot_inject_template_code(self):
+        catalog = {'Bonjour': '{{ secret }} {% now "Y" %} {# note #} {'}
+        localized = localize_template_source('<p>Bonjour</p>{% if True %}!{% endif %}', 'en', catalog, set())
+
+        rendered = Template(localized).render(Context({'secret': 'SECRET'}))
+
+        self.assertEqual(rendered, '<p>{{ secret }} {% now "Y" %} {# note #} {</p>!')
+
+
+class MinifierTests(SimpleTestCase):
+    def test_css_strings_and_urls_are_kept(self):
+        source = (
+            '.a  >  b { content: "x  ,  y" ; color: red ; /* note */ }\n'
+            '/*! licence */\n.b { background: url( data:image/svg+xml;utf8,<svg  a="1"> ) ; }\n'
+        )
+        self.assertEqual(
+            minify_css(source),
+            '.a>b{content: "x  ,  y";color: red}/*! licence */ .b{background: url( data:image/svg+xml;utf8,<svg  a="1"> )}'
+        )
+
+    def test_js_indentation_and_blank_lines_are_removed(self):
+        source = "function f() {\n    const a = 'x  y';\n\n    return a;\n}\n"
+        self.assertEqual(minify_js(source), "function f() {\nconst a = 'x  y';\nreturn a;\n}\n")
+
+    def test_js_multiline_literals_are_left_untouched(self):
+        for source in ('const t = `a\n    b`;\n', 'const s = "a\\\n    b";\n'):
+            with self.subTest(source=source):
+                self.assertEqual(minify_js(source), source)
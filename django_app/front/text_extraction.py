@@ -0,0 +1,83 @@
+"""
+Extraction des textes traduisibles des templates du site.
+
+Un template est découpé en balises HTML, balises/variables/commentaires Django,
+blocs ``<script>``/``<style>``/commentaires HTML et texte. Seuls les segments de
+texte contenant au moins une lettre sont retenus, avec leur position dans la
+source pour pouvoir les remplacer (localisation des pages).
+"""
+
+import html
+import os
+import re
+from typing import Iterator, List, NamedTuple
+
+# Tout ce qui n'est pas du texte visible
+_NON_TEXT_RE = re.compile(
+    r'<script\b.*?</script\s*>'
+    r'|<style\b.*?</style\s*>'
+    r'|<!--.*?-->'
+    r'|\{%\s*comment\s*%\}.*?\{%\s*endcomment\s*%\}'
+    r'|\{#.*?#\}'
+    r'|\{%.*?%\}'
+    r'|\{\{.*?\}\}'
+    r'|<[^>]*>',
+    re.S | re.I
+)
+_LETTER_RE = re.compile(r'[^\W\d_]')
+_SPACE_RE = re.compile(r'\s+')
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+
+class TextNode(NamedTuple):
+    start: int
+    end: int
+    text: str  # texte normalisé (entités décodées, espaces réduits)
+
+
+def normalize_text(raw: str) -> str:
+    return _SPACE_RE.sub(' ', html.unescape(raw)).strip()
+
+
+def iter_text_nodes(source: str) -> Iterator[TextNode]:
+    """Segments de texte traduisibles de ``source``, dans l'ordre."""
+    position = 0
+    for match in _NON_TEXT_RE.finditer(source):
+        yield from _text_between(source, position, match.start())
+        position = match.end()
+    yield from _text_between(source, position, len(source))
+
+
+def _text_between(source: str, start: int, end: int) -> Iterator[TextNode]:
+    raw = source[start:end]
+    stripped = raw.strip()
+    if not stripped or not _LETTER_RE.search(stripped):
+        return
+    offset = start + raw.index(stripped)
+    yield TextNode(offset, offset + len(stripped), normalize_text(stripped))
+
+
+def list_templates(templates_dir: str = TEMPLATES_DIR) -> List[str]:
+    """
+    Chemins relatifs de tous les templates HTML source (y compris ``includes/``,
+    hors templates traduits générés dans ``localized/``).
+    """
+    templates = []
+    for dirpath, dirnames, filenames in os.walk(templates_dir):
+        if dirpath == templates_dir and 'localized' in dirnames:
+            dirnames.remove('localized')
+        for filename in filenames:
+            if filename.endswith('.html'):
+                templates.append(os.path.relpath(os.path.join(dirpath, filename), templates_dir))
+    return sorted(templates)
+
+
+def extract_template_strings(templates_dir: str = TEMPLATES_DIR) -> List[str]:
+    """Textes uniques de tous les templates, dans l'ordre de première apparition."""
+    seen = {}
+    for name in list_templates(templates_dir):
+        with open(os.path.join(templates_dir, name), encoding='utf-8') as template:
+            for node in iter_text_nodes(template.read()):
+                seen.setdefault(node.text, None)
+    return list(seen)
@@ -13,6 +13,7 @@ from .views import (
     CustomSolutions,
     PrintingService,
 )
+from .page_cache import cache_static_pages
 
 app_name = 'front'
 
@@ -45,6 +46,10 @@ urlpatterns = [
     
 ]
 
+# Cache de pages (ETag, 304, Cache-Control CDN) pour les vues purement statiques ;
+# les vues utilisant la session ou l'utilisateur sont exclues automatiquement
+urlpatterns = cache_static_pages(urlpatterns)
+
 # Configuration des vues personnalisées pour les erreurs 404, 405 et 500
 handler404 = CustomError404View.as_view()
 handler405 = CustomError405View.as_view()
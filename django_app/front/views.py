@@ -1,57 +1,66 @@
 from django.shortcuts import render,redirect
-from django.views.generic import TemplateView
 from django.urls import reverse_lazy
 
+from .localization import LocalizedTemplateView
+
+
+class SitePageView(LocalizedTemplateView):
+    """
+    Page vitrine : ni session ni utilisateur chargés, aucun cookie de session
+    écrit (voir backend/middleware.py). La navigation s'appuie sur le cookie ``signed_in``.
+    """
+    session_exempt = True
+
 
 # Vues personnalisées pour les erreurs 404, 405 et 500
-class CustomError404View(TemplateView):
+class CustomError404View(SitePageView):
     template_name = '404.html'
     status_code = 404
 
-class CustomError405View(TemplateView):
+class CustomError405View(SitePageView):
     template_name = '405.html'
     status_code = 405
 
-class CustomError500View(TemplateView):
+class CustomError500View(SitePageView):
     template_name = '500.html'
     status_code = 500
     
     
-class WelcomeView(TemplateView):
+class WelcomeView(SitePageView):
     template_name = 'welcome.html'
 
-class AboutView(TemplateView):
+class AboutView(SitePageView):
     template_name = 'about.html'
 
-class ContactView(TemplateView):
+class ContactView(SitePageView):
     template_name = 'contact.html'
-class DocumentationView(TemplateView):
+class DocumentationView(SitePageView):
     template_name = 'documentation.html'
 
-class ServicesView(TemplateView):
+class ServicesView(SitePageView):
     template_name = 'services.html'
     
-class SolutionView(TemplateView):
+class SolutionView(SitePageView):
     template_name = 'solution.html'
 
-class LegalNoticeView(TemplateView):
+class LegalNoticeView(SitePageView):
     template_name = 'mentions_legales.html'
 
-class ChangelogView(TemplateView):
+class ChangelogView(SitePageView):
     template_name = 'changelog.html'
     
-class CustomLoginView(TemplateView):
+class CustomLoginView(LocalizedTemplateView):
     template_name = "login.html"
-class CustomRegistrationView(TemplateView):
+class CustomRegistrationView(LocalizedTemplateView):
     template_name = "registration.html"
 
-class ForgotPasswordView(TemplateView):
+class ForgotPasswordView(SitePageView):
     template_name = "forgot_password.html"
 
-class DemoTranslateView(TemplateView):
+class DemoTranslateView(SitePageView):
     template_name = "translate.html"
     
-class ConfirmationView(TemplateView):
+class ConfirmationView(LocalizedTemplateView):
     template_name = 'confirmation.html'
 
     def get(self, request):
@@ -64,7 +73,7 @@ class ConfirmationView(TemplateView):
             return redirect('front:welcome')  # Redirigez vers la page d'accueil
 
 
-class SuccessView(TemplateView):
+class SuccessView(LocalizedTemplateView):
     template_name = "success.html"
 
     def get(self, request, *args, **kwargs):
@@ -83,25 +92,25 @@ class SuccessView(TemplateView):
 
 # NOUVELLE VIEW POUR CHAQUE SERVICES 
 
-class ErpServices(TemplateView):
+class ErpServices(SitePageView):
     template_name = 'ERP.html'        
     
-class WebDevelopment(TemplateView):
+class WebDevelopment(SitePageView):
     template_name = 'developpement_web.html'
 
-class MobileDevelopment(TemplateView):
+class MobileDevelopment(SitePageView):
     template_name = 'developpement_mobile.html'
 
-class DesignService(TemplateView):
+class DesignService(SitePageView):
     template_name = 'design.html'
 
-class DigitalCommunication(TemplateView):
+class DigitalCommunication(SitePageView):
     template_name = 'communication_digitale.html'
 
-class CustomSolutions(TemplateView):
+class CustomSolutions(SitePageView):
     template_name = 'solutions_sur_mesure.html'
 
-class PrintingService(TemplateView):
+class PrintingService(SitePageView):
     template_name = 'impression_serigraphie.html'    
     
     
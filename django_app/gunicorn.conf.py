@@ -0,0 +1,32 @@
+"""
+Configuration Gunicorn.
+
+    gunicorn -c gunicorn.conf.py django_app.wsgi
+
+L'application est chargée dans le processus maître (``preload_app``) puis
+préchauffée avant le fork : les workers partagent le modèle langid, les tables
+de langues et le code importé en copie-sur-écriture.
+"""
+
+import multiprocessing
+
+bind = "0.0.0.0:8000"
+workers = multiprocessing.cpu_count() * 2 + 1
+preload_app = True
+# Délai par requête ; les catalogues plus longs à traduire passent en arrière-plan
+# (``CATALOG_SYNC_WAIT`` doit rester en dessous)
+timeout = 30
+
+
+def when_ready(server):
+    """Appelé dans le maître une fois l'application chargée, avant les forks."""
+    from api.startup import warm_up
+
+    warm_up()
+
+
+def post_fork(server, worker):
+    """Chaque worker ouvre ses propres connexions amont."""
+    from api.upstream import close_pools
+
+    close_pools()
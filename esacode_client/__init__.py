@@ -0,0 +1,13 @@
+"""
+Client officiel de l'API de traduction ESA Code (``/api/translate/``,
+``/api/translate/batch/``, ``/api/detect/``).
+
+    from esacode_client import TranslationClient
+
+    with TranslationClient(api_key="...") as client:
+        client.translate("Bonjour", "en")["translated_text"]
+"""
+
+from .client import AsyncTranslationClient, TranslationAPIError, TranslationClient
+
+__all__ = ['AsyncTranslationClient', 'TranslationAPIError', 'TranslationClient']
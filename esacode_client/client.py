@@ -0,0 +1,358 @@
+"""
+Client Python de l'API de traduction ESA Code.
+
+- connexions HTTP persistantes (``requests.Session`` avec pool) ;
+- regroupement automatique des appels concurrents de ``translate`` en un seul
+  ``POST /api/translate/batch/`` (fenêtre de ``batch_window`` secondes) ;
+- cache LRU local des derniers résultats ;
+- nouvelles tentatives sur 429/503 et erreurs réseau, en respectant
+  l'en-tête ``Retry-After`` (ou le champ ``retry_after`` de la réponse).
+
+``AsyncTranslationClient`` offre la même interface pour asyncio.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Constants
+DEFAULT_BASE_URL = 'https://www.esacode.org'
+DEFAULT_TIMEOUT = 35  # le serveur abandonne une traduction après 30 s
+MAX_BATCH_ITEMS = 100  # limite de /api/translate/batch/
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class TranslationAPIError(Exception):
+    """Erreur renvoyée par l'API (ou réponse invalide)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, payload: Optional[dict] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.payload = payload or {}
+
+
+class _LRUCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+def _retry_delay(response: Optional[requests.Response], attempt: int, backoff: float) -> float:
+    """Délai avant la prochaine tentative : ``Retry-After`` sinon backoff exponentiel avec gigue."""
+    if response is not None:
+        header = response.headers.get('Retry-After')
+        if header:
+            try:
+                return max(0.0, float(header))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(header).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        try:
+            retry_after = response.json().get('retry_after')
+            if retry_after is not None:
+                return max(0.0, float(retry_after))
+        except (ValueError, AttributeError):
+            pass
+    return backoff * (2 ** attempt) * (0.5 + random.random())
+
+
+class TranslationClient:
+    """
+    Client synchrone, utilisable depuis plusieurs threads.
+
+    Args:
+        base_url: racine du site (``https://www.esacode.org``)
+        api_key: clé envoyée dans ``X-Api-Key`` (classe de priorité côté serveur)
+        batch_window: attente (secondes) pour regrouper les appels concurrents ; 0 désactive
+        cache_size: nombre de résultats gardés en cache local
+        max_retries: tentatives supplémentaires sur 429/5xx et erreurs réseau
+        pool_size: connexions persistantes conservées
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        api_key: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        batch_window: float = 0.005,
+        max_batch_size: int = MAX_BATCH_ITEMS,
+        cache_size: int = 1024,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        pool_size: int = 10,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.batch_window = batch_window
+        self.max_batch_size = min(max_batch_size, MAX_BATCH_ITEMS)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._cache = _LRUCache(cache_size)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['Content-Type'] = 'application/json'
+        if api_key:
+            self.session.headers['X-Api-Key'] = api_key
+
+        self._pending: List[tuple] = []
+        self._pending_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+
+    # -- API publique -------------------------------------------------------
+
+    def translate(self, text: str, target_language: str, source_language: str = 'auto', format: str = 'text') -> dict:
+        """Traduit ``text`` ; retourne la réponse de l'API (``translated_text``, ...)."""
+        key = (text, source_language, target_language, format)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        if self.batch_window <= 0:
+            result = self._post('/api/translate/', {
+                'message': text, 'target_language': target_language,
+                'source_language': source_language, 'format': format,
+            })
+            self._cache.set(key, result)
+            return result
+        return self._enqueue(key).result()
+
+    def translate_many(self, texts: List[str], target_language: str, source_language: str = 'auto') -> List[dict]:
+        """Traduit une liste de textes en requêtes groupées ; résultats dans l'ordre."""
+        keys = [(text, source_language, target_language, 'text') for text in texts]
+        results: Dict[tuple, dict] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            cached = self._cache.get(key)
+            if cached is None:
+                missing.append(key)
+            else:
+                results[key] = cached
+        for start in range(0, len(missing), self.max_batch_size):
+            chunk = missing[start:start + self.max_batch_size]
+            for key, result in zip(chunk, self._post_batch(chunk)):
+                if result.get('status') != 'success':
+                    raise TranslationAPIError(result.get('message', 'Translation failed'), payload=result)
+                self._cache.set(key, result)
+                results[key] = result
+        return [results[key] for key in keys]
+
+    def detect(self, text: str) -> dict:
+        """Détecte la langue de ``text`` (``language``, ``language_name``)."""
+        key = ('__detect__', text)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._post('/api/detect/', {'message': text})
+            self._cache.set(key, cached)
+        return cached
+
+    def close(self):
+        self._flush()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # -- regroupement ---------------------------------------------------------
+
+    def _enqueue(self, key) -> Future:
+        future = Future()
+        with self._pending_lock:
+            self._pending.append((key, future))
+            if len(self._pending) >= self.max_batch_size:
+                batch, self._pending = self._pending, []
+            else:
+                batch = None
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.batch_window, self._flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+        if batch:
+            self._send(batch)
+        return future
+
+    def _flush(self):
+        with self._pending_lock:
+            batch, self._pending = self._pending, []
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        if batch:
+            self._send(batch)
+
+    def _send(self, batch):
+        # Un même texte demandé par plusieurs appelants n'est envoyé qu'une fois
+        waiting: Dict[tuple, List[Future]] = {}
+        for key, future in batch:
+            waiting.setdefault(key, []).append(future)
+        keys = list(waiting)
+        try:
+            results = self._post_batch(keys)
+        except Exception as e:
+            for futures in waiting.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+        for key, result in zip(keys, results):
+            if result.get('status') == 'success':
+                self._cache.set(key, result)
+                for future in waiting[key]:
+                    future.set_result(result)
+            else:
+                error = TranslationAPIError(result.get('message', 'Translation failed'), payload=result)
+                for future in waiting[key]:
+                    future.set_exception(error)
+
+    def _post_batch(self, keys) -> List[dict]:
+        payload = {'items': [
+            {'message': text, 'source_language': source, 'target_language': target, 'format': fmt}
+            for text, source, target, fmt in keys
+        ]}
+        results = self._post('/api/translate/batch/', payload).get('results', [])
+        if len(results) != len(keys):
+            raise TranslationAPIError("Batch response does not match the request")
+        return results
+
+    # -- transport ------------------------------------------------------------
+
+    def _post(self, path: str, payload: dict) -> dict:
+        url = f"{self.base_url}{path}"
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                return self._parse(response)
+            if attempt == self.max_retries:
+                return self._parse(response)
+            time.sleep(_retry_delay(response, attempt, self.backoff))
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _parse(response: requests.Response) -> dict:
+        try:
+            data = response.json()
+        except ValueError:
+            raise TranslationAPIError(f"Invalid response (HTTP {response.status_code})", response.status_code)
+        if response.status_code >= 400 or data.get('status') == 'error':
+            raise TranslationAPIError(data.get('message', f"HTTP {response.status_code}"), response.status_code, data)
+        return data
+
+
+class AsyncTranslationClient:
+    """
+    Interface asyncio. Les appels concurrents de ``translate`` faits dans la
+    même fenêtre sont regroupés sur la boucle d'événements ; les requêtes HTTP
+    passent par le pool de connexions du client synchrone, dans un thread.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, api_key: Optional[str] = None, batch_window: float = 0.005, **options):
+        self._client = TranslationClient(base_url, api_key, batch_window=0, **options)
+        self.batch_window = batch_window
+        self._pending: List[tuple] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    async def translate(self, text: str, target_language: str, source_language: str = 'auto', format: str = 'text') -> dict:
+        key = (text, source_language, target_language, format)
+        cached = self._client._cache.get(key)
+        if cached is not None:
+            return cached
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((key, future))
+        if len(self._pending) >= self._client.max_batch_size:
+            self._schedule_flush(loop, immediate=True)
+        elif self._flush_handle is None:
+            self._schedule_flush(loop)
+        return await future
+
+    async def translate_many(self, texts: List[str], target_language: str, source_language: str = 'auto') -> List[dict]:
+        return await asyncio.to_thread(self._client.translate_many, texts, target_language, source_language)
+
+    async def detect(self, text: str) -> dict:
+        return await asyncio.to_thread(self._client.detect, text)
+
+    async def close(self):
+        if self._pending:
+            await self._flush()
+        await asyncio.to_thread(self._client.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _schedule_flush(self, loop, immediate: bool = False):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        delay = 0 if immediate else self.batch_window
+        self._flush_handle = loop.call_later(delay, lambda: asyncio.ensure_future(self._flush()))
+
+    async def _flush(self):
+        self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        waiting: Dict[tuple, List[asyncio.Future]] = {}
+        for key, future in batch:
+            waiting.setdefault(key, []).append(future)
+        keys = list(waiting)
+        try:
+            results = []
+            for start in range(0, len(keys), self._client.max_batch_size):
+                chunk = keys[start:start + self._client.max_batch_size]
+                results.extend(await asyncio.to_thread(self._client._post_batch, chunk))
+        except Exception as e:
+            for futures in waiting.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for key, result in zip(keys, results):
+            if result.get('status') == 'success':
+                self._client._cache.set(key, result)
+                outcome = None
+            else:
+                outcome = TranslationAPIError(result.get('message', 'Translation failed'), payload=result)
+            for future in waiting[key]:
+                if future.done():
+                    continue
+                if outcome is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(outcome)